@@ -5,7 +5,7 @@ This ensures tickets are based on actual knowledge base content rather than gene
 """
 
 import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import os
 
 def populate_ticketing_with_kb():
@@ -125,7 +125,7 @@ def populate_ticketing_with_kb():
             ticket['priority_id'],
             ticket['status_id'],
             None,  # assigned_to
-            datetime.now() - timedelta(hours=kb_tickets.index(ticket) + 1),
+            (datetime.now(timezone.utc) - timedelta(hours=kb_tickets.index(ticket) + 1)).strftime('%Y-%m-%d %H:%M:%S'),
             None,  # due_date
             ticket['tags']
         ))
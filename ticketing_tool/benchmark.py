@@ -0,0 +1,844 @@
+#!/usr/bin/env python3
+"""
+Benchmark Script for Ticket Management System
+Measures database throughput against throwaway copies of the schema
+
+Usage:
+    python3 benchmark.py pool --tickets 5000 --threads 8 --requests 4000
+    python3 benchmark.py pagination --tickets 200000
+    python3 benchmark.py async --tickets 20000 --requests 2000
+    python3 benchmark.py stats --tickets 100000 --requests 500
+    python3 benchmark.py bulk --tickets 1000 --requests 50000
+    python3 benchmark.py writes --tickets 1000 --threads 32 --requests 4000
+    python3 benchmark.py reads --tickets 20000 --threads 16 --requests 8000
+    python3 benchmark.py projection --tickets 5000 --requests 500
+    python3 benchmark.py serialization --requests 2000
+    python3 benchmark.py export --tickets 50000
+    python3 benchmark.py arrow --tickets 200000
+    python3 benchmark.py readmodel --tickets 100000 --requests 4000
+    python3 benchmark.py hotcache --tickets 20000 --requests 20000
+    python3 benchmark.py conditional --tickets 100000 --requests 2000
+    python3 benchmark.py include --tickets 5000 --requests 1000
+    python3 benchmark.py tags --tickets 100000 --requests 200
+    python3 benchmark.py sla --tickets 200000 --requests 2000
+    python3 benchmark.py timefilters --tickets 200000 --requests 500
+    python3 benchmark.py archive --tickets 100000 --requests 200
+    python3 benchmark.py history --tickets 20000 --requests 2000
+    python3 benchmark.py rollups --tickets 200000 --requests 200
+"""
+
+import argparse
+import http.client
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from database import TicketDatabase
+
+def seed_tickets(database: TicketDatabase, count: int):
+    """Insert synthetic tickets directly, bypassing the API-level write path"""
+    now = datetime.now(timezone.utc)
+    rows = [
+        (
+            f"BENCH-{i:07d}",
+            f"Benchmark ticket {i} about {random.choice(['login', 'billing', 'crash', 'invoice', 'performance'])}",
+            f"Synthetic description for benchmark ticket number {i}. " * 4,
+            random.randint(1, 6),
+            random.randint(1, 6),
+            random.randint(1, 4),
+            random.randint(1, 6),
+            database.format_timestamp(now - timedelta(minutes=i)),
+            "bench,synthetic"
+        )
+        for i in range(count)
+    ]
+    with database.connection() as conn:
+        conn.executemany("""
+            INSERT INTO tickets (ticket_number, title, description, user_id, category_id, priority_id, status_id, created_at, tags)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+def temp_database(tickets: int, **kwargs) -> TicketDatabase:
+    """Create a seeded database in a fresh temporary directory"""
+    path = os.path.join(tempfile.mkdtemp(prefix="tickets-bench-"), "tickets.db")
+    database = TicketDatabase(path, **kwargs)
+    seed_tickets(database, tickets)
+    return database
+
+def drop_database(database: TicketDatabase):
+    database.close()
+    shutil.rmtree(os.path.dirname(database.db_path), ignore_errors=True)
+
+def run_load(operation: Callable[[int], None], requests: int, threads: int) -> Dict[str, float]:
+    """Run ``operation`` ``requests`` times across ``threads`` workers"""
+    latencies: List[float] = []
+    
+    def timed(i: int):
+        started = time.perf_counter()
+        operation(i)
+        latencies.append((time.perf_counter() - started) * 1000)
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(timed, range(requests)))
+    elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    return {
+        'requests_per_sec': requests / elapsed,
+        'p50_ms': statistics.median(latencies),
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1]
+    }
+
+def print_result(label: str, result: Dict[str, float]):
+    print(f"   {label:<28} {result['requests_per_sec']:>10.0f} req/s"
+          f"   p50 {result['p50_ms']:>7.2f} ms   p99 {result['p99_ms']:>7.2f} ms")
+
+def mixed_workload(database: TicketDatabase, tickets: int) -> Callable[[int], None]:
+    """Mostly reads with a sprinkling of writes, like the API sees"""
+    def operation(i: int):
+        roll = i % 10
+        if roll < 4:
+            database.get_tickets(limit=50)
+        elif roll < 7:
+            database.get_ticket(random.randint(1, tickets))
+        elif roll < 9:
+            database.get_categories()
+            database.get_priority_levels()
+        else:
+            database.update_ticket(random.randint(1, tickets), {'status_id': random.randint(1, 6)}, 4)
+    return operation
+
+def bench_pool(args):
+    """Per-call connections (pool_size=0) versus the persistent WAL pools"""
+    print(f"🔌 Connection pool: {args.tickets} tickets, {args.threads} threads, {args.requests} requests")
+    for label, pool_size in [("fresh connection per call", 0), (f"pooled (size {args.pool_size})", args.pool_size)]:
+        # Both pools get the same size, and without pooling writes skip the writer thread's connection too
+        database = temp_database(args.tickets, pool_size=pool_size, read_pool_size=pool_size, group_commit=pool_size > 0)
+        try:
+            result = run_load(mixed_workload(database, args.tickets), args.requests, args.threads)
+            print_result(label, result)
+            stats = database.get_pool_stats()
+            print(f"      connections opened: {stats['created'] + stats['read_pool']['created']}, "
+                  f"waits: {stats['waits'] + stats['read_pool']['waits']}")
+        finally:
+            drop_database(database)
+
+def bench_pagination(args):
+    """Cost of reaching a deep page with OFFSET versus a keyset cursor"""
+    page_size = 50
+    print(f"📄 Pagination: {args.tickets} tickets, page size {page_size}")
+    database = temp_database(args.tickets)
+    try:
+        last_page = max(1, args.tickets // page_size - 1)
+        for page in sorted({1, last_page // 10, last_page // 2, last_page}):
+            offset = page * page_size
+            started = time.perf_counter()
+            rows = database.get_tickets(limit=page_size, offset=offset)
+            offset_ms = (time.perf_counter() - started) * 1000
+            
+            # The cursor a client would hold after reading the previous page
+            cursor = database.encode_cursor(rows[0]['created_at'], rows[0]['id'] + 1) if rows else None
+            started = time.perf_counter()
+            database.get_tickets_page(limit=page_size, cursor=cursor)
+            cursor_ms = (time.perf_counter() - started) * 1000
+            print(f"   page {page:>6}   offset {offset_ms:>8.2f} ms   cursor {cursor_ms:>8.2f} ms")
+    finally:
+        drop_database(database)
+
+class BlockingDatabase:
+    """Awaitable shim that runs TicketDatabase calls inline on the event loop (the pre-async behaviour)"""
+    
+    def __init__(self, database: TicketDatabase):
+        self.database = database
+    
+    def __getattr__(self, name: str):
+        attr = getattr(self.database, name)
+        
+        async def method(*args, **kwargs):
+            return attr(*args, **kwargs)
+        
+        return method
+
+def http_clients(port: int, concurrency: int, requests_per_client: int, tickets: int) -> Dict[str, float]:
+    """Run concurrent keep-alive HTTP clients against a live server"""
+    latencies: List[float] = []
+    
+    def client(_):
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        for _ in range(requests_per_client):
+            path = random.choice(["/tickets?limit=50", f"/tickets/{random.randint(1, tickets)}", "/stats"])
+            started = time.perf_counter()
+            conn.request("GET", path)
+            conn.getresponse().read()
+            latencies.append((time.perf_counter() - started) * 1000)
+        conn.close()
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    return {
+        'requests_per_sec': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies),
+        'p99_ms': latencies[int(len(latencies) * 0.99) - 1]
+    }
+
+def bench_async(args):
+    """API latency under rising client concurrency: inline SQLite calls versus the DB thread pool"""
+    import uvicorn
+    import main
+    from database import AsyncTicketDatabase
+    
+    print(f"⚡ Async data access: {args.tickets} tickets, {args.pool_size} DB threads")
+    database = temp_database(args.tickets, pool_size=args.pool_size)
+    original = main.async_db
+    try:
+        for label, facade in [("inline (blocking)", BlockingDatabase(database)),
+                              ("thread pool", AsyncTicketDatabase(database, max_workers=args.pool_size))]:
+            main.async_db = facade
+            server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=args.port,
+                                                   log_level="warning", lifespan="off"))
+            thread = threading.Thread(target=server.run, daemon=True)
+            thread.start()
+            while not server.started:
+                time.sleep(0.05)
+            
+            print(f"   {label}")
+            try:
+                for concurrency in (1, 4, 16, 64):
+                    per_client = max(args.requests // concurrency, 1)
+                    print_result(f"   {concurrency:>3} clients", http_clients(args.port, concurrency, per_client, args.tickets))
+            finally:
+                server.should_exit = True
+                thread.join()
+                if isinstance(facade, AsyncTicketDatabase):
+                    facade.shutdown()
+    finally:
+        main.async_db = original
+        drop_database(database)
+
+def legacy_ticket_stats(database: TicketDatabase):
+    """The six scan/GROUP BY queries get_ticket_stats ran before ticket_counts existed"""
+    with database.connection() as conn:
+        for query in (
+            "SELECT COUNT(*) FROM tickets",
+            "SELECT COUNT(*) FROM tickets WHERE status_id IN (1, 2, 3)",
+            "SELECT COUNT(*) FROM tickets WHERE status_id = 4",
+            "SELECT COUNT(*) FROM tickets WHERE priority_id = 1 AND status_id IN (1, 2, 3)",
+            "SELECT c.name, COUNT(*) FROM tickets t JOIN categories c ON t.category_id = c.id GROUP BY c.id, c.name",
+            "SELECT p.name, COUNT(*) FROM tickets t JOIN priority_levels p ON t.priority_id = p.id GROUP BY p.id, p.name"
+        ):
+            conn.execute(query).fetchall()
+
+def bench_stats(args):
+    """Dashboard statistics: full scans versus trigger-maintained counters"""
+    print(f"📊 Statistics: {args.tickets} tickets, {args.requests} requests")
+    database = temp_database(args.tickets)
+    try:
+        print_result("scan queries", run_load(lambda i: legacy_ticket_stats(database), args.requests, args.threads))
+        print_result("ticket_counts", run_load(lambda i: database.get_ticket_stats(), args.requests, args.threads))
+    finally:
+        drop_database(database)
+
+def bench_bulk(args):
+    """Ticket ingestion: one create_ticket call per ticket versus create_tickets_bulk"""
+    print(f"📥 Bulk ingestion: {args.requests} tickets")
+    tickets = [
+        {
+            'title': f"Imported ticket {i}",
+            'description': "Imported from the email gateway by the bulk benchmark",
+            'user_id': random.randint(1, 6),
+            'category_id': random.randint(1, 6),
+            'priority_id': random.randint(1, 4),
+            'status_id': 1,
+            'tags': 'import,email'
+        }
+        for i in range(args.requests)
+    ]
+    
+    database = temp_database(args.tickets)
+    try:
+        sample = tickets[:min(len(tickets), 2000)]
+        started = time.perf_counter()
+        for ticket_data in sample:
+            database.create_ticket(ticket_data)
+        elapsed = time.perf_counter() - started
+        print(f"   {'create_ticket loop':<28} {len(sample) / elapsed:>10.0f} tickets/s")
+        
+        started = time.perf_counter()
+        for start in range(0, len(tickets), 10000):
+            database.create_tickets_bulk(tickets[start:start + 10000])
+        elapsed = time.perf_counter() - started
+        print(f"   {'create_tickets_bulk':<28} {len(tickets) / elapsed:>10.0f} tickets/s")
+    finally:
+        drop_database(database)
+
+def bench_writes(args):
+    """Concurrent single-ticket writes: one transaction per write versus the group-commit writer"""
+    print(f"✍️  Concurrent writes: {args.threads} threads, {args.requests} create_ticket calls")
+    ticket_data = {
+        'title': "Concurrent write benchmark",
+        'description': "Created by the writes benchmark",
+        'user_id': 1,
+        'category_id': 1,
+        'priority_id': 3,
+        'status_id': 1
+    }
+    for label, group_commit in [("transaction per write", False), ("group commit writer", True)]:
+        database = temp_database(args.tickets, group_commit=group_commit)
+        try:
+            print_result(label, run_load(lambda i: database.create_ticket(ticket_data), args.requests, args.threads))
+            writer = database.get_pool_stats()['writer']
+            if writer:
+                print(f"      batches: {writer['batches']}, avg batch: {writer['avg_batch_size']}, "
+                      f"avg commit: {writer['avg_commit_ms']} ms, max commit: {writer['max_commit_ms']} ms")
+        finally:
+            drop_database(database)
+
+def read_workload(database: TicketDatabase, tickets: int) -> Callable[[int], None]:
+    """The GET endpoints' queries: lists, single tickets, stats and search"""
+    def operation(i: int):
+        roll = i % 4
+        if roll == 0:
+            database.get_tickets(limit=50)
+        elif roll == 1:
+            database.get_ticket(random.randint(1, tickets))
+        elif roll == 2:
+            database.get_ticket_stats()
+        else:
+            database.search_tickets(random.choice(['login', 'billing', 'crash', 'invoice']), limit=20)
+    return operation
+
+def bench_reads(args):
+    """Read throughput while writes run: reads on the read-write pool versus the read-only pool"""
+    print(f"📖 Reads under write load: {args.tickets} tickets, {args.threads} threads, pool size {args.pool_size}")
+    for label, shared in [("shared read-write pool", True), ("read-only pool", False)]:
+        database = temp_database(args.tickets, pool_size=args.pool_size, read_pool_size=args.pool_size,
+                                 group_commit=False)
+        if shared:
+            # Route reads through the read-write pool, as before the read-only pool existed
+            database.read_connection = database.connection
+        
+        stop = threading.Event()
+        writes = []
+        
+        def write_loop():
+            while not stop.is_set():
+                database.update_ticket(random.randint(1, args.tickets), {'status_id': random.randint(1, 6)}, 4)
+                writes.append(1)
+        
+        writers = [threading.Thread(target=write_loop, daemon=True) for _ in range(2)]
+        for writer in writers:
+            writer.start()
+        try:
+            started = time.perf_counter()
+            print_result(label, run_load(read_workload(database, args.tickets), args.requests, args.threads))
+            elapsed = time.perf_counter() - started
+            print(f"      concurrent writes: {len(writes) / elapsed:.0f}/s, "
+                  f"pool waits: {database.get_pool_stats()['waits']}")
+        finally:
+            stop.set()
+            for writer in writers:
+                writer.join()
+            drop_database(database)
+
+def bench_projection(args):
+    """100-ticket pages: full rows with TicketResponse versus view=summary with TicketSummary"""
+    from pydantic import TypeAdapter
+    from main import TicketResponse, projection_adapter
+    
+    print(f"🪶 Projection: {args.tickets} tickets, {args.requests} pages of 100")
+    database = temp_database(args.tickets)
+    try:
+        full_adapter = TypeAdapter(List[TicketResponse])
+        summary_fields = database.resolve_fields(list(database.SUMMARY_FIELDS))
+        summary_adapter = projection_adapter(tuple(summary_fields), False)
+        
+        for label, fields, adapter in [("full (TicketResponse)", None, full_adapter),
+                                       ("summary (TicketSummary)", summary_fields, summary_adapter)]:
+            sizes = []
+            
+            def operation(i: int):
+                rows = database.get_tickets(limit=100, offset=(i * 100) % max(args.tickets - 100, 1), fields=fields)
+                sizes.append(len(adapter.dump_json(adapter.validate_python(rows))))
+            
+            print_result(label, run_load(operation, args.requests, 1))
+            print(f"      payload: {statistics.mean(sizes) / 1024:.1f} KB per page")
+    finally:
+        drop_database(database)
+
+def bench_serialization(args):
+    """Encoding one 100-ticket page: response_model revalidation versus the validated-once orjson path"""
+    import json
+    from main import TICKET_LIST_ADAPTER, orjson
+    
+    print(f"🧾 Serialization: {args.requests} encodes of a 100-ticket page")
+    database = temp_database(max(args.tickets, 100))
+    try:
+        rows = database.get_tickets(limit=100)
+    finally:
+        drop_database(database)
+    
+    modes = [
+        ("validate + dump_python + json", lambda: json.dumps(
+            TICKET_LIST_ADAPTER.dump_python(TICKET_LIST_ADAPTER.validate_python(rows), mode='json'))),
+        ("validate + pydantic dump_json", lambda: TICKET_LIST_ADAPTER.dump_json(TICKET_LIST_ADAPTER.validate_python(rows))),
+        ("no validation, json.dumps", lambda: json.dumps(rows))
+    ]
+    if orjson is not None:
+        modes.append(("no validation, orjson", lambda: orjson.dumps(rows, option=orjson.OPT_NON_STR_KEYS)))
+    else:
+        print("   orjson is not installed; skipping the orjson mode")
+    
+    for label, encode in modes:
+        print_result(label, run_load(lambda i: encode(), args.requests, 1))
+
+def bench_export(args):
+    """Pulling every ticket: 100-row OFFSET pages versus the streaming NDJSON export"""
+    from main import ndjson_lines
+    
+    print(f"📤 Export: {args.tickets} tickets")
+    database = temp_database(args.tickets)
+    try:
+        def offset_pages():
+            for offset in range(0, args.tickets, 100):
+                database.get_tickets(limit=100, offset=offset)
+        
+        def streamed():
+            columns = list(database.TICKET_FIELDS)
+            for _ in ndjson_lines(columns, database.iter_ticket_rows(fields=columns)):
+                pass
+        
+        for label, export in [("offset pages of 100", offset_pages), ("streaming export", streamed)]:
+            tracemalloc.start()
+            started = time.perf_counter()
+            export()
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"   {label:<28} {args.tickets / elapsed:>10.0f} tickets/s   peak memory {peak / 1024 / 1024:>6.1f} MB")
+    finally:
+        drop_database(database)
+
+def bench_arrow(args):
+    """Loading every ticket client-side: parsing the NDJSON export versus reading the Arrow stream"""
+    import json
+    from main import arrow_stream, ndjson_lines, pa
+    
+    if pa is None:
+        print("❌ pyarrow is not installed")
+        return
+    
+    print(f"🏹 Arrow export: {args.tickets} tickets")
+    database = temp_database(args.tickets)
+    try:
+        columns = list(database.TICKET_FIELDS)
+        
+        def via_ndjson():
+            body = b"".join(ndjson_lines(columns, database.iter_ticket_rows(fields=columns)))
+            return [json.loads(line) for line in body.splitlines()]
+        
+        def via_arrow():
+            body = b"".join(arrow_stream(database.ticket_arrow_schema(columns),
+                                         database.iter_ticket_record_batches(fields=columns)))
+            return pa.ipc.open_stream(body).read_all()
+        
+        for label, load in [("NDJSON -> list of dicts", via_ndjson), ("Arrow IPC -> Table", via_arrow)]:
+            tracemalloc.start()
+            started = time.perf_counter()
+            load()
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"   {label:<28} {args.tickets / elapsed:>10.0f} tickets/s   peak Python memory {peak / 1024 / 1024:>6.1f} MB")
+    finally:
+        drop_database(database)
+
+def bench_read_model(args):
+    """List and detail queries over the five-way join versus the tickets_view read model"""
+    print(f"🗂️  Read model: {args.tickets} tickets, {args.threads} threads, {args.requests} requests")
+    queries = [
+        ("list of 100", lambda database, i: database.get_tickets(limit=100)),
+        ("list of 50, status filter", lambda database, i: database.get_tickets(limit=50, status_id=i % 6 + 1)),
+        ("cursor page, category", lambda database, i: database.get_tickets_page(limit=50, category_id=i % 6 + 1)),
+        ("ticket detail", lambda database, i: database.get_ticket(random.randint(1, args.tickets)))
+    ]
+    for label, read_model in [("join path", False), ("tickets_view", True)]:
+        database = temp_database(args.tickets, read_model=read_model)
+        try:
+            print(f"   {label}")
+            for query_label, query in queries:
+                print_result(f"   {query_label}", run_load(lambda i: query(database, i), args.requests, args.threads))
+            
+            bulk = [{'title': "Read model write cost", 'description': "Measures the read model cost on inserts",
+                     'user_id': 1, 'category_id': 1, 'priority_id': 1, 'status_id': 1}] * 5000
+            started = time.perf_counter()
+            database.create_tickets_bulk(bulk)
+            print(f"      bulk insert: {len(bulk) / (time.perf_counter() - started):.0f} tickets/s")
+        finally:
+            drop_database(database)
+
+def bench_hot_cache(args):
+    """GET /tickets/{id} for a small hot set with 5% updates: no cache versus the hot-ticket cache"""
+    from main import TICKET_ADAPTER, encode_json
+    
+    print(f"🔥 Hot-ticket cache: {args.tickets} tickets, {args.threads} threads, {args.requests} requests")
+    hot = random.sample(range(1, args.tickets + 1), 50)
+    for label, entries in [("no cache", 0), ("hot-ticket cache", 1024)]:
+        database = temp_database(args.tickets, ticket_cache_entries=entries)
+        
+        def operation(i: int):
+            ticket_id = random.choice(hot)
+            if i % 20 == 0:
+                database.update_ticket(ticket_id, {'status_id': random.randint(1, 6)}, 4)
+            else:
+                database.get_ticket_payload(ticket_id, lambda ticket: encode_json(ticket, TICKET_ADAPTER))
+        
+        try:
+            print_result(label, run_load(operation, args.requests, args.threads))
+            stats = database.ticket_cache.stats()
+            print(f"      hit rate: {stats['hit_rate']:.1%}, invalidations: {stats['invalidations']}, "
+                  f"stale stores skipped: {stats['stale_stores']}")
+        finally:
+            drop_database(database)
+
+def bench_conditional(args):
+    """Polling the dashboard while nothing changes: running its queries versus the ETag version check"""
+    from main import encode_json
+    
+    print(f"🏷️ Conditional GET: {args.tickets} tickets, {args.requests} polls")
+    database = temp_database(args.tickets)
+    try:
+        def full(i: int):
+            encode_json({
+                "stats": database.get_ticket_stats(),
+                "recent_tickets": database.get_tickets(limit=10, offset=0)
+            })
+        
+        print_result("dashboard queries (200)", run_load(full, args.requests, 1))
+        print_result("data version only (304)", run_load(lambda i: database.get_data_version(), args.requests, 1))
+    finally:
+        drop_database(database)
+
+def bench_include(args):
+    """20 tickets with comments and history: a query per ticket and relation versus ids= with include="""
+    print(f"📎 Embedded relations: {args.tickets} tickets with 40 history rows and 5 comments each, {args.requests} requests")
+    database = temp_database(args.tickets)
+    try:
+        with database.connection() as conn:
+            conn.executemany(
+                "INSERT INTO ticket_history (ticket_id, user_id, action, old_value, new_value) VALUES (?, 4, 'Status_Id Changed', '1', '2')",
+                [(ticket_id,) for _ in range(40) for ticket_id in range(1, args.tickets + 1)]
+            )
+            conn.executemany(
+                "INSERT INTO ticket_comments (ticket_id, user_id, comment, is_internal) VALUES (?, 4, 'Looking into this now.', 0)",
+                [(ticket_id,) for _ in range(5) for ticket_id in range(1, args.tickets + 1)]
+            )
+        
+        def separate_queries(i: int):
+            for ticket_id in random.sample(range(1, args.tickets + 1), 20):
+                database.get_ticket(ticket_id)
+                with database.read_connection() as conn:
+                    conn.execute("SELECT * FROM ticket_comments WHERE ticket_id = ? ORDER BY id", (ticket_id,)).fetchall()
+                with database.read_connection() as conn:
+                    conn.execute("SELECT * FROM ticket_history WHERE ticket_id = ? ORDER BY id", (ticket_id,)).fetchall()
+        
+        def embedded(i: int):
+            database.get_tickets_by_ids(random.sample(range(1, args.tickets + 1), 20), include=['comments', 'history'])
+        
+        print_result("3 queries per ticket", run_load(separate_queries, args.requests, 1))
+        print_result("ids + include (1 query)", run_load(embedded, args.requests, 1))
+    finally:
+        drop_database(database)
+
+def bench_tags(args):
+    """Tag filter and facet counts: LIKE scans over tickets.tags versus the ticket_tags index"""
+    words = [f"tag{i}" for i in range(200)]
+    print(f"🏷️ Tags: {args.tickets} tickets with 3 of {len(words)} tags each, {args.requests} requests")
+    database = temp_database(0)
+    try:
+        with database.connection() as conn:
+            now = datetime.now(timezone.utc)
+            conn.executemany("""
+                INSERT INTO tickets (ticket_number, title, description, user_id, category_id, priority_id, status_id, created_at, tags)
+                VALUES (?, 'Tagged ticket', 'Synthetic description for the tag benchmark.', 1, ?, 2, ?, ?, ?)
+            """, [
+                (f"BENCH-{i:07d}", random.randint(1, 6), random.randint(1, 6), database.format_timestamp(now - timedelta(minutes=i)),
+                 ",".join(random.sample(words, 3)))
+                for i in range(args.tickets)
+            ])
+        
+        def like_filter(i: int):
+            tag = random.choice(words)
+            with database.read_connection() as conn:
+                conn.execute("""
+                    SELECT t.* FROM tickets_view t
+                    WHERE ',' || t.tags || ',' LIKE ? ORDER BY t.created_at DESC, t.id DESC LIMIT 50
+                """, (f"%,{tag},%",)).fetchall()
+        
+        def like_facets(i: int):
+            counts: Dict[str, int] = {}
+            with database.read_connection() as conn:
+                for (tags,) in conn.execute("SELECT tags FROM tickets WHERE status_id = ?", (i % 6 + 1,)):
+                    for tag in tags.split(","):
+                        counts[tag] = counts.get(tag, 0) + 1
+            sorted(counts.items(), key=lambda item: -item[1])[:50]
+        
+        print_result("tag= via LIKE scan", run_load(like_filter, args.requests, 1))
+        print_result("tag= via ticket_tags", run_load(
+            lambda i: database.get_tickets(limit=50, tag=random.choice(words)), args.requests, 1))
+        print_result("facets by status, scan", run_load(like_facets, args.requests, 1))
+        print_result("facets by status, index", run_load(
+            lambda i: database.get_tag_facets(status_id=i % 6 + 1), args.requests, 1))
+    finally:
+        drop_database(database)
+
+def bench_sla(args):
+    """The SLA breach queue: scanning open tickets versus the partial due-date index, then escalation"""
+    print(f"⏰ SLA: {args.tickets} tickets, {args.requests} breach queries")
+    database = temp_database(args.tickets)
+    try:
+        with database.connection() as conn:
+            database.backfill_due_dates(conn.cursor())
+        
+        def scan(i: int):
+            with database.read_connection() as conn:
+                conn.execute(f"""
+                    SELECT id FROM tickets NOT INDEXED
+                    WHERE {database.SLA_OPEN_CLAUSE} AND due_date <= datetime('now', '+1 hours')
+                    ORDER BY due_date LIMIT 100
+                """).fetchall()
+        
+        print_result("breach queue, table scan", run_load(scan, args.requests, 1))
+        print_result("breach queue, partial index", run_load(
+            lambda i: database.get_sla_breaching(within_seconds=3600), args.requests, 1))
+        
+        start = time.perf_counter()
+        escalated = database.escalate_overdue()
+        elapsed = time.perf_counter() - start
+        print(f"   escalated {len(escalated)} overdue tickets in {elapsed * 1000:.0f} ms "
+              f"({len(escalated) / max(elapsed, 1e-9):.0f}/s, history included)")
+    finally:
+        drop_database(database)
+
+def bench_time_filters(args):
+    """Incremental sync reads: parsing each row's timestamp with datetime() versus index range scans on canonical text"""
+    print(f"🕒 Time filters: {args.tickets} tickets, the oldest 1% updated in the last 5 minutes, {args.requests} requests")
+    database = temp_database(args.tickets)
+    try:
+        with database.connection() as conn:
+            conn.execute("UPDATE tickets SET updated_at = created_at")
+            conn.execute("UPDATE tickets SET updated_at = datetime('now', '-1 minutes') WHERE id > ?", (args.tickets * 99 // 100,))
+        since = datetime.now(timezone.utc) - timedelta(minutes=5)
+        window = (datetime.now(timezone.utc) - timedelta(days=30), datetime.now(timezone.utc) - timedelta(days=29))
+        
+        def parsed(column: str, condition: str, *bounds):
+            with database.read_connection() as conn:
+                conn.execute(f"""
+                    SELECT t.* FROM tickets_view t WHERE {condition.format(column=f"datetime(t.{column})")}
+                    ORDER BY t.created_at DESC, t.id DESC LIMIT 50
+                """, [database.format_timestamp(bound) for bound in bounds]).fetchall()
+        
+        print_result("updated_since, datetime() scan", run_load(
+            lambda i: parsed("updated_at", "{column} >= ?", since), args.requests, 1))
+        print_result("updated_since, index range", run_load(
+            lambda i: database.get_tickets(limit=50, updated_since=since), args.requests, 1))
+        print_result("1-day window, datetime() scan", run_load(
+            lambda i: parsed("created_at", "{column} >= ? AND {column} < ?", *window), args.requests, 1))
+        print_result("1-day window, index range", run_load(
+            lambda i: database.get_tickets(limit=50, created_after=window[0], created_before=window[1]), args.requests, 1))
+    finally:
+        drop_database(database)
+
+def bench_archive(args):
+    """Hot-path reads with 90% of tickets long closed: before versus after moving them to the archive"""
+    print(f"🗄️ Archive: {args.tickets} tickets, 90% closed 200 days ago, 5 history rows each, {args.requests} requests")
+    database = temp_database(args.tickets)
+    try:
+        with database.connection() as conn:
+            conn.execute("UPDATE tickets SET status_id = ?, updated_at = datetime('now', '-200 days') WHERE id % 10 != 0",
+                         (database.CLOSED_STATUS_ID,))
+            conn.executemany(
+                "INSERT INTO ticket_history (ticket_id, user_id, action, old_value, new_value) VALUES (?, 4, 'Status_Id Changed', '1', '2')",
+                [(ticket_id,) for _ in range(5) for ticket_id in range(1, args.tickets + 1)]
+            )
+        
+        now = datetime.now(timezone.utc)
+        
+        def measure(label: str):
+            print_result(f"search, {label}", run_load(lambda i: database.search_tickets("login"), args.requests, 1))
+            # A time filter makes the count scan tickets instead of reading ticket_counts
+            print_result(f"count all, {label}", run_load(lambda i: database.count_tickets(created_before=now), args.requests, 1))
+        
+        measure("everything hot")
+        
+        start = time.perf_counter()
+        archived = database.archive_closed_tickets(older_than_days=90)
+        elapsed = time.perf_counter() - start
+        print(f"   archived {archived} tickets in {elapsed:.1f} s ({archived / max(elapsed, 1e-9):.0f}/s)")
+        
+        measure("after archival")
+        print_result("get hot ticket", run_load(lambda i: database.get_ticket(10 * (i % (args.tickets // 10) + 1)), args.requests, 1))
+        print_result("get archived ticket", run_load(lambda i: database.get_ticket(10 * (i % (args.tickets // 10)) + 1), args.requests, 1))
+        print_result("search incl. archive", run_load(lambda i: database.search_tickets("login", include_archived=True), args.requests, 1))
+    finally:
+        drop_database(database)
+
+def bench_history(args):
+    """ticket_history compaction: rows and history reads before and after, and write latency while it runs"""
+    print(f"🗜️ History compaction: {args.tickets} tickets, 4 status changes on each of 3 days in the last 120 days")
+    now = datetime.now(timezone.utc)
+    for label, batch_size in [("one transaction", 10 ** 9), ("batches of 250 rows", 250)]:
+        database = temp_database(args.tickets)
+        try:
+            with database.connection() as conn:
+                conn.executemany(
+                    "INSERT INTO ticket_history (ticket_id, user_id, action, old_value, new_value, created_at) "
+                    "VALUES (?, 4, 'Status_Id Changed', ?, ?, ?)",
+                    [
+                        (ticket_id, str(change + 1), str(change + 2),
+                         database.format_timestamp(now - timedelta(days=day, minutes=10 * change)))
+                        for ticket_id in range(1, args.tickets + 1)
+                        for day in random.sample(range(120), 3)
+                        for change in range(4)
+                    ]
+                )
+            rows_before = database.get_history_stats()['rows']
+            print(f"   {label}:")
+            print_result("history page, field-level", run_load(
+                lambda i: database.get_ticket_related(i % args.tickets + 1, 'history'), args.requests, 1))
+            
+            # A steady trickle of API writes, timed while compaction competes for the writer
+            latencies: List[float] = []
+            done = threading.Event()
+            
+            def write_load():
+                i = 0
+                while not done.is_set():
+                    started = time.perf_counter()
+                    database.update_ticket(i % args.tickets + 1, {'priority_id': i % 4 + 1}, 4)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    i += 1
+                    time.sleep(0.001)
+            
+            writer = threading.Thread(target=write_load)
+            writer.start()
+            start = time.perf_counter()
+            removed = database.compact_history(batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            done.set()
+            writer.join()
+            
+            latencies.sort()
+            print(f"      compacted {rows_before} -> {rows_before - removed} rows in {elapsed:.1f} s; "
+                  f"concurrent updates p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f} ms, max {latencies[-1]:.1f} ms")
+            print_result("history page, compacted", run_load(
+                lambda i: database.get_ticket_related(i % args.tickets + 1, 'history'), args.requests, 1))
+        finally:
+            drop_database(database)
+
+def raw_timeseries(database: TicketDatabase, start: str):
+    """Daily created/resolved/escalated counts per category, grouped from tickets and ticket_history"""
+    events = database.status_event_sql("h.")
+    with database.read_connection() as conn:
+        conn.execute(f"""
+            SELECT day, category_id, SUM(created), SUM(resolved), SUM(escalated) FROM (
+                SELECT date(created_at) AS day, category_id, 1 AS created, 0 AS resolved, 0 AS escalated
+                FROM tickets WHERE created_at >= ?
+                UNION ALL
+                SELECT date(h.created_at), t.category_id, 0, {events['resolved']}, {events['escalated']}
+                FROM ticket_history h JOIN tickets t ON t.id = h.ticket_id
+                WHERE h.created_at >= ? AND ({' OR '.join(events.values())})
+            )
+            GROUP BY day, category_id
+        """, (start, start)).fetchall()
+
+def bench_rollups(args):
+    """30-day daily series per category: grouping tickets and history versus ticket_rollups"""
+    print(f"📈 Rollups: {args.tickets} tickets, a third resolved and a tenth escalated, {args.requests} requests")
+    ticket_data = {
+        'title': "Rollup write benchmark",
+        'description': "Created by the rollups benchmark",
+        'user_id': 1,
+        'category_id': 1,
+        'priority_id': 3,
+        'status_id': 1
+    }
+    database = temp_database(args.tickets)
+    try:
+        with database.connection() as conn:
+            conn.executemany("""
+                INSERT INTO ticket_history (ticket_id, user_id, action, old_value, new_value, created_at)
+                SELECT id, 4, 'Status_Id Changed', '2', ?, datetime(created_at, '+3 hours') FROM tickets WHERE id % ? = 0
+            """, [(str(database.RESOLVED_STATUS_ID), 3), (str(database.ESCALATED_STATUS_ID), 10)])
+        
+        start = database.format_timestamp(datetime.now(timezone.utc) - timedelta(days=30))
+        print_result("tickets + history", run_load(lambda i: raw_timeseries(database, start), args.requests, 1))
+        print_result("ticket_rollups", run_load(lambda i: database.get_ticket_timeseries('day', 'category'), args.requests, 1))
+        print_result("ticket_rollups, hourly", run_load(lambda i: database.get_ticket_timeseries('hour'), args.requests, 1))
+        print_result("ticket_rollups, weekly", run_load(lambda i: database.get_ticket_timeseries('week', 'category'), args.requests, 1))
+        
+        started = time.perf_counter()
+        database.rebuild_ticket_rollups()
+        print(f"   backfill from scratch: {time.perf_counter() - started:.2f} s")
+        
+        # What the triggers add to each create
+        print_result("create_ticket, rollups", run_load(lambda i: database.create_ticket(ticket_data), args.requests, args.threads))
+        with database.connection() as conn:
+            conn.execute("DROP TRIGGER trg_tickets_rollup_insert")
+            conn.execute("DROP TRIGGER trg_ticket_history_rollup_insert")
+        print_result("create_ticket, no rollups", run_load(lambda i: database.create_ticket(ticket_data), args.requests, args.threads))
+    finally:
+        drop_database(database)
+
+SCENARIOS = {
+    'pool': bench_pool,
+    'pagination': bench_pagination,
+    'async': bench_async,
+    'stats': bench_stats,
+    'bulk': bench_bulk,
+    'writes': bench_writes,
+    'reads': bench_reads,
+    'projection': bench_projection,
+    'serialization': bench_serialization,
+    'export': bench_export,
+    'arrow': bench_arrow,
+    'readmodel': bench_read_model,
+    'hotcache': bench_hot_cache,
+    'conditional': bench_conditional,
+    'include': bench_include,
+    'tags': bench_tags,
+    'sla': bench_sla,
+    'timefilters': bench_time_filters,
+    'archive': bench_archive,
+    'history': bench_history,
+    'rollups': bench_rollups
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Ticket Management System benchmarks")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS), help="Benchmark to run")
+    parser.add_argument("--tickets", type=int, default=5000, help="Number of seeded tickets")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent worker threads")
+    parser.add_argument("--requests", type=int, default=4000, help="Operations to run per mode")
+    parser.add_argument("--pool-size", type=int, default=8, help="Connection pool size")
+    parser.add_argument("--port", type=int, default=8765, help="Port for scenarios that start a server")
+    args = parser.parse_args()
+    
+    print("🚀 Ticket Management System - Benchmarks")
+    print("=" * 50)
+    SCENARIOS[args.scenario](args)
+
+if __name__ == "__main__":
+    main()
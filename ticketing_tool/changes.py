@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Change Feed for Ticket Management System
+Fans new ticket_history rows out to Server-Sent Events subscribers
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from database import AsyncTicketDatabase, get_async_db
+
+# Seconds between ticket_history polls while anyone is subscribed (writes in this process skip the wait)
+DEFAULT_POLL_INTERVAL = 0.5
+
+# Seconds without changes before a subscriber gets an empty batch (used for SSE keepalives)
+DEFAULT_KEEPALIVE = 15.0
+
+class ChangeFeed:
+    """Shared ticket_history poller with one queue per subscriber
+
+    A single background task reads the rows after the last id it has seen and
+    hands each batch to every subscriber, so any number of open streams costs
+    one indexed range query per interval. Writes made through this process
+    call ``notify()`` to poll at once; writes from other processes show up
+    within ``interval`` seconds. A subscriber that falls ``max_pending``
+    batches behind is disconnected and can resume from its last id.
+    """
+
+    def __init__(self, database: AsyncTicketDatabase, interval: float = DEFAULT_POLL_INTERVAL,
+                 batch_size: int = 500, max_pending: int = 100):
+        self.database = database
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self.last_id: Optional[int] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._stats = {'polls': 0, 'published': 0, 'dropped_subscribers': 0}
+
+    def notify(self):
+        """Poll now instead of waiting for the next interval"""
+        self._wake.set()
+
+    async def subscribe(self, since: Optional[int] = None,
+                        keepalive: float = DEFAULT_KEEPALIVE) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield batches of changes after ``since`` (default: only new ones), or [] every ``keepalive`` idle seconds
+
+        The subscriber is registered before catching up from the database, and
+        batches are filtered by id, so nothing is missed or repeated between
+        the catch-up reads and the live feed.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending)
+        self._subscribers.add(queue)
+        self._start()
+        try:
+            if since is None:
+                since = await self.database.latest_change_id()
+
+            while True:
+                changes = await self.database.get_changes(since, self.batch_size)
+                if changes:
+                    since = changes[-1]['id']
+                    yield changes
+                if len(changes) < self.batch_size:
+                    break
+
+            while True:
+                try:
+                    changes = await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield []
+                    continue
+                if changes is None:
+                    return
+
+                changes = [change for change in changes if change['id'] > since]
+                if changes:
+                    since = changes[-1]['id']
+                    yield changes
+        finally:
+            self._subscribers.discard(queue)
+
+    def _start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        try:
+            while self._subscribers:
+                try:
+                    if self.last_id is None:
+                        self.last_id = await self.database.latest_change_id()
+                    changes = await self.database.get_changes(self.last_id, self.batch_size)
+                    self._stats['polls'] += 1
+                except Exception as e:
+                    print(f"❌ Change feed poll failed: {e}")
+                    changes = []
+
+                if changes:
+                    self.last_id = changes[-1]['id']
+                    self._publish(changes)
+                    if len(changes) == self.batch_size:
+                        continue
+
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # Nobody is listening: start again from the newest row next time
+            self.last_id = None
+
+    def _publish(self, changes: List[Dict[str, Any]]):
+        self._stats['published'] += len(changes)
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(changes)
+            except asyncio.QueueFull:
+                self._disconnect(queue)
+                self._stats['dropped_subscribers'] += 1
+
+    def _disconnect(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def close(self):
+        """End every open subscription and stop polling"""
+        for queue in list(self._subscribers):
+            self._disconnect(queue)
+        if self._task is not None:
+            self._task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of feed counters"""
+        return {
+            **self._stats,
+            'subscribers': len(self._subscribers),
+            'last_id': self.last_id,
+            'interval': self.interval
+        }
+
+change_feed = ChangeFeed(get_async_db())
@@ -4,37 +4,750 @@ SQLite Database Module for Ticket Management System
 Handles database initialization, schema creation, and sample data
 """
 
+import asyncio
 import sqlite3
 import os
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+import base64
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from urllib.parse import quote
 import json
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:  # Optional: only the Arrow and Parquet exports need it
+    pa = None
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # Optional: decodes embedded comments/history faster
+    json_loads = json.loads
+
+from writer import TicketWriter
+
+# Default number of pooled connections per TicketDatabase (0 disables pooling)
+DEFAULT_POOL_SIZE = int(os.getenv("TICKETS_DB_POOL_SIZE", "8"))
+
+# Read-only connections for the GET paths (defaults to the read-write pool size)
+DEFAULT_READ_POOL_SIZE = int(os.getenv("TICKETS_DB_READ_POOL_SIZE", str(DEFAULT_POOL_SIZE)))
+
+# Seconds the reference-data cache trusts its versions before re-checking table_versions
+DEFAULT_REFERENCE_TTL = float(os.getenv("TICKETS_REFERENCE_TTL", "1.0"))
+
+# Hot-ticket cache of serialized GET /tickets/{id} responses (0 entries disables it)
+DEFAULT_TICKET_CACHE_ENTRIES = int(os.getenv("TICKETS_TICKET_CACHE_ENTRIES", "1024"))
+DEFAULT_TICKET_CACHE_BYTES = int(os.getenv("TICKETS_TICKET_CACHE_BYTES", str(8 * 1024 * 1024)))
+# Upper bound on staleness from writes made outside this process
+DEFAULT_TICKET_CACHE_TTL = float(os.getenv("TICKETS_TICKET_CACHE_TTL", "60"))
+
+# Serve ticket reads from the trigger-maintained tickets_view table instead of five-way joins
+DEFAULT_READ_MODEL = os.getenv("TICKETS_READ_MODEL", "1") != "0"
+
+# Comments or history entries embedded per ticket when a read asks for include=
+DEFAULT_INCLUDE_LIMIT = 20
+
+# Cold storage ATTACHed to every connection as "archive" (default: <database>_archive.db next to it)
+DEFAULT_ARCHIVE_PATH = os.getenv("TICKETS_ARCHIVE_PATH") or None
+# Closed tickets untouched for this many days are moved to the archive
+DEFAULT_ARCHIVE_AFTER_DAYS = float(os.getenv("TICKETS_ARCHIVE_AFTER_DAYS", "90"))
+
+# Field-level ticket_history is kept this many days, then compacted into one row per ticket, field and day
+DEFAULT_HISTORY_RETENTION_DAYS = float(os.getenv("TICKETS_HISTORY_RETENTION_DAYS", "30"))
+
+# Group commit: route writes through a single writer thread (set to 0 to write on pooled connections)
+DEFAULT_GROUP_COMMIT = os.getenv("TICKETS_DB_GROUP_COMMIT", "1") != "0"
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("TICKETS_DB_GROUP_COMMIT_BATCH", "64"))
+GROUP_COMMIT_MAX_DELAY = float(os.getenv("TICKETS_DB_GROUP_COMMIT_DELAY_MS", "2")) / 1000
+
+# Oldest SQLite library the schema and queries work with: RETURNING (3.35) for ticket numbers,
+# UPDATE ... FROM (3.33) for history compaction and datetime(x, 'auto') (3.38) for timestamp
+# normalization, which on older versions yields NULL and silently leaves values unconverted
+MIN_SQLITE_VERSION = (3, 38, 0)
+
+# Worker threads for AsyncTicketDatabase (defaults to the larger pool size)
+DEFAULT_DB_THREADS = int(os.getenv("TICKETS_DB_THREADS", "0")) or max(DEFAULT_POOL_SIZE, DEFAULT_READ_POOL_SIZE, 1)
+
+class ConnectionPool:
+    """Bounded pool of persistent SQLite connections
+    
+    Connections are opened lazily up to ``max_size`` and handed out to one
+    thread at a time. With ``max_size=0`` every checkout opens a fresh
+    connection that is closed on release (the pre-pool behaviour).
+    """
+    
+    def __init__(self, connect, max_size: int = DEFAULT_POOL_SIZE, acquire_timeout: float = 30.0):
+        self._connect = connect
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open = 0
+        self._in_use = 0
+        self._stats = {
+            'created': 0,
+            'closed': 0,
+            'acquired': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'peak_in_use': 0,
+            'total_wait_ms': 0.0
+        }
+    
+    def acquire(self) -> sqlite3.Connection:
+        """Check out a connection, opening one if the pool is not full"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+        
+        if conn is None:
+            with self._lock:
+                can_open = self.max_size == 0 or self._open < self.max_size
+                if can_open:
+                    self._open += 1
+                    self._stats['created'] += 1
+            
+            if can_open:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._open -= 1
+                    raise
+            else:
+                started = time.perf_counter()
+                with self._lock:
+                    self._stats['waits'] += 1
+                try:
+                    conn = self._idle.get(timeout=self.acquire_timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._stats['timeouts'] += 1
+                    raise TimeoutError(f"No database connection available after {self.acquire_timeout}s")
+                finally:
+                    with self._lock:
+                        self._stats['total_wait_ms'] += (time.perf_counter() - started) * 1000
+        
+        with self._lock:
+            self._in_use += 1
+            self._stats['acquired'] += 1
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._in_use)
+        return conn
+    
+    def release(self, conn: sqlite3.Connection):
+        """Return a connection to the pool (or close it when pooling is disabled)"""
+        with self._lock:
+            self._in_use -= 1
+        
+        if self.max_size == 0:
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+    
+    def _discard(self, conn: sqlite3.Connection):
+        conn.close()
+        with self._lock:
+            self._open -= 1
+            self._stats['closed'] += 1
+    
+    def close(self):
+        """Close all idle connections"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool counters"""
+        with self._lock:
+            return {
+                'max_size': self.max_size,
+                'open': self._open,
+                'in_use': self._in_use,
+                'idle': self._idle.qsize(),
+                **self._stats,
+                'total_wait_ms': round(self._stats['total_wait_ms'], 3)
+            }
+
+class ReferenceDataCache:
+    """In-memory copy of the small reference tables with O(1) ID lookups
+    
+    Each table is tagged with its row in ``table_versions``, which triggers
+    bump on every insert, update or delete (including writes from other
+    processes). Versions are re-read at most once per ``ttl`` seconds, and a
+    lookup miss always re-checks them so new rows are never rejected.
+    """
+    
+    QUERIES = {
+        'users': "SELECT * FROM users ORDER BY full_name",
+        'categories': "SELECT * FROM categories ORDER BY name",
+        'priority_levels': "SELECT * FROM priority_levels ORDER BY sla_hours",
+        'statuses': "SELECT * FROM statuses WHERE is_active = 1 ORDER BY name"
+    }
+    
+    def __init__(self, database: 'TicketDatabase', ttl: float = DEFAULT_REFERENCE_TTL):
+        self.database = database
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._versions: Dict[str, int] = {}
+        self._checked_at = 0.0
+        self._stats = {'hits': 0, 'loads': 0, 'version_checks': 0}
+    
+    def _refresh_versions(self, force: bool = False):
+        if not force and time.monotonic() - self._checked_at < self.ttl:
+            return
+        
+        tables = list(self.QUERIES)
+        with self.database.read_connection() as conn:
+            rows = conn.execute(
+                f"SELECT name, version FROM table_versions WHERE name IN ({', '.join('?' * len(tables))})",
+                tables
+            ).fetchall()
+        
+        with self._lock:
+            self._versions = {row['name']: row['version'] for row in rows}
+            self._checked_at = time.monotonic()
+            self._stats['version_checks'] += 1
+    
+    def _entry(self, table: str, force: bool = False) -> Dict[str, Any]:
+        self._refresh_versions(force)
+        version = self._versions.get(table)
+        entry = self._entries.get(table)
+        if entry is not None and entry['version'] == version:
+            self._stats['hits'] += 1
+            return entry
+        
+        with self.database.read_connection() as conn:
+            rows = [dict(row) for row in conn.execute(self.QUERIES[table]).fetchall()]
+        
+        entry = {
+            'version': version,
+            'rows': rows,
+            'by_id': {row['id']: row for row in rows},
+            'payloads': {}
+        }
+        with self._lock:
+            self._entries[table] = entry
+            self._stats['loads'] += 1
+        return entry
+    
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        """All rows of a reference table (copies, safe to modify)"""
+        return [dict(row) for row in self._entry(table)['rows']]
+    
+    def get(self, table: str, row_id: Optional[int]) -> Optional[Dict[str, Any]]:
+        """Look up one reference row by ID"""
+        row = self._entry(table)['by_id'].get(row_id)
+        if row is None:
+            # A miss may be a row added since the last version check
+            row = self._entry(table, force=True)['by_id'].get(row_id)
+        return dict(row) if row else None
+    
+    def exists(self, table: str, row_id: Optional[int]) -> bool:
+        """Check that a reference ID exists"""
+        if row_id in self._entry(table)['by_id']:
+            return True
+        return row_id in self._entry(table, force=True)['by_id']
+    
+    def versions(self) -> Dict[str, int]:
+        """Current table versions (re-read at most once per ttl)"""
+        self._refresh_versions()
+        return self._versions
+    
+    def ids(self, table: str):
+        """Current set of IDs for a table (a live view; do not hold across requests)"""
+        return self._entry(table)['by_id'].keys()
+    
+    def payload(self, table: str, key: str, build):
+        """Return ``build(rows)`` cached until the table's version changes"""
+        entry = self._entry(table)
+        if key not in entry['payloads']:
+            entry['payloads'][key] = build(entry['rows'])
+        return entry['payloads'][key]
+    
+    def invalidate(self):
+        """Drop every cached table"""
+        with self._lock:
+            self._entries.clear()
+            self._checked_at = 0.0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache counters and cached table versions"""
+        with self._lock:
+            return {
+                **self._stats,
+                'tables': {table: entry['version'] for table, entry in self._entries.items()}
+            }
+
+class TicketCache:
+    """Bounded LRU cache of serialized ticket records
+    
+    Entries are limited both by count and by total payload bytes; the least
+    recently used ones are evicted first. Writes call ``invalidate`` after
+    they commit. A reader takes a ``token`` before querying and ``put`` drops
+    the payload if that ticket was invalidated since, so a read that raced a
+    write can never re-insert the old version. Entries also expire after
+    ``ttl`` seconds to bound staleness from writes made by other processes.
+    """
+    
+    # Per-ticket invalidation epochs remembered for in-flight reads
+    MAX_TRACKED_INVALIDATIONS = 4096
+    
+    def __init__(self, max_entries: int = DEFAULT_TICKET_CACHE_ENTRIES,
+                 max_bytes: int = DEFAULT_TICKET_CACHE_BYTES, ttl: float = DEFAULT_TICKET_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[int, Tuple[bytes, float]]' = OrderedDict()
+        self._bytes = 0
+        self._epoch = 0
+        self._invalidated: 'OrderedDict[int, int]' = OrderedDict()
+        self._forgotten_epoch = 0
+        self._versions: Optional[Dict[str, int]] = None
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'stores': 0,
+            'stale_stores': 0,
+            'evictions': 0,
+            'invalidations': 0,
+            'clears': 0
+        }
+    
+    def token(self) -> int:
+        """Mark the start of a read whose result may be stored with ``put``"""
+        with self._lock:
+            return self._epoch
+    
+    def get(self, ticket_id: int) -> Optional[bytes]:
+        """Return the cached payload and mark it most recently used"""
+        with self._lock:
+            entry = self._entries.get(ticket_id)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            
+            payload, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                self._remove(ticket_id)
+                self._stats['expired'] += 1
+                self._stats['misses'] += 1
+                return None
+            
+            self._entries.move_to_end(ticket_id)
+            self._stats['hits'] += 1
+            return payload
+    
+    def put(self, ticket_id: int, payload: bytes, token: int) -> bool:
+        """Store a payload read after ``token`` unless the ticket changed since"""
+        if self.max_entries <= 0 or len(payload) > self.max_bytes:
+            return False
+        
+        with self._lock:
+            if self._invalidated.get(ticket_id, self._forgotten_epoch) > token:
+                self._stats['stale_stores'] += 1
+                return False
+            
+            if ticket_id in self._entries:
+                self._remove(ticket_id)
+            self._entries[ticket_id] = (payload, time.monotonic())
+            self._bytes += len(payload)
+            self._stats['stores'] += 1
+            
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+            return True
+    
+    def invalidate(self, ticket_id: int):
+        """Drop a ticket after a committed write"""
+        with self._lock:
+            self._epoch += 1
+            self._invalidated[ticket_id] = self._epoch
+            self._invalidated.move_to_end(ticket_id)
+            if len(self._invalidated) > self.MAX_TRACKED_INVALIDATIONS:
+                _, self._forgotten_epoch = self._invalidated.popitem(last=False)
+            
+            if ticket_id in self._entries:
+                self._remove(ticket_id)
+            self._stats['invalidations'] += 1
+    
+    def sync_versions(self, versions: Dict[str, int]):
+        """Clear everything when reference data (names, colors) changed"""
+        if versions == self._versions:
+            return
+        with self._lock:
+            if self._versions is not None:
+                self._epoch += 1
+                self._forgotten_epoch = self._epoch
+                self._invalidated.clear()
+                self._entries.clear()
+                self._bytes = 0
+                self._stats['clears'] += 1
+            self._versions = dict(versions)
+    
+    def _remove(self, ticket_id: int):
+        payload, _ = self._entries.pop(ticket_id)
+        self._bytes -= len(payload)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache counters and occupancy"""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_rate': round(self._stats['hits'] / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl
+            }
+
 class TicketDatabase:
-    def __init__(self, db_path: str = "tickets.db"):
+    # Applied to every connection when it is opened
+    CONNECTION_PRAGMAS = {
+        'synchronous': 'NORMAL',       # Safe with WAL, avoids an fsync per commit
+        'cache_size': -16000,          # ~16 MB page cache per connection
+        'mmap_size': 268435456,        # 256 MB memory-mapped I/O
+        'busy_timeout': 5000,          # Wait up to 5s for locks instead of failing
+        'temp_store': 'MEMORY'
+    }
+    
+    # Read-only connections get a bigger page cache and refuse writes
+    READ_CONNECTION_PRAGMAS = {
+        **CONNECTION_PRAGMAS,
+        'cache_size': -64000,          # ~64 MB page cache per read connection
+        'query_only': 1
+    }
+    
+    # Ticket columns plus the joined reference-data names shown by the API
+    TICKET_COLUMNS = """
+        t.*,
+        u.username as user_username,
+        u.full_name as user_full_name,
+        c.name as category_name,
+        p.name as priority_name,
+        p.color as priority_color,
+        s.name as status_name,
+        s.color as status_color,
+        a.username as assigned_username,
+        a.full_name as assigned_full_name
+    """
+    
+    TICKET_JOINS = """
+        JOIN users u ON t.user_id = u.id
+        JOIN categories c ON t.category_id = c.id
+        JOIN priority_levels p ON t.priority_id = p.id
+        JOIN statuses s ON t.status_id = s.id
+        LEFT JOIN users a ON t.assigned_to = a.id
+    """
+    
+    # Projectable API fields: SQL expression and the join alias it needs (None for tickets columns)
+    TICKET_FIELDS = {
+        'id': ("t.id", None),
+        'ticket_number': ("t.ticket_number", None),
+        'title': ("t.title", None),
+        'description': ("t.description", None),
+        'user_id': ("t.user_id", None),
+        'user_username': ("u.username", 'u'),
+        'user_full_name': ("u.full_name", 'u'),
+        'category_id': ("t.category_id", None),
+        'category_name': ("c.name", 'c'),
+        'priority_id': ("t.priority_id", None),
+        'priority_name': ("p.name", 'p'),
+        'priority_color': ("p.color", 'p'),
+        'status_id': ("t.status_id", None),
+        'status_name': ("s.name", 's'),
+        'status_color': ("s.color", 's'),
+        'assigned_to': ("t.assigned_to", None),
+        'assigned_username': ("a.username", 'a'),
+        'assigned_full_name': ("a.full_name", 'a'),
+        'created_at': ("t.created_at", None),
+        'updated_at': ("t.updated_at", None),
+        'resolved_at': ("t.resolved_at", None),
+        'due_date': ("t.due_date", None),
+        'tags': ("t.tags", None)
+    }
+    
+    FIELD_JOINS = {
+        'u': "JOIN users u ON t.user_id = u.id",
+        'c': "JOIN categories c ON t.category_id = c.id",
+        'p': "JOIN priority_levels p ON t.priority_id = p.id",
+        's': "JOIN statuses s ON t.status_id = s.id",
+        'a': "LEFT JOIN users a ON t.assigned_to = a.id"
+    }
+    
+    # Reference tables copied into tickets_view: the ticket columns pointing at each one
+    # and the columns whose changes have to be copied
+    READ_MODEL_SOURCES = {
+        'users': (('user_id', 'assigned_to'), "id, username, full_name"),
+        'categories': (('category_id',), "id, name"),
+        'priority_levels': (('priority_id',), "id, name, color"),
+        'statuses': (('status_id',), "id, name, color")
+    }
+    
+    # Rows fetched per fetchmany() call when streaming exports
+    EXPORT_BATCH_SIZE = 1000
+    
+    # Column types for Arrow exports; every other field is a string
+    INTEGER_FIELDS = {'id', 'user_id', 'category_id', 'priority_id', 'status_id', 'assigned_to'}
+    TIMESTAMP_FIELDS = {'created_at', 'updated_at', 'resolved_at', 'due_date'}
+    
+    # Parquet partition granularities: created_at strftime format per level
+    PARQUET_PARTITIONS = {'year': '%Y', 'month': '%Y-%m', 'day': '%Y-%m-%d'}
+    
+    # What the ticket list view shows (no description)
+    SUMMARY_FIELDS = (
+        'id', 'ticket_number', 'title', 'user_full_name', 'category_id', 'category_name',
+        'priority_id', 'priority_name', 'priority_color', 'status_id', 'status_name', 'status_color',
+        'assigned_to', 'assigned_full_name', 'created_at', 'updated_at', 'tags'
+    )
+    
+    # Status and priority IDs the statistics treat specially
+    OPEN_STATUS_IDS = (1, 2, 3)
+    RESOLVED_STATUS_ID = 4
+    CRITICAL_PRIORITY_ID = 1
+    
+    # Statuses whose due dates can breach (Waiting for Customer is on hold) and where overdue tickets go
+    SLA_STATUS_IDS = (1, 2)
+    ESCALATED_STATUS_ID = 6
+    # WHERE terms of the partial due-date index (tickets are escalated at most once); queries repeat them
+    # verbatim and name the index with INDEXED BY, since without ANALYZE statistics the planner prefers
+    # idx_tickets_status_id and sorts
+    SLA_OPEN_CLAUSE = (
+        f"status_id IN ({', '.join(map(str, SLA_STATUS_IDS))}) AND due_date IS NOT NULL AND escalated_at IS NULL"
+    )
+    
+    # What GET /sla/breaching returns per ticket
+    SLA_FIELDS = (*SUMMARY_FIELDS, 'due_date')
+    
+    # ticket_rollups columns counting status changes -> the status a change moves the ticket into
+    ROLLUP_STATUS_EVENTS = {'resolved': RESOLVED_STATUS_ID, 'escalated': ESCALATED_STATUS_ID}
+    # ticket_history actions that record a status change (updates, the SLA job, sample data written by name)
+    STATUS_CHANGE_ACTIONS = ('Status_Id Changed', 'SLA Escalated', 'Status Changed')
+    
+    # Granularities ticket_rollups keeps: period -> SQL template for the start of the period holding a time
+    ROLLUP_PERIODS = {
+        'hour': "strftime('%Y-%m-%d %H:00:00', {})",
+        'day': "datetime({}, 'start of day')"
+    }
+    # Time series buckets: name -> (period summed, SQL template for the bucket holding a period start, default span)
+    ROLLUP_BUCKETS = {
+        'hour': ('hour', "{}", timedelta(days=2)),
+        'day': ('day', "{}", timedelta(days=30)),
+        'week': ('day', "datetime({}, 'weekday 0', '-6 days')", timedelta(weeks=12))
+    }
+    # Time series breakdowns: name -> (ticket_rollups column, reference table holding the names)
+    ROLLUP_GROUPS = {'category': ('category_id', 'categories'), 'priority': ('priority_id', 'priority_levels')}
+    
+    # How every stored timestamp is written: UTC to the second, as CURRENT_TIMESTAMP and datetime() produce
+    TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+    
+    # Timestamp columns kept in TIMESTAMP_FORMAT by triggers and normalize_timestamps()
+    TIMESTAMP_COLUMNS = {
+        'tickets': ('created_at', 'updated_at', 'resolved_at', 'due_date'),
+        'ticket_comments': ('created_at',),
+        'ticket_history': ('created_at',)
+    }
+    
+    # Child rows ticket reads can embed: relation -> (FROM clause, row alias, key -> SQL expression)
+    TICKET_RELATIONS = {
+        'comments': ("ticket_comments c LEFT JOIN users u ON c.user_id = u.id", "c", {
+            'id': "c.id",
+            'user_id': "c.user_id",
+            'user_full_name': "u.full_name",
+            'comment': "c.comment",
+            'is_internal': "c.is_internal",
+            'created_at': "c.created_at"
+        }),
+        'history': ("ticket_history h LEFT JOIN users u ON h.user_id = u.id", "h", {
+            'id': "h.id",
+            'user_id': "h.user_id",
+            'user_full_name': "u.full_name",
+            'action': "h.action",
+            'old_value': "h.old_value",
+            'new_value': "h.new_value",
+            'change_count': "COALESCE(h.change_count, 1)",
+            'created_at': "h.created_at"
+        })
+    }
+    
+    # Relation keys encoded as JSON booleans rather than 0/1
+    BOOLEAN_RELATION_KEYS = {'is_internal'}
+    
+    # Tables whose changes bump table_versions (reference data, tickets and their child rows, for ETags)
+    VERSIONED_TABLES = (*ReferenceDataCache.QUERIES, 'tickets', 'ticket_comments', 'ticket_history')
+    
+    # Per-row insert triggers that insert_tickets suspends and replaces with maintain_inserted_tickets
+    BULK_INSERT_TRIGGERS = (
+        'trg_tickets_version_insert', 'trg_tickets_sequence_insert', 'trg_tickets_counts_insert',
+        'trg_tickets_fts_insert', 'trg_tickets_tags_insert', 'trg_tickets_rollup_insert', 'trg_tickets_view_insert',
+        'trg_ticket_history_version_insert', 'trg_ticket_history_rollup_insert'
+    )
+    
+    # bm25 weights for the tickets_fts columns: title, description, tags, comments
+    SEARCH_RANK = "bm25(10.0, 1.0, 5.0, 0.5)"
+    
+    # Column definitions of tables holding whole API tickets (tickets_view, archive.tickets), in TICKET_FIELDS order
+    DENORMALIZED_TICKET_COLUMNS = """
+        id INTEGER PRIMARY KEY,
+        ticket_number VARCHAR(20) NOT NULL,
+        title VARCHAR(200) NOT NULL,
+        description TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        user_username VARCHAR(50),
+        user_full_name VARCHAR(100),
+        category_id INTEGER NOT NULL,
+        category_name VARCHAR(100),
+        priority_id INTEGER NOT NULL,
+        priority_name VARCHAR(50),
+        priority_color VARCHAR(20),
+        status_id INTEGER NOT NULL,
+        status_name VARCHAR(50),
+        status_color VARCHAR(20),
+        assigned_to INTEGER,
+        assigned_username VARCHAR(50),
+        assigned_full_name VARCHAR(100),
+        created_at TIMESTAMP,
+        updated_at TIMESTAMP,
+        resolved_at TIMESTAMP,
+        due_date TIMESTAMP,
+        tags TEXT
+    """
+    
+    # Status whose tickets can be archived
+    CLOSED_STATUS_ID = 5
+    
+    # Child rows moved to the archive with their ticket: table -> columns copied
+    ARCHIVED_CHILD_TABLES = {
+        'ticket_comments': ('id', 'ticket_id', 'user_id', 'comment', 'is_internal', 'created_at'),
+        'ticket_history': ('id', 'ticket_id', 'user_id', 'action', 'old_value', 'new_value', 'change_count', 'created_at')
+    }
+    
+    def __init__(self, db_path: str = "tickets.db", pool_size: int = DEFAULT_POOL_SIZE,
+                 group_commit: bool = DEFAULT_GROUP_COMMIT, read_pool_size: int = DEFAULT_READ_POOL_SIZE,
+                 read_model: bool = DEFAULT_READ_MODEL, ticket_cache_entries: int = DEFAULT_TICKET_CACHE_ENTRIES,
+                 ticket_cache_bytes: int = DEFAULT_TICKET_CACHE_BYTES, archive_path: Optional[str] = DEFAULT_ARCHIVE_PATH):
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or newer is required, "
+                f"but Python's sqlite3 module uses {sqlite3.sqlite_version}"
+            )
+        
         self.db_path = db_path
+        self.archive_path = archive_path or f"{os.path.splitext(db_path)[0]}_archive.db"
+        self.read_model = read_model
+        self.ticket_cache = TicketCache(max_entries=ticket_cache_entries, max_bytes=ticket_cache_bytes)
+        self.pool = ConnectionPool(self.get_connection, max_size=pool_size)
+        self.read_pool = ConnectionPool(self.get_read_connection, max_size=read_pool_size)
+        self.reference = ReferenceDataCache(self)
+        self.writer: Optional[TicketWriter] = None
         self.init_database()
+        
+        if group_commit:
+            self.writer = TicketWriter(
+                self.get_connection,
+                max_batch=GROUP_COMMIT_MAX_BATCH,
+                max_delay=GROUP_COMMIT_MAX_DELAY
+            )
+        
+        # First start since the timestamp triggers were added: convert existing rows in batches
+        if self.timestamps_pending:
+            changed = self.normalize_timestamps()
+            if changed:
+                print(f"✅ Normalized timestamps on {changed} rows")
     
     def get_connection(self):
-        """Get a database connection"""
-        conn = sqlite3.connect(self.db_path)
+        """Open a new, tuned database connection"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
         conn.row_factory = sqlite3.Row  # Enable dict-like access
+        for pragma, value in self.CONNECTION_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        conn.execute("ATTACH DATABASE ? AS archive", (self.archive_path,))
         return conn
     
+    def get_read_connection(self):
+        """Open a new read-only connection (mode=ro URI plus query_only)"""
+        uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for pragma, value in self.READ_CONNECTION_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        conn.execute("ATTACH DATABASE ? AS archive", (f"file:{quote(os.path.abspath(self.archive_path))}?mode=ro",))
+        return conn
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection; commits on success and rolls back on error"""
+        conn = self.pool.acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self.pool.release(conn)
+    
+    @contextmanager
+    def read_connection(self):
+        """Borrow a read-only pooled connection for SELECTs
+        
+        In WAL mode each statement reads the latest committed snapshot, so
+        these never wait on the writer or on read-write pool checkouts.
+        """
+        conn = self.read_pool.acquire()
+        try:
+            yield conn
+        finally:
+            self.read_pool.release(conn)
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool, read pool and writer statistics"""
+        stats = self.pool.stats()
+        stats['db_path'] = self.db_path
+        stats['read_pool'] = self.read_pool.stats()
+        stats['writer'] = self.writer.stats() if self.writer else None
+        return stats
+    
+    def close(self):
+        """Stop the writer thread and close all pooled connections"""
+        if self.writer:
+            self.writer.close()
+        self.pool.close()
+        self.read_pool.close()
+    
     def init_database(self):
         """Initialize database with schema and sample data"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Create tables
-        self.create_tables(cursor)
-        
-        # Insert sample data if tables are empty
-        if self.is_empty(cursor):
-            self.insert_sample_data(cursor)
+        with self.connection() as conn:
+            # WAL lets readers proceed while a writer commits; the mode is persistent
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA archive.journal_mode = WAL")
+            cursor = conn.cursor()
+            
+            # Create tables
+            self.create_tables(cursor)
+            
+            # Insert sample data if tables are empty
+            if self.is_empty(cursor):
+                self.insert_sample_data(cursor)
         
-        conn.commit()
-        conn.close()
         print(f"✅ Database initialized: {self.db_path}")
     
     def create_tables(self, cursor):
@@ -104,6 +817,7 @@ class TicketDatabase:
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 resolved_at TIMESTAMP,
                 due_date TIMESTAMP,
+                escalated_at TIMESTAMP,
                 tags TEXT,
                 FOREIGN KEY (user_id) REFERENCES users (id),
                 FOREIGN KEY (category_id) REFERENCES categories (id),
@@ -136,6 +850,7 @@ class TicketDatabase:
                 action VARCHAR(100) NOT NULL,
                 old_value TEXT,
                 new_value TEXT,
+                change_count INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (ticket_id) REFERENCES tickets (id),
                 FOREIGN KEY (user_id) REFERENCES users (id)
@@ -147,8 +862,669 @@ class TicketDatabase:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_status_id ON tickets(status_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_priority_id ON tickets(priority_id)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_category_id ON tickets(category_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_created_at ON tickets(created_at)")
+        # (created_at, id) matches the list sort order and backs keyset pagination
+        cursor.execute("DROP INDEX IF EXISTS idx_tickets_created_at")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_created_at_id ON tickets(created_at, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_updated_at ON tickets(updated_at)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_ticket_comments_ticket_id ON ticket_comments(ticket_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ticket_history_ticket_id ON ticket_history(ticket_id)")
+        
+        self.create_version_tracking(cursor)
+        self.create_sequences(cursor)
+        self.create_ticket_counts(cursor)
+        self.create_search_index(cursor)
+        self.create_tag_index(cursor)
+        self.create_sla_index(cursor)
+        self.create_due_date_triggers(cursor)
+        self.create_timestamp_triggers(cursor)
+        self.create_archive(cursor)
+        self.create_history_compaction(cursor)
+        self.create_ticket_rollups(cursor)
+        
+        if self.read_model:
+            self.create_read_model(cursor)
+        else:
+            # Without readers the table and its triggers would only slow writes down
+            self.drop_read_model(cursor)
+    
+    def create_sequences(self, cursor):
+        """Create the sequence table used to allocate ticket numbers"""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS sequences (
+                name VARCHAR(50) PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        """)
+        
+        # Start after the highest existing TKT- number (one scan, only when the row is new)
+        cursor.execute("""
+            INSERT OR IGNORE INTO sequences (name, value)
+            SELECT 'ticket_number', COALESCE(MAX(CAST(substr(ticket_number, 5) AS INTEGER)), 0)
+            FROM tickets WHERE ticket_number GLOB 'TKT-[0-9]*'
+        """)
+        
+        # Numbers written by other tools (sample data, populate scripts) push the sequence forward
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_tickets_sequence_insert AFTER INSERT ON tickets
+            WHEN new.ticket_number GLOB 'TKT-[0-9]*'
+            BEGIN
+                UPDATE sequences
+                SET value = MAX(value, CAST(substr(new.ticket_number, 5) AS INTEGER))
+                WHERE name = 'ticket_number';
+            END
+        """)
+    
+    def create_ticket_counts(self, cursor):
+        """Create the ticket_counts table and the triggers that maintain it
+        
+        One row per (status, priority, category) combination holds the number of
+        tickets in it, so every statistic is a sum over at most a few hundred rows.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'ticket_counts'")
+        exists = cursor.fetchone() is not None
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ticket_counts (
+                status_id INTEGER NOT NULL,
+                priority_id INTEGER NOT NULL,
+                category_id INTEGER NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (status_id, priority_id, category_id)
+            ) WITHOUT ROWID
+        """)
+        
+        increment = """
+                INSERT INTO ticket_counts (status_id, priority_id, category_id, count)
+                VALUES (new.status_id, new.priority_id, new.category_id, 1)
+                ON CONFLICT (status_id, priority_id, category_id) DO UPDATE SET count = count + 1;
+        """
+        decrement = """
+                UPDATE ticket_counts SET count = count - 1
+                WHERE status_id = old.status_id AND priority_id = old.priority_id AND category_id = old.category_id;
+        """
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tickets_counts_insert AFTER INSERT ON tickets BEGIN
+                {increment}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tickets_counts_update AFTER UPDATE OF status_id, priority_id, category_id ON tickets
+            WHEN old.status_id IS NOT new.status_id OR old.priority_id IS NOT new.priority_id OR old.category_id IS NOT new.category_id
+            BEGIN
+                {decrement}
+                {increment}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tickets_counts_delete AFTER DELETE ON tickets BEGIN
+                {decrement}
+            END
+        """)
+        
+        if not exists:
+            self.rebuild_ticket_counts(cursor)
+    
+    def create_tag_index(self, cursor):
+        """Create the ticket_tags table and the triggers that keep it in sync with tickets.tags
+        
+        One row per (tag, ticket) with tags trimmed and lowercased. status_id
+        and category_id are copied in so scoped facet counts read only an index.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'ticket_tags'")
+        exists = cursor.fetchone() is not None
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ticket_tags (
+                tag TEXT NOT NULL,
+                ticket_id INTEGER NOT NULL,
+                status_id INTEGER NOT NULL,
+                category_id INTEGER NOT NULL,
+                PRIMARY KEY (tag, ticket_id)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ticket_tags_ticket_id ON ticket_tags(ticket_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ticket_tags_status ON ticket_tags(status_id, tag)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ticket_tags_category ON ticket_tags(category_id, tag)")
+        
+        insert = f"""
+                INSERT OR IGNORE INTO ticket_tags (tag, ticket_id, status_id, category_id)
+                {self.tag_rows_select('new')};
+        """
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tickets_tags_insert AFTER INSERT ON tickets
+            WHEN new.tags IS NOT NULL AND new.tags != ''
+            BEGIN
+                {insert}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tickets_tags_update AFTER UPDATE OF tags ON tickets
+            WHEN old.tags IS NOT new.tags
+            BEGIN
+                DELETE FROM ticket_tags WHERE ticket_id = old.id;
+                {insert}
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_tickets_tags_scope AFTER UPDATE OF status_id, category_id ON tickets
+            WHEN old.status_id IS NOT new.status_id OR old.category_id IS NOT new.category_id
+            BEGIN
+                UPDATE ticket_tags SET status_id = new.status_id, category_id = new.category_id
+                WHERE ticket_id = new.id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_tickets_tags_delete AFTER DELETE ON tickets BEGIN
+                DELETE FROM ticket_tags WHERE ticket_id = old.id;
+            END
+        """)
+        
+        if not exists:
+            self.rebuild_tag_index(cursor)
+    
+    @staticmethod
+    def tag_rows_select(ticket: str, tables: str = "") -> str:
+        """SELECT of ticket_tags rows for ``ticket`` (a trigger's new row, or ``tables`` to scan, e.g. "tickets t, ")
+        
+        Triggers cannot use recursive CTEs, so the comma-separated string is
+        rewritten as a JSON array and split with json_each. Tabs and newlines
+        also separate tags; a string that still is not valid JSON yields no tags
+        rather than failing the write.
+        """
+        array = (
+            f"""'["' || replace(replace(replace(replace(replace(replace(COALESCE({ticket}.tags, ''), """
+            f"""'\\', '\\\\'), '"', '\\"'), char(9), ','), char(10), ','), char(13), ','), ',', '","') || '"]'"""
+        )
+        return (
+            f"SELECT DISTINCT lower(trim(value)), {ticket}.id, {ticket}.status_id, {ticket}.category_id "
+            f"FROM {tables}json_each(CASE WHEN json_valid({array}) THEN {array} ELSE '[]' END) "
+            f"WHERE trim(value) != ''"
+        )
+    
+    def rebuild_tag_index(self, cursor=None):
+        """Repopulate ticket_tags from tickets.tags"""
+        if cursor is None:
+            with self.connection() as conn:
+                return self.rebuild_tag_index(conn.cursor())
+        
+        cursor.execute("DELETE FROM ticket_tags")
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO ticket_tags (tag, ticket_id, status_id, category_id)
+            {self.tag_rows_select('t', "tickets t, ")} AND t.tags IS NOT NULL AND t.tags != ''
+        """)
+    
+    def create_sla_index(self, cursor):
+        """Create the partial index of breachable tickets by due date
+        
+        Only Open and In Progress tickets with a due date that were never
+        escalated are indexed, so the breach queue and the escalation job read
+        the few rows near the front of it instead of scanning resolved history,
+        and a ticket moved back to In Progress after its escalation is not
+        escalated again.
+        """
+        cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'idx_tickets_sla_due'")
+        row = cursor.fetchone()
+        exists = row is not None
+        
+        cursor.execute("SELECT 1 FROM pragma_table_info('tickets') WHERE name = 'escalated_at'")
+        if cursor.fetchone() is None:
+            cursor.execute("ALTER TABLE tickets ADD COLUMN escalated_at TIMESTAMP")
+            # Tickets the job escalated before the column existed
+            cursor.execute("""
+                UPDATE tickets SET escalated_at = h.escalated_at
+                FROM (
+                    SELECT ticket_id, MAX(created_at) AS escalated_at FROM ticket_history
+                    WHERE action = 'SLA Escalated' GROUP BY ticket_id
+                ) h
+                WHERE tickets.id = h.ticket_id
+            """)
+        if exists and 'escalated_at' not in row['sql']:
+            cursor.execute("DROP INDEX idx_tickets_sla_due")
+        
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_tickets_sla_due ON tickets(due_date) WHERE {self.SLA_OPEN_CLAUSE}")
+        
+        if not exists:
+            self.backfill_due_dates(cursor)
+    
+    def create_due_date_triggers(self, cursor):
+        """Create triggers that set due dates for every writer, not only the API insert paths
+        
+        Inserts without a due date (direct SQL, import scripts) get one from
+        the ticket's category and priority, and changing either recomputes it
+        from the creation time. The API insert paths compute it inline, so
+        the insert trigger does not fire for them.
+        """
+        due_date = self.due_date_sql(self.canonical_timestamp_sql('new.created_at'), 'new.category_id', 'new.priority_id')
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tickets_due_date_insert AFTER INSERT ON tickets
+            WHEN new.due_date IS NULL
+            BEGIN
+                UPDATE tickets SET due_date = {due_date} WHERE id = new.id;
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tickets_due_date_update AFTER UPDATE OF category_id, priority_id ON tickets
+            WHEN new.category_id IS NOT old.category_id OR new.priority_id IS NOT old.priority_id
+            BEGIN
+                UPDATE tickets SET due_date = {due_date} WHERE id = new.id;
+            END
+        """)
+    
+    @staticmethod
+    def format_timestamp(value: datetime) -> str:
+        """Stored form of a datetime; naive values are taken to be UTC already"""
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.strftime(TicketDatabase.TIMESTAMP_FORMAT)
+    
+    @staticmethod
+    def canonical_timestamp_sql(column: str) -> str:
+        """SQL for ``column`` rewritten in TIMESTAMP_FORMAT (values SQLite cannot parse are kept as they are)
+        
+        datetime() accepts ISO 8601 with a T or a space, fractional seconds and
+        UTC offsets, and with 'auto' also Unix epoch numbers.
+        """
+        return f"COALESCE(datetime({column}, 'auto'), {column})"
+    
+    def timestamp_rewrite_sql(self, table: str, row: str = "") -> Tuple[str, str]:
+        """(condition, SET assignments) that find and fix non-canonical timestamps in ``table``
+        
+        ``row`` prefixes the columns in the condition, e.g. ``new.`` inside a trigger.
+        """
+        columns = self.TIMESTAMP_COLUMNS[table]
+        condition = " OR ".join(f"{row}{column} IS NOT {self.canonical_timestamp_sql(row + column)}" for column in columns)
+        assignments = ", ".join(f"{column} = {self.canonical_timestamp_sql(column)}" for column in columns)
+        return condition, assignments
+    
+    def create_timestamp_triggers(self, cursor):
+        """Create triggers that rewrite non-canonical timestamps as soon as they are written
+        
+        Writers that pass Python datetimes (microseconds, local offsets) or
+        epoch numbers would otherwise mix formats, and text comparison, ORDER
+        BY and the range filters would stop matching time order. Rows already
+        stored are converted by normalize_timestamps(), which runs once after
+        these triggers are first created.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'trg_tickets_timestamps_insert'")
+        self.timestamps_pending = cursor.fetchone() is None
+        
+        for table, columns in self.TIMESTAMP_COLUMNS.items():
+            noncanonical, assignments = self.timestamp_rewrite_sql(table, "new.")
+            for event in ("INSERT", f"UPDATE OF {', '.join(columns)}"):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_timestamps_{event.split()[0].lower()} AFTER {event} ON {table}
+                    WHEN {noncanonical}
+                    BEGIN
+                        UPDATE {table} SET {assignments} WHERE id = new.id;
+                    END
+                """)
+    
+    def normalize_timestamps(self, batch_size: int = 5000) -> int:
+        """Rewrite stored timestamps in TIMESTAMP_FORMAT and return the number of rows changed
+        
+        Safe to run against a live database: each table is walked in id
+        order, ``batch_size`` rows per write transaction, so readers and other
+        writers are only ever held up by one short batch. Values without an
+        offset are taken to be UTC, which is what CURRENT_TIMESTAMP writes.
+        """
+        changed = 0
+        for table in self.TIMESTAMP_COLUMNS:
+            after_id = 0
+            while after_id is not None:
+                after_id, rows = self.execute_write(self.apply_timestamp_normalization, table, after_id, batch_size)
+                changed += rows
+        self.timestamps_pending = False
+        return changed
+    
+    def apply_timestamp_normalization(self, cursor, table: str, after_id: int, batch_size: int) -> Tuple[Optional[int], int]:
+        """Write operation behind normalize_timestamps: one id range of one table"""
+        cursor.execute(f"SELECT MAX(id) FROM (SELECT id FROM {table} WHERE id > ? ORDER BY id LIMIT ?)", (after_id, batch_size))
+        last_id = cursor.fetchone()[0]
+        if last_id is None:
+            return None, 0
+        
+        noncanonical, assignments = self.timestamp_rewrite_sql(table)
+        cursor.execute(f"UPDATE {table} SET {assignments} WHERE id > ? AND id <= ? AND ({noncanonical})", (after_id, last_id))
+        return last_id, cursor.rowcount
+    
+    @staticmethod
+    def due_date_sql(created_at: str, category_id: str, priority_id: str) -> str:
+        """SQL for a due date: created_at plus the stricter of the category and priority SLA hours"""
+        return (
+            f"datetime({created_at}, '+' || ("
+            f"SELECT MIN(COALESCE(c.sla_hours, p.sla_hours), p.sla_hours) FROM categories c, priority_levels p "
+            f"WHERE c.id = {category_id} AND p.id = {priority_id}) || ' hours')"
+        )
+    
+    def backfill_due_dates(self, cursor):
+        """Set due dates on tickets created without one"""
+        cursor.execute(f"""
+            UPDATE tickets SET due_date = {self.due_date_sql('created_at', 'category_id', 'priority_id')}
+            WHERE due_date IS NULL
+        """)
+    
+    def create_version_tracking(self, cursor):
+        """Create table_versions and the triggers that bump it on every change"""
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS table_versions (
+                name VARCHAR(50) PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        
+        # Random per-database value, so versions from a recreated database never repeat old ETags
+        cursor.execute("INSERT OR IGNORE INTO table_versions (name, version) VALUES ('database', abs(random()))")
+        
+        for table in self.VERSIONED_TABLES:
+            cursor.execute("INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, 0)", (table,))
+            for event in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()} AFTER {event} ON {table} BEGIN
+                        UPDATE table_versions SET version = version + 1 WHERE name = '{table}';
+                    END
+                """)
+    
+    def create_search_index(self, cursor):
+        """Create the FTS5 ticket index and the triggers that keep it in sync"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'tickets_fts'")
+        exists = cursor.fetchone() is not None
+        
+        # One row per ticket (rowid = tickets.id); comments holds the public comment text
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+                title, description, tags, comments,
+                tokenize = 'porter unicode61'
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_tickets_fts_insert AFTER INSERT ON tickets BEGIN
+                INSERT INTO tickets_fts (rowid, title, description, tags, comments)
+                VALUES (new.id, new.title, new.description, COALESCE(new.tags, ''), '');
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_tickets_fts_update AFTER UPDATE OF title, description, tags ON tickets BEGIN
+                UPDATE tickets_fts
+                SET title = new.title, description = new.description, tags = COALESCE(new.tags, '')
+                WHERE rowid = new.id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_tickets_fts_delete AFTER DELETE ON tickets BEGIN
+                DELETE FROM tickets_fts WHERE rowid = old.id;
+            END
+        """)
+        
+        # Comment changes re-aggregate the owning ticket's comments (uses idx_ticket_comments_ticket_id)
+        refresh_comments = """
+                UPDATE tickets_fts
+                SET comments = COALESCE((
+                    SELECT group_concat(comment, ' ') FROM ticket_comments
+                    WHERE ticket_id = {ref}.ticket_id AND is_internal = 0
+                ), '')
+                WHERE rowid = {ref}.ticket_id;
+        """
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_ticket_comments_fts_insert AFTER INSERT ON ticket_comments BEGIN
+                {refresh_comments.format(ref='new')}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_ticket_comments_fts_update AFTER UPDATE ON ticket_comments BEGIN
+                {refresh_comments.format(ref='old')}
+                {refresh_comments.format(ref='new')}
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_ticket_comments_fts_delete AFTER DELETE ON ticket_comments BEGIN
+                {refresh_comments.format(ref='old')}
+            END
+        """)
+        
+        if not exists:
+            cursor.execute(f"INSERT INTO tickets_fts (tickets_fts, rank) VALUES ('rank', '{self.SEARCH_RANK}')")
+            self.rebuild_search_index(cursor)
+    
+    def rebuild_search_index(self, cursor):
+        """Repopulate tickets_fts from the tickets and ticket_comments tables"""
+        cursor.execute("DELETE FROM tickets_fts")
+        cursor.execute("""
+            INSERT INTO tickets_fts (rowid, title, description, tags, comments)
+            SELECT
+                t.id, t.title, t.description, COALESCE(t.tags, ''),
+                COALESCE((
+                    SELECT group_concat(comment, ' ') FROM ticket_comments
+                    WHERE ticket_id = t.id AND is_internal = 0
+                ), '')
+            FROM tickets t
+        """)
+    
+    def read_model_triggers(self) -> Dict[str, str]:
+        """Trigger name -> CREATE TRIGGER statement for everything that maintains tickets_view"""
+        materialize = f"INSERT OR REPLACE INTO tickets_view {self.join_ticket_select(list(self.TICKET_FIELDS))} WHERE {{where}};"
+        triggers = {
+            'trg_tickets_view_insert': f"""
+                CREATE TRIGGER IF NOT EXISTS trg_tickets_view_insert AFTER INSERT ON tickets BEGIN
+                    {materialize.format(where="t.id = new.id")}
+                END
+            """,
+            'trg_tickets_view_update': f"""
+                CREATE TRIGGER IF NOT EXISTS trg_tickets_view_update AFTER UPDATE ON tickets BEGIN
+                    {materialize.format(where="t.id = new.id")}
+                END
+            """,
+            'trg_tickets_view_delete': """
+                CREATE TRIGGER IF NOT EXISTS trg_tickets_view_delete AFTER DELETE ON tickets BEGIN
+                    DELETE FROM tickets_view WHERE id = old.id;
+                END
+            """
+        }
+        
+        # Reference changes are rare: drop the affected rows and re-join them, which also
+        # reproduces the JOIN semantics when a referenced row is added or removed
+        for table, (ticket_columns, copied) in self.READ_MODEL_SOURCES.items():
+            for event, refs in (('INSERT', "new.id"), ('UPDATE', "old.id, new.id"), ('DELETE', "old.id")):
+                of_columns = f" OF {copied}" if event == 'UPDATE' else ""
+                affected = " OR ".join(f"{column} IN ({refs})" for column in ticket_columns)
+                name = f"trg_{table}_view_{event.lower()}"
+                triggers[name] = f"""
+                    CREATE TRIGGER IF NOT EXISTS {name} AFTER {event}{of_columns} ON {table} BEGIN
+                        DELETE FROM tickets_view WHERE {affected};
+                        {materialize.format(where=" OR ".join(f"t.{column} IN ({refs})" for column in ticket_columns))}
+                    END
+                """
+        return triggers
+    
+    def create_read_model(self, cursor):
+        """Create tickets_view, a denormalized copy of tickets with the joined names and colors
+        
+        Triggers on tickets and on the reference tables keep it current, and its
+        indexes cover the list filters combined with the created_at, id sort.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'tickets_view'")
+        exists = cursor.fetchone() is not None
+        
+        # Columns in TICKET_FIELDS order, so SELECT t.* returns the API fields
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS tickets_view ({self.DENORMALIZED_TICKET_COLUMNS})")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_view_created_at_id ON tickets_view(created_at, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_view_updated_at ON tickets_view(updated_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_view_status ON tickets_view(status_id, created_at, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_view_priority ON tickets_view(priority_id, created_at, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_tickets_view_category ON tickets_view(category_id, created_at, id)")
+        
+        for statement in self.read_model_triggers().values():
+            cursor.execute(statement)
+        
+        if not exists:
+            self.rebuild_read_model(cursor)
+    
+    def drop_read_model(self, cursor):
+        """Remove tickets_view and its triggers"""
+        for name in self.read_model_triggers():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute("DROP TABLE IF EXISTS tickets_view")
+    
+    def rebuild_read_model(self, cursor=None):
+        """Repopulate tickets_view from tickets and the reference tables"""
+        if cursor is None:
+            with self.connection() as conn:
+                return self.rebuild_read_model(conn.cursor())
+        
+        cursor.execute("DELETE FROM tickets_view")
+        cursor.execute(f"INSERT INTO tickets_view {self.join_ticket_select(list(self.TICKET_FIELDS))}")
+    
+    def create_archive(self, cursor):
+        """Create the tables of the attached archive database
+        
+        archive.tickets holds whole API tickets (names included, like
+        tickets_view), so archived reads need no joins. Comments, history and
+        a full-text index mirror the hot tables. Nothing in the main database
+        refers to the archive, so the file can be backed up or moved on its own.
+        """
+        cursor.execute("SELECT 1 FROM archive.sqlite_master WHERE name = 'tickets_fts'")
+        exists = cursor.fetchone() is not None
+        
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS archive.tickets (
+                {self.DENORMALIZED_TICKET_COLUMNS},
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archive.ticket_comments (
+                id INTEGER PRIMARY KEY,
+                ticket_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                comment TEXT NOT NULL,
+                is_internal BOOLEAN DEFAULT 0,
+                created_at TIMESTAMP
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archive.ticket_history (
+                id INTEGER PRIMARY KEY,
+                ticket_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                action VARCHAR(100) NOT NULL,
+                old_value TEXT,
+                new_value TEXT,
+                change_count INTEGER,
+                created_at TIMESTAMP
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS archive.idx_ticket_comments_ticket_id ON ticket_comments(ticket_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS archive.idx_ticket_history_ticket_id ON ticket_history(ticket_id)")
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS archive.tickets_fts USING fts5(
+                title, description, tags, comments,
+                tokenize = 'porter unicode61'
+            )
+        """)
+        
+        if not exists:
+            cursor.execute(f"INSERT INTO archive.tickets_fts (tickets_fts, rank) VALUES ('rank', '{self.SEARCH_RANK}')")
+    
+    def create_history_compaction(self, cursor):
+        """Add ticket_history.change_count and the index of rows compact_history() has not seen yet
+        
+        change_count stays NULL on field-level rows and is set on the per-day
+        summaries that compaction leaves behind. The partial index only holds
+        uncompacted rows, so each run reads exactly the old rows still to do.
+        """
+        for schema in ("main", "archive"):
+            cursor.execute(f"SELECT 1 FROM pragma_table_info('ticket_history', '{schema}') WHERE name = 'change_count'")
+            if cursor.fetchone() is None:
+                cursor.execute(f"ALTER TABLE {schema}.ticket_history ADD COLUMN change_count INTEGER")
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_ticket_history_uncompacted ON ticket_history(created_at)
+            WHERE change_count IS NULL
+        """)
+    
+    def status_event_sql(self, row: str) -> Dict[str, str]:
+        """ROLLUP_STATUS_EVENTS column -> SQL that is 1 when history row ``row`` (e.g. ``new.``) moved its ticket into that status"""
+        actions = ", ".join(f"'{action}'" for action in self.STATUS_CHANGE_ACTIONS)
+        return {
+            column: f"({row}action IN ({actions}) AND {row}new_value IN ('{status_id}', "
+                    f"(SELECT name FROM statuses WHERE id = {status_id})))"
+            for column, status_id in self.ROLLUP_STATUS_EVENTS.items()
+        }
+    
+    @staticmethod
+    def rollup_time_sql(column: str) -> str:
+        """SQL for the time ticket_rollups counts an event at: ``column`` read as canonical_timestamp_sql() does
+        
+        Triggers see values before the timestamp triggers rewrite them, so
+        epoch numbers and offsets are converted here; a value SQLite cannot
+        parse at all is counted at the time of the write.
+        """
+        return f"COALESCE(datetime({column}, 'auto'), CURRENT_TIMESTAMP)"
+    
+    def create_ticket_rollups(self, cursor):
+        """Create the ticket_rollups table and the triggers that maintain it
+        
+        One row per (period, start, category, priority) counts the tickets
+        created and the changes to Resolved and Escalated in that hour or day,
+        so a time series reads a short primary-key range instead of grouping
+        tickets and history. Each event is added to both its hour and its day
+        row: hourly charts sum hours, daily and weekly ones sum days.
+        Creations are counted by a trigger on tickets and status changes by a
+        trigger on the ticket_history rows that record them, using the ticket's
+        category and priority at that moment. Deletes and archival leave the
+        counts alone: they describe what happened, not what is live.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'ticket_rollups'")
+        exists = cursor.fetchone() is not None
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ticket_rollups (
+                period VARCHAR(10) NOT NULL,
+                bucket_start TIMESTAMP NOT NULL,
+                category_id INTEGER NOT NULL,
+                priority_id INTEGER NOT NULL,
+                created INTEGER NOT NULL DEFAULT 0,
+                resolved INTEGER NOT NULL DEFAULT 0,
+                escalated INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (period, bucket_start, category_id, priority_id)
+            ) WITHOUT ROWID
+        """)
+        
+        # Recreated on every start so that changes to their definitions reach existing databases
+        cursor.execute("DROP TRIGGER IF EXISTS trg_tickets_rollup_insert")
+        cursor.execute("DROP TRIGGER IF EXISTS trg_ticket_history_rollup_insert")
+        
+        created_at = self.rollup_time_sql('new.created_at')
+        created = "".join(f"""
+                INSERT INTO ticket_rollups (period, bucket_start, category_id, priority_id, created)
+                VALUES ('{period}', {period_sql.format(created_at)}, new.category_id, new.priority_id, 1)
+                ON CONFLICT (period, bucket_start, category_id, priority_id) DO UPDATE SET created = created + 1;"""
+            for period, period_sql in self.ROLLUP_PERIODS.items()
+        )
+        cursor.execute(f"""
+            CREATE TRIGGER trg_tickets_rollup_insert AFTER INSERT ON tickets BEGIN{created}
+            END
+        """)
+        
+        events = self.status_event_sql("new.")
+        changed = "".join(f"""
+                INSERT INTO ticket_rollups (period, bucket_start, category_id, priority_id, {', '.join(events)})
+                SELECT '{period}', {period_sql.format(created_at)}, category_id, priority_id,
+                       {', '.join(events.values())}
+                FROM tickets WHERE id = new.ticket_id
+                ON CONFLICT (period, bucket_start, category_id, priority_id) DO UPDATE SET
+                    {', '.join(f'{column} = {column} + excluded.{column}' for column in events)};"""
+            for period, period_sql in self.ROLLUP_PERIODS.items()
+        )
+        cursor.execute(f"""
+            CREATE TRIGGER trg_ticket_history_rollup_insert AFTER INSERT ON ticket_history
+            WHEN {' OR '.join(events.values())}
+            BEGIN{changed}
+            END
+        """)
+        
+        if not exists:
+            self.rebuild_ticket_rollups(cursor)
     
     def is_empty(self, cursor) -> bool:
         """Check if tables are empty"""
@@ -217,38 +1593,39 @@ class TicketDatabase:
         """, status_data)
         
         # Insert sample tickets
+        now = datetime.now(timezone.utc)
         tickets_data = [
             ('TKT-001', 'Cannot log into account after password change', 
              'I changed my password yesterday and now I cannot log into my account. I\'ve tried the new password multiple times but it keeps saying "invalid credentials".', 
-             1, 1, 2, 1, None, datetime.now() - timedelta(hours=2), None, 'login,password,account'),
+             1, 1, 2, 1, None, self.format_timestamp(now - timedelta(hours=2)), None, 'login,password,account'),
             
             ('TKT-002', 'Payment declined for subscription renewal',
              'My credit card payment was declined when trying to renew my subscription. The card has sufficient funds and is not expired. I need help resolving this issue.',
-             2, 2, 2, 1, None, datetime.now() - timedelta(hours=1), None, 'payment,subscription,billing'),
+             2, 2, 2, 1, None, self.format_timestamp(now - timedelta(hours=1)), None, 'payment,subscription,billing'),
             
             ('TKT-003', 'App crashes when opening settings page',
              'Every time I try to open the settings page in the mobile app, it crashes immediately. This happens on both iOS and Android devices. I need to access my preferences.',
-             3, 3, 3, 1, None, datetime.now() - timedelta(minutes=30), None, 'crash,bug,mobile,settings'),
+             3, 3, 3, 1, None, self.format_timestamp(now - timedelta(minutes=30)), None, 'crash,bug,mobile,settings'),
             
             ('TKT-004', 'How to enable two-factor authentication',
              'I want to set up two-factor authentication for my account but I cannot find the option in the security settings. Can you guide me through the process?',
-             4, 4, 4, 1, None, datetime.now() - timedelta(hours=3), None, '2fa,security,authentication'),
+             4, 4, 4, 1, None, self.format_timestamp(now - timedelta(hours=3)), None, '2fa,security,authentication'),
             
             ('TKT-005', 'Suspicious login attempt detected',
              'I received an email about a suspicious login attempt from an unknown location. I want to secure my account and investigate this security concern.',
-             5, 5, 1, 1, None, datetime.now() - timedelta(minutes=15), None, 'security,breach,login'),
+             5, 5, 1, 1, None, self.format_timestamp(now - timedelta(minutes=15)), None, 'security,breach,login'),
             
             ('TKT-006', 'Slow performance on dashboard',
              'The dashboard is loading very slowly, taking 10-15 seconds to display data. This has been happening for the past week and affects my productivity.',
-             3, 3, 3, 2, 4, datetime.now() - timedelta(days=1), None, 'performance,slow,dashboard'),
+             3, 3, 3, 2, 4, self.format_timestamp(now - timedelta(days=1)), None, 'performance,slow,dashboard'),
             
             ('TKT-007', 'Invoice not received for last month',
              'I haven\'t received an invoice for last month\'s usage. I need the invoice for my records and accounting purposes. Can you resend it?',
-             2, 2, 4, 1, None, datetime.now() - timedelta(hours=4), None, 'invoice,billing,missing'),
+             2, 2, 4, 1, None, self.format_timestamp(now - timedelta(hours=4)), None, 'invoice,billing,missing'),
             
             ('TKT-008', 'Feature request: Dark mode theme',
              'I would like to request a dark mode theme for the application. This would be very helpful for users who work in low-light environments.',
-             4, 4, 4, 1, None, datetime.now() - timedelta(days=2), None, 'feature,request,dark-mode,theme')
+             4, 4, 4, 1, None, self.format_timestamp(now - timedelta(days=2)), None, 'feature,request,dark-mode,theme')
         ]
         
         cursor.executemany("""
@@ -284,34 +1661,21 @@ class TicketDatabase:
             VALUES (?, ?, ?, ?, ?)
         """, history_data)
         
+        self.backfill_due_dates(cursor)
+        
         print("✅ Sample data inserted successfully")
     
-    def get_tickets(self, limit: int = 50, offset: int = 0, status_id: Optional[int] = None, 
-                    priority_id: Optional[int] = None, category_id: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get tickets with optional filtering"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        query = """
-            SELECT 
-                t.*,
-                u.username as user_username,
-                u.full_name as user_full_name,
-                c.name as category_name,
-                p.name as priority_name,
-                p.color as priority_color,
-                s.name as status_name,
-                s.color as status_color,
-                a.username as assigned_username,
-                a.full_name as assigned_full_name
-            FROM tickets t
-            JOIN users u ON t.user_id = u.id
-            JOIN categories c ON t.category_id = c.id
-            JOIN priority_levels p ON t.priority_id = p.id
-            JOIN statuses s ON t.status_id = s.id
-            LEFT JOIN users a ON t.assigned_to = a.id
+    def build_ticket_filters(self, status_id: Optional[int] = None, priority_id: Optional[int] = None,
+                             category_id: Optional[int] = None, tag: Optional[str] = None,
+                             created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+                             updated_since: Optional[datetime] = None) -> Tuple[List[str], List[Any]]:
+        """Build WHERE clauses and parameters for the ticket list filters
+        
+        Time bounds are compared as TIMESTAMP_FORMAT text, which sorts in time
+        order, so they are range scans on the created_at and updated_at
+        indexes. ``created_after`` and ``updated_since`` are inclusive,
+        ``created_before`` is exclusive.
         """
-        
         params = []
         where_clauses = []
         
@@ -327,62 +1691,486 @@ class TicketDatabase:
             where_clauses.append("t.category_id = ?")
             params.append(category_id)
         
+        if tag:
+            # Normalized the same way as ticket_tags; a primary-key range lookup
+            where_clauses.append("t.id IN (SELECT ticket_id FROM ticket_tags WHERE tag = lower(trim(?)))")
+            params.append(tag)
+        
+        if created_after:
+            where_clauses.append("t.created_at >= ?")
+            params.append(self.format_timestamp(created_after))
+        
+        if created_before:
+            where_clauses.append("t.created_at < ?")
+            params.append(self.format_timestamp(created_before))
+        
+        if updated_since:
+            # Sync windows are a small slice; unlikely() makes the planner range-scan updated_at and sort
+            # the few matches instead of walking the whole created_at index looking for them
+            where_clauses.append("unlikely(t.updated_at >= ?)")
+            params.append(self.format_timestamp(updated_since))
+        
+        return where_clauses, params
+    
+    @classmethod
+    def resolve_fields(cls, fields: Optional[List[str]]) -> Optional[List[str]]:
+        """Validate a field projection; ``id`` is always included and order is preserved"""
+        if not fields:
+            return None
+        unknown = [field for field in fields if field not in cls.TICKET_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown ticket fields: {', '.join(unknown)}")
+        return list(dict.fromkeys(['id', *fields]))
+    
+    def build_ticket_select(self, fields: Optional[List[str]], extra_columns: Tuple[str, ...] = ()) -> str:
+        """SELECT ... FROM for the given fields, from tickets_view when the read model is on"""
+        if not self.read_model:
+            return self.join_ticket_select(fields, extra_columns)
+        columns = ["t.*"] if fields is None else [f"t.{field}" for field in fields]
+        return f"SELECT {', '.join([*columns, *extra_columns])} FROM tickets_view t"
+    
+    def join_ticket_select(self, fields: Optional[List[str]], extra_columns: Tuple[str, ...] = ()) -> str:
+        """SELECT ... FROM for the given fields, joining only the tables they need"""
+        if fields is None:
+            return f"SELECT {', '.join([self.TICKET_COLUMNS, *extra_columns])} FROM tickets t {self.TICKET_JOINS}"
+        
+        columns = []
+        aliases = set()
+        for field in fields:
+            expression, alias = self.TICKET_FIELDS[field]
+            columns.append(f"{expression} as {field}")
+            if alias:
+                aliases.add(alias)
+        joins = " ".join(join for alias, join in self.FIELD_JOINS.items() if alias in aliases)
+        return f"SELECT {', '.join([*columns, *extra_columns])} FROM tickets t {joins}"
+    
+    def archive_ticket_select(self, fields: Optional[List[str]], extra_columns: Tuple[str, ...] = ()) -> str:
+        """SELECT ... FROM archive.tickets for the given fields (every API field by default)"""
+        columns = [f"t.{field}" for field in fields or self.TICKET_FIELDS]
+        return f"SELECT {', '.join([*columns, *extra_columns])} FROM archive.tickets t"
+    
+    @classmethod
+    def resolve_include(cls, include: Optional[List[str]]) -> List[str]:
+        """Validate the relations to embed (see TICKET_RELATIONS)"""
+        unknown = [relation for relation in include or [] if relation not in cls.TICKET_RELATIONS]
+        if unknown:
+            raise ValueError(f"Unknown include: {', '.join(unknown)} (expected {', '.join(cls.TICKET_RELATIONS)})")
+        return list(dict.fromkeys(include or []))
+    
+    def relation_column(self, relation: str, paged: bool = False, schema: str = "main") -> str:
+        """Correlated subquery returning a JSON array of one ticket's newest ``relation`` rows
+        
+        Takes ``before`` (when ``paged``) and a row limit as parameters; the
+        WHERE clause is an index range on (ticket_id, id), so it reads only the
+        rows it returns however long the history is. ``schema`` is ``archive``
+        for archived tickets.
+        """
+        source, alias, columns = self.TICKET_RELATIONS[relation]
+        selected = ", ".join(f"{expression} AS {key}" for key, expression in columns.items())
+        item = ", ".join(
+            f"'{key}', json(CASE WHEN r.{key} THEN 'true' ELSE 'false' END)" if key in self.BOOLEAN_RELATION_KEYS
+            else f"'{key}', r.{key}"
+            for key in columns
+        )
+        before = f" AND {alias}.id < ?" if paged else ""
+        # json_object is built outside the LIMITed subquery so each row is encoded once, in id order
+        return (
+            f"(SELECT json_group_array(json_object({item})) FROM ("
+            f"SELECT {selected} FROM {schema}.{source} WHERE {alias}.ticket_id = t.id{before} "
+            f"ORDER BY {alias}.id DESC LIMIT ?) r) AS {relation}"
+        )
+    
+    @staticmethod
+    def split_relation_page(ticket: Dict[str, Any], relation: str, limit: int):
+        """Decode an embedded relation fetched with ``limit + 1`` rows and set ``<relation>_next``"""
+        items = json_loads(ticket[relation])
+        ticket[relation] = items[:limit]
+        ticket[f'{relation}_next'] = items[limit - 1]['id'] if len(items) > limit else None
+    
+    def get_tickets(self, limit: int = 50, offset: int = 0, status_id: Optional[int] = None, 
+                    priority_id: Optional[int] = None, category_id: Optional[int] = None,
+                    tag: Optional[str] = None, created_after: Optional[datetime] = None,
+                    created_before: Optional[datetime] = None, updated_since: Optional[datetime] = None,
+                    after: Optional[Tuple[str, int]] = None, fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Get tickets with optional filtering
+        
+        ``after`` is a (created_at, id) keyset position; only tickets that sort
+        after it (older, or same time with a lower id) are returned. ``fields``
+        limits the returned keys (see TICKET_FIELDS); by default every column
+        and joined name is returned.
+        """
+        query = self.build_ticket_select(self.resolve_fields(fields))
+        
+        where_clauses, params = self.build_ticket_filters(
+            status_id, priority_id, category_id, tag, created_after, created_before, updated_since
+        )
+        
+        if after:
+            where_clauses.append("(t.created_at, t.id) < (?, ?)")
+            params.extend(after)
+        
         if where_clauses:
             query += " WHERE " + " AND ".join(where_clauses)
         
-        query += " ORDER BY t.created_at DESC LIMIT ? OFFSET ?"
+        query += " ORDER BY t.created_at DESC, t.id DESC LIMIT ? OFFSET ?"
         params.extend([limit, offset])
         
-        cursor.execute(query, params)
-        tickets = [dict(row) for row in cursor.fetchall()]
+        with self.read_connection() as conn:
+            cursor = conn.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def encode_cursor(created_at: str, ticket_id: int) -> str:
+        """Encode a keyset position as an opaque, URL-safe cursor"""
+        raw = json.dumps([created_at, ticket_id], separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+    
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, int]:
+        """Decode a cursor produced by encode_cursor"""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            created_at, ticket_id = json.loads(raw)
+            if not isinstance(created_at, str) or not isinstance(ticket_id, int):
+                raise ValueError
+        except (ValueError, TypeError):
+            raise ValueError("Invalid pagination cursor")
+        return created_at, ticket_id
+    
+    def get_tickets_page(self, limit: int = 50, cursor: Optional[str] = None, status_id: Optional[int] = None,
+                         priority_id: Optional[int] = None, category_id: Optional[int] = None,
+                         tag: Optional[str] = None, created_after: Optional[datetime] = None,
+                         created_before: Optional[datetime] = None, updated_since: Optional[datetime] = None,
+                         fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Get one keyset-paginated page of tickets plus the cursor for the next page"""
+        after = self.decode_cursor(cursor) if cursor else None
+        
+        # The cursor needs created_at even when the caller did not ask for it
+        fields = self.resolve_fields(fields)
+        drop_created_at = fields is not None and 'created_at' not in fields
+        if drop_created_at:
+            fields.append('created_at')
+        
+        # Fetch one extra row to learn whether another page exists
+        tickets = self.get_tickets(
+            limit=limit + 1,
+            status_id=status_id,
+            priority_id=priority_id,
+            category_id=category_id,
+            tag=tag,
+            created_after=created_after,
+            created_before=created_before,
+            updated_since=updated_since,
+            after=after,
+            fields=fields
+        )
+        
+        next_cursor = None
+        if len(tickets) > limit:
+            tickets = tickets[:limit]
+            next_cursor = self.encode_cursor(tickets[-1]['created_at'], tickets[-1]['id'])
+        
+        if drop_created_at:
+            for ticket in tickets:
+                del ticket['created_at']
+        
+        return {'tickets': tickets, 'next_cursor': next_cursor}
+    
+    def iter_ticket_rows(self, fields: Optional[List[str]] = None, status_id: Optional[int] = None,
+                         priority_id: Optional[int] = None, category_id: Optional[int] = None,
+                         tag: Optional[str] = None, created_after: Optional[datetime] = None,
+                         created_before: Optional[datetime] = None, updated_since: Optional[datetime] = None,
+                         batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[List[tuple]]:
+        """Stream matching tickets in id order as batches of plain tuples
+        
+        Columns follow ``fields`` (every field by default). The rows come from
+        a dedicated read-only connection, opened outside read_pool so that slow
+        export clients never hold a pooled connection other requests wait for.
+        It, and so one consistent snapshot, is kept until the generator is
+        exhausted or closed; only ``batch_size`` rows are in memory at a time.
+        """
+        fields = self.resolve_fields(fields) or list(self.TICKET_FIELDS)
+        query = self.build_ticket_select(fields)
         
-        conn.close()
-        return tickets
+        where_clauses, params = self.build_ticket_filters(
+            status_id, priority_id, category_id, tag, created_after, created_before, updated_since
+        )
+        if where_clauses:
+            query += " WHERE " + " AND ".join(where_clauses)
+        query += " ORDER BY t.id"
+        
+        conn = self.get_read_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.row_factory = None  # Tuples; the caller already knows the columns
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
     
-    def get_ticket(self, ticket_id: int) -> Optional[Dict[str, Any]]:
-        """Get a specific ticket by ID"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT 
-                t.*,
-                u.username as user_username,
-                u.full_name as user_full_name,
-                c.name as category_name,
-                p.name as priority_name,
-                p.color as priority_color,
-                s.name as status_name,
-                s.color as status_color,
-                a.username as assigned_username,
-                a.full_name as assigned_full_name
-            FROM tickets t
-            JOIN users u ON t.user_id = u.id
-            JOIN categories c ON t.category_id = c.id
-            JOIN priority_levels p ON t.priority_id = p.id
-            JOIN statuses s ON t.status_id = s.id
-            LEFT JOIN users a ON t.assigned_to = a.id
-            WHERE t.id = ?
-        """, (ticket_id,))
+    def ticket_arrow_schema(self, fields: Optional[List[str]] = None) -> 'pa.Schema':
+        """Arrow schema for exported ticket fields (timestamps as microsecond timestamps)"""
+        if pa is None:
+            raise ImportError("pyarrow is not installed; Arrow and Parquet exports need it (pip install pyarrow)")
+        
+        fields = self.resolve_fields(fields) or list(self.TICKET_FIELDS)
+        types = []
+        for field in fields:
+            if field in self.INTEGER_FIELDS:
+                types.append(pa.field(field, pa.int64()))
+            elif field in self.TIMESTAMP_FIELDS:
+                types.append(pa.field(field, pa.timestamp('us')))
+            else:
+                types.append(pa.field(field, pa.string()))
+        return pa.schema(types)
+    
+    def iter_ticket_record_batches(self, fields: Optional[List[str]] = None, status_id: Optional[int] = None,
+                                   priority_id: Optional[int] = None, category_id: Optional[int] = None,
+                                   tag: Optional[str] = None, created_after: Optional[datetime] = None,
+                                   created_before: Optional[datetime] = None, updated_since: Optional[datetime] = None,
+                                   batch_size: int = EXPORT_BATCH_SIZE) -> Iterator['pa.RecordBatch']:
+        """Stream matching tickets as Arrow record batches built column-wise from the cursor"""
+        fields = self.resolve_fields(fields) or list(self.TICKET_FIELDS)
+        schema = self.ticket_arrow_schema(fields)
+        
+        for rows in self.iter_ticket_rows(fields, status_id, priority_id, category_id, tag,
+                                          created_after, created_before, updated_since, batch_size):
+            arrays = []
+            for field, values in zip(schema, zip(*rows)):
+                if pa.types.is_timestamp(field.type):
+                    # SQLite stores timestamps as text; Arrow parses both stored formats
+                    arrays.append(pa.array(values, pa.string()).cast(field.type))
+                else:
+                    arrays.append(pa.array(values, field.type))
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+    
+    def export_tickets_parquet(self, directory: str, partition_by: Optional[str] = 'month',
+                               fields: Optional[List[str]] = None, status_id: Optional[int] = None,
+                               priority_id: Optional[int] = None, category_id: Optional[int] = None,
+                               tag: Optional[str] = None, created_after: Optional[datetime] = None,
+                               created_before: Optional[datetime] = None, updated_since: Optional[datetime] = None) -> int:
+        """Write matching tickets to a Parquet dataset and return the number of rows
+        
+        With ``partition_by`` (year, month or day) the layout is Hive-style on
+        created_at, e.g. ``created_month=2024-05/tickets-0.parquet``, so readers
+        can prune by date. Partitions being written replace existing ones.
+        """
+        if partition_by is not None and partition_by not in self.PARQUET_PARTITIONS:
+            raise ValueError(f"partition_by must be one of: {', '.join(self.PARQUET_PARTITIONS)}")
+        
+        fields = self.resolve_fields(fields) or list(self.TICKET_FIELDS)
+        schema = self.ticket_arrow_schema(fields)
+        batches = self.iter_ticket_record_batches(fields, status_id, priority_id, category_id, tag,
+                                                  created_after, created_before, updated_since)
+        partitioning = None
+        
+        if partition_by is not None:
+            if 'created_at' not in fields:
+                raise ValueError("Partitioned exports need the created_at field")
+            column = f"created_{partition_by}"
+            date_format = self.PARQUET_PARTITIONS[partition_by]
+            batches = (
+                batch.append_column(column, pc.strftime(batch['created_at'], format=date_format))
+                for batch in batches
+            )
+            schema = schema.append(pa.field(column, pa.string()))
+            partitioning = ds.partitioning(pa.schema([(column, pa.string())]), flavor='hive')
+        
+        rows = 0
+        
+        def counted():
+            nonlocal rows
+            for batch in batches:
+                rows += batch.num_rows
+                yield batch
+        
+        ds.write_dataset(
+            counted(),
+            directory,
+            schema=schema,
+            format='parquet',
+            partitioning=partitioning,
+            basename_template='tickets-{i}.parquet',
+            existing_data_behavior='delete_matching'
+        )
+        return rows
+    
+    def count_tickets(self, status_id: Optional[int] = None, priority_id: Optional[int] = None,
+                      category_id: Optional[int] = None, tag: Optional[str] = None,
+                      created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+                      updated_since: Optional[datetime] = None, scan: bool = True) -> Optional[int]:
+        """Count tickets matching the list filters
+        
+        Status, priority and category filters alone are summed from
+        ticket_counts, so the count costs the same at any table size. Tag and
+        time filters need a pass over the matching tickets; with ``scan=False``
+        those return None instead.
+        """
+        if tag is None and created_after is None and created_before is None and updated_since is None:
+            query = "SELECT COALESCE(SUM(count), 0) FROM ticket_counts"
+            where_clauses, params = [], []
+            for column, value in (('status_id', status_id), ('priority_id', priority_id), ('category_id', category_id)):
+                if value:
+                    where_clauses.append(f"{column} = ?")
+                    params.append(value)
+        elif not scan:
+            return None
+        else:
+            query = "SELECT COUNT(*) FROM tickets t"
+            where_clauses, params = self.build_ticket_filters(
+                status_id, priority_id, category_id, tag, created_after, created_before, updated_since
+            )
+        if where_clauses:
+            query += " WHERE " + " AND ".join(where_clauses)
         
-        row = cursor.fetchone()
-        conn.close()
+        with self.read_connection() as conn:
+            return conn.execute(query, params).fetchone()[0]
+    
+    def get_ticket(self, ticket_id: int, include: Optional[List[str]] = None,
+                   include_limit: int = DEFAULT_INCLUDE_LIMIT) -> Optional[Dict[str, Any]]:
+        """Get a specific ticket by ID (archived or not), optionally with its newest comments and/or history"""
+        if include:
+            tickets = self.get_tickets_by_ids([ticket_id], include=include, include_limit=include_limit)
+            return tickets[0] if tickets else None
+        
+        with self.read_connection() as conn:
+            row = conn.execute(f"{self.build_ticket_select(None)} WHERE t.id = ?", (ticket_id,)).fetchone()
+            if row is None:
+                row = conn.execute(f"{self.archive_ticket_select(None)} WHERE t.id = ?", (ticket_id,)).fetchone()
         
         return dict(row) if row else None
     
-    def create_ticket(self, ticket_data: Dict[str, Any]) -> int:
-        """Create a new ticket"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def get_tickets_by_ids(self, ticket_ids: List[int], fields: Optional[List[str]] = None,
+                           include: Optional[List[str]] = None,
+                           include_limit: int = DEFAULT_INCLUDE_LIMIT) -> List[Dict[str, Any]]:
+        """Get tickets by ID in the order given (unknown IDs are skipped)
+        
+        Each relation in ``include`` is embedded as its ``include_limit`` newest
+        rows, read by a correlated subquery in the same statement, so tickets
+        and their children take one query. ``<relation>_next`` is set when
+        older rows exist; pass it as ``before`` to get_ticket_related. IDs not
+        in the hot tables are looked up in the archive with a second query.
+        """
+        include = self.resolve_include(include)
+        fields = self.resolve_fields(fields)
+        ids = list(dict.fromkeys(ticket_ids))
+        if not ids:
+            return []
+        
+        columns = tuple(self.relation_column(relation) for relation in include)
+        query = f"{self.build_ticket_select(fields, columns)} WHERE t.id IN ({', '.join('?' * len(ids))})"
+        params = [include_limit + 1] * len(include) + ids
+        
+        with self.read_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+            
+            found = {row['id'] for row in rows}
+            archived = [ticket_id for ticket_id in ids if ticket_id not in found]
+            if archived:
+                columns = tuple(self.relation_column(relation, schema="archive") for relation in include)
+                query = f"{self.archive_ticket_select(fields, columns)} WHERE t.id IN ({', '.join('?' * len(archived))})"
+                rows += conn.execute(query, [include_limit + 1] * len(include) + archived).fetchall()
+        
+        tickets = {}
+        for row in rows:
+            ticket = dict(row)
+            for relation in include:
+                self.split_relation_page(ticket, relation, include_limit)
+            tickets[ticket['id']] = ticket
+        return [tickets[ticket_id] for ticket_id in ids if ticket_id in tickets]
+    
+    def get_ticket_related(self, ticket_id: int, relation: str, before: Optional[int] = None,
+                           limit: int = DEFAULT_INCLUDE_LIMIT) -> Optional[Dict[str, Any]]:
+        """One page of a ticket's comments or history, newest first (None if the ticket does not exist)"""
+        self.resolve_include([relation])
+        paged = before is not None
+        params = [before, limit + 1, ticket_id] if paged else [limit + 1, ticket_id]
+        
+        with self.read_connection() as conn:
+            for schema in ("main", "archive"):
+                query = f"SELECT {self.relation_column(relation, paged, schema)} FROM {schema}.tickets t WHERE t.id = ?"
+                row = conn.execute(query, params).fetchone()
+                if row is not None:
+                    break
+        if row is None:
+            return None
+        
+        page = dict(row)
+        self.split_relation_page(page, relation, limit)
+        return page
+    
+    def get_ticket_payload(self, ticket_id: int, build) -> Optional[bytes]:
+        """Get a serialized ticket from the hot-ticket cache, calling ``build(ticket)`` on a miss"""
+        self.ticket_cache.sync_versions(self.reference.versions())
+        payload = self.ticket_cache.get(ticket_id)
+        if payload is not None:
+            return payload
+        
+        token = self.ticket_cache.token()
+        ticket = self.get_ticket(ticket_id)
+        if ticket is None:
+            return None
+        
+        payload = build(ticket)
+        self.ticket_cache.put(ticket_id, payload, token)
+        return payload
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get reference-data and hot-ticket cache statistics"""
+        return {'reference': self.reference.stats(), 'tickets': self.ticket_cache.stats()}
+    
+    @staticmethod
+    def format_ticket_number(number: int) -> str:
+        """Format a sequence value as a ticket number (TKT-001)"""
+        return f"TKT-{str(number).zfill(3)}"
+    
+    def allocate_ticket_numbers(self, cursor, count: int = 1) -> List[str]:
+        """Reserve ``count`` consecutive ticket numbers
+        
+        Must run inside the caller's write transaction: the sequence row is
+        bumped under SQLite's write lock, so concurrent writers never share a
+        number and the reservation rolls back with the transaction.
+        """
+        cursor.execute(
+            "UPDATE sequences SET value = value + ? WHERE name = 'ticket_number' RETURNING value",
+            (count,)
+        )
+        end = cursor.fetchall()[0][0]
+        return [self.format_ticket_number(number) for number in range(end - count + 1, end + 1)]
+    
+    def execute_write(self, operation, *args) -> Any:
+        """Run ``operation(cursor, *args)`` in a write transaction and return its result
+        
+        With group commit enabled the operation is queued on the writer thread;
+        otherwise, or if the writer failed to start, it runs on a pooled
+        connection under BEGIN IMMEDIATE.
+        """
+        if self.writer and self.writer.alive:
+            return self.writer.submit(operation, *args).result()
         
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            return operation(conn.cursor(), *args)
+    
+    def create_ticket(self, ticket_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new ticket and return its stored id and ticket_number"""
+        created = self.execute_write(self.insert_ticket, ticket_data)
+        self.ticket_cache.invalidate(created['id'])
+        return created
+    
+    def insert_ticket(self, cursor, ticket_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Write operation behind create_ticket"""
         # Generate ticket number
-        cursor.execute("SELECT COUNT(*) FROM tickets")
-        count = cursor.fetchone()[0]
-        ticket_number = f"TKT-{str(count + 1).zfill(3)}"
+        ticket_number = self.allocate_ticket_numbers(cursor)[0]
         
-        cursor.execute("""
-            INSERT INTO tickets (ticket_number, title, description, user_id, category_id, priority_id, status_id, tags)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        cursor.execute(f"""
+            INSERT INTO tickets (ticket_number, title, description, user_id, category_id, priority_id, status_id, tags, due_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, {self.due_date_sql('CURRENT_TIMESTAMP', '?', '?')})
+            RETURNING id, ticket_number
         """, (
             ticket_number,
             ticket_data['title'],
@@ -391,34 +2179,168 @@ class TicketDatabase:
             ticket_data['category_id'],
             ticket_data['priority_id'],
             ticket_data['status_id'],
-            ticket_data.get('tags', '')
+            ticket_data.get('tags', ''),
+            ticket_data['category_id'],
+            ticket_data['priority_id']
         ))
-        
-        ticket_id = cursor.lastrowid
+        created = dict(cursor.fetchall()[0])
         
         # Add to history
         cursor.execute("""
             INSERT INTO ticket_history (ticket_id, user_id, action, new_value)
             VALUES (?, ?, ?, ?)
-        """, (ticket_id, ticket_data['user_id'], 'Ticket Created', ticket_data['title']))
+        """, (created['id'], ticket_data['user_id'], 'Ticket Created', ticket_data['title']))
         
-        conn.commit()
-        conn.close()
+        return created
+    
+    def create_tickets_bulk(self, tickets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many tickets in a single transaction
         
-        return ticket_id
+        References are checked against the reference cache; invalid items are
+        reported and skipped while the rest are inserted together. Returns one
+        result per input item, in order.
+        """
+        results: List[Dict[str, Any]] = [None] * len(tickets)
+        valid = []
+        
+        # Snapshot the ID sets once; a miss still falls back to a fresh check
+        known = {table: self.reference.ids(table) for table in ReferenceDataCache.QUERIES}
+        
+        def exists(table: str, row_id: Optional[int]) -> bool:
+            return row_id in known[table] or self.reference.exists(table, row_id)
+        
+        for index, ticket_data in enumerate(tickets):
+            status_id = ticket_data.get('status_id') or 1
+            error = None
+            if not exists('users', ticket_data.get('user_id')):
+                error = "Invalid user ID"
+            elif not exists('categories', ticket_data.get('category_id')):
+                error = "Invalid category ID"
+            elif not exists('priority_levels', ticket_data.get('priority_id')):
+                error = "Invalid priority ID"
+            elif not exists('statuses', status_id):
+                error = "Invalid status ID"
+            
+            if error:
+                results[index] = {'index': index, 'status': 'error', 'error': error}
+            else:
+                valid.append((index, ticket_data, status_id))
+        
+        if not valid:
+            return results
+        
+        created = self.execute_write(self.insert_tickets, valid)
+        
+        for (index, _, _), (ticket_id, ticket_number) in zip(valid, created):
+            results[index] = {
+                'index': index,
+                'status': 'created',
+                'ticket_id': ticket_id,
+                'ticket_number': ticket_number
+            }
+        
+        return results
     
-    def update_ticket(self, ticket_id: int, update_data: Dict[str, Any], user_id: int) -> bool:
-        """Update a ticket"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def insert_tickets(self, cursor, valid: List[Tuple[int, Dict[str, Any], int]]) -> List[Tuple[int, str]]:
+        """Write operation behind create_tickets_bulk; returns (id, ticket_number) per row"""
+        # The write transaction is already open, so the rows with id > last_id are exactly the ones inserted
+        # below, in insertion order (AUTOINCREMENT ids only grow, but leave gaps after deletes and archival)
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM tickets")
+        last_id = cursor.fetchone()[0]
+        ticket_numbers = self.allocate_ticket_numbers(cursor, len(valid))
+        
+        # Firing these once per row costs more than the inserts themselves, so they are dropped for the
+        # batch and recreated from their stored definitions; DDL is transactional, so other connections
+        # never see them missing and a failed batch rolls back to the triggers it started with
+        marks = ", ".join("?" * len(self.BULK_INSERT_TRIGGERS))
+        cursor.execute(f"SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN ({marks})", self.BULK_INSERT_TRIGGERS)
+        triggers = cursor.fetchall()
+        for name, sql in triggers:
+            cursor.execute(f"DROP TRIGGER {name}")
+        
+        cursor.executemany(f"""
+            INSERT INTO tickets (ticket_number, title, description, user_id, category_id, priority_id, status_id, tags, due_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, {self.due_date_sql('CURRENT_TIMESTAMP', '?', '?')})
+        """, [
+            (
+                ticket_number,
+                ticket_data['title'],
+                ticket_data['description'],
+                ticket_data['user_id'],
+                ticket_data['category_id'],
+                ticket_data['priority_id'],
+                status_id,
+                ticket_data.get('tags', ''),
+                ticket_data['category_id'],
+                ticket_data['priority_id']
+            )
+            for ticket_number, (index, ticket_data, status_id) in zip(ticket_numbers, valid)
+        ])
         
-        # Get current values for history
-        cursor.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,))
-        current = cursor.fetchone()
-        if not current:
-            conn.close()
-            return False
+        # Add to history
+        cursor.execute("""
+            INSERT INTO ticket_history (ticket_id, user_id, action, new_value)
+            SELECT id, user_id, 'Ticket Created', title FROM tickets WHERE id > ? ORDER BY id
+        """, (last_id,))
+        
+        self.maintain_inserted_tickets(cursor, last_id)
+        for name, sql in triggers:
+            cursor.execute(sql)
+        
+        cursor.execute("SELECT id, ticket_number FROM tickets WHERE id > ? ORDER BY id", (last_id,))
+        return [tuple(row) for row in cursor.fetchall()]
+    
+    def maintain_inserted_tickets(self, cursor, last_id: int):
+        """Do the work of BULK_INSERT_TRIGGERS for the tickets with id > last_id, one statement per table
+        
+        The ticket sequence needs nothing: allocate_ticket_numbers already
+        advanced it, and the 'Ticket Created' history rows hold no status
+        change to roll up.
+        """
+        cursor.execute("""
+            INSERT INTO ticket_counts (status_id, priority_id, category_id, count)
+            SELECT status_id, priority_id, category_id, COUNT(*)
+            FROM tickets WHERE id > ?
+            GROUP BY status_id, priority_id, category_id
+            ON CONFLICT (status_id, priority_id, category_id) DO UPDATE SET count = count + excluded.count
+        """, (last_id,))
+        cursor.execute("""
+            INSERT INTO tickets_fts (rowid, title, description, tags, comments)
+            SELECT id, title, description, COALESCE(tags, ''), '' FROM tickets WHERE id > ?
+        """, (last_id,))
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO ticket_tags (tag, ticket_id, status_id, category_id)
+            {self.tag_rows_select('t', "tickets t, ")} AND t.tags IS NOT NULL AND t.tags != '' AND t.id > ?
+        """, (last_id,))
+        
+        created_at = self.rollup_time_sql('created_at')
+        for period, period_sql in self.ROLLUP_PERIODS.items():
+            cursor.execute(f"""
+                INSERT INTO ticket_rollups (period, bucket_start, category_id, priority_id, created)
+                SELECT '{period}', {period_sql.format(created_at)} AS bucket_start, category_id, priority_id, COUNT(*)
+                FROM tickets WHERE id > ?
+                GROUP BY bucket_start, category_id, priority_id
+                ON CONFLICT (period, bucket_start, category_id, priority_id) DO UPDATE SET created = created + excluded.created
+            """, (last_id,))
+        
+        if self.read_model:
+            cursor.execute(
+                f"INSERT OR REPLACE INTO tickets_view {self.join_ticket_select(list(self.TICKET_FIELDS))} WHERE t.id > ?",
+                (last_id,)
+            )
         
+        # ETags only need the versions to change, so one bump per table stands in for one per row
+        cursor.execute("UPDATE table_versions SET version = version + 1 WHERE name IN ('tickets', 'ticket_history')")
+    
+    def update_ticket(self, ticket_id: int, update_data: Dict[str, Any], user_id: int) -> bool:
+        """Update a ticket"""
+        try:
+            return self.execute_write(self.apply_ticket_update, ticket_id, update_data, user_id)
+        finally:
+            self.ticket_cache.invalidate(ticket_id)
+    
+    def apply_ticket_update(self, cursor, ticket_id: int, update_data: Dict[str, Any], user_id: int) -> bool:
+        """Write operation behind update_ticket"""
         # Build update query
         set_clauses = []
         params = []
@@ -429,12 +2351,17 @@ class TicketDatabase:
                 params.append(value)
         
         if not set_clauses:
-            conn.close()
             return False
         
         set_clauses.append("updated_at = CURRENT_TIMESTAMP")
         params.append(ticket_id)
         
+        # Get current values for history
+        cursor.execute("SELECT * FROM tickets WHERE id = ?", (ticket_id,))
+        current = cursor.fetchone()
+        if not current:
+            return False
+        
         query = f"UPDATE tickets SET {', '.join(set_clauses)} WHERE id = ?"
         cursor.execute(query, params)
         
@@ -449,97 +2376,491 @@ class TicketDatabase:
                         VALUES (?, ?, ?, ?, ?)
                     """, (ticket_id, user_id, f'{key.title()} Changed', old_value, new_value))
         
-        conn.commit()
-        conn.close()
-        
         return True
     
-    def get_categories(self) -> List[Dict[str, Any]]:
-        """Get all categories"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def get_sla_breaching(self, within_seconds: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Open and In Progress tickets due within ``within_seconds`` (or already overdue), soonest first
         
-        cursor.execute("SELECT * FROM categories ORDER BY name")
-        categories = [dict(row) for row in cursor.fetchall()]
+        The due-date range is read from the partial idx_tickets_sla_due index;
+        only the matching tickets are then looked up. ``breached`` is true
+        once the due date has passed.
+        """
+        fields = self.resolve_fields(list(self.SLA_FIELDS))
+        query = f"""
+            {self.build_ticket_select(fields, ("t.due_date <= datetime('now') AS breached",))}
+            WHERE t.id IN (
+                SELECT id FROM tickets INDEXED BY idx_tickets_sla_due
+                WHERE {self.SLA_OPEN_CLAUSE} AND due_date <= datetime('now', ?)
+                ORDER BY due_date LIMIT ?
+            )
+            ORDER BY t.due_date, t.id
+        """
+        with self.read_connection() as conn:
+            rows = conn.execute(query, (f"+{int(within_seconds)} seconds", limit)).fetchall()
         
-        conn.close()
-        return categories
+        tickets = [dict(row) for row in rows]
+        for ticket in tickets:
+            ticket['breached'] = bool(ticket['breached'])
+        return tickets
     
-    def get_priority_levels(self) -> List[Dict[str, Any]]:
-        """Get all priority levels"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM priority_levels ORDER BY sla_hours")
-        priorities = [dict(row) for row in cursor.fetchall()]
+    def escalate_overdue(self, batch_size: int = 500) -> List[int]:
+        """Move overdue Open/In Progress tickets to Escalated and return their IDs
         
-        conn.close()
-        return priorities
+        Each batch of up to ``batch_size`` tickets is one write transaction,
+        so the writer is never held for long. Overdue tickets are found through
+        the partial due-date index, not by scanning tickets. Escalation sets
+        ``escalated_at``, which drops the ticket from that index for good.
+        """
+        escalated: List[int] = []
+        while True:
+            ticket_ids = self.execute_write(self.apply_escalations, batch_size)
+            for ticket_id in ticket_ids:
+                self.ticket_cache.invalidate(ticket_id)
+            escalated.extend(ticket_ids)
+            if len(ticket_ids) < batch_size:
+                return escalated
     
-    def get_statuses(self) -> List[Dict[str, Any]]:
-        """Get all statuses"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def apply_escalations(self, cursor, batch_size: int) -> List[int]:
+        """Write operation behind escalate_overdue: one batch of escalations"""
+        cursor.execute(f"""
+            SELECT id, status_id FROM tickets INDEXED BY idx_tickets_sla_due
+            WHERE {self.SLA_OPEN_CLAUSE} AND due_date <= datetime('now')
+            ORDER BY due_date LIMIT ?
+        """, (batch_size,))
+        overdue = cursor.fetchall()
+        if not overdue:
+            return []
+        
+        ticket_ids = [row['id'] for row in overdue]
+        cursor.execute(
+            f"UPDATE tickets SET status_id = ?, escalated_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP "
+            f"WHERE id IN ({', '.join('?' * len(ticket_ids))})",
+            [self.ESCALATED_STATUS_ID, *ticket_ids]
+        )
+        
+        # Recorded against the first admin user (or the ticket's owner if there is none)
+        cursor.executemany("""
+            INSERT INTO ticket_history (ticket_id, user_id, action, old_value, new_value)
+            SELECT id, COALESCE((SELECT MIN(id) FROM users WHERE role = 'admin'), user_id), 'SLA Escalated', ?, ?
+            FROM tickets WHERE id = ?
+        """, [(str(row['status_id']), str(self.ESCALATED_STATUS_ID), row['id']) for row in overdue])
         
-        cursor.execute("SELECT * FROM statuses WHERE is_active = 1 ORDER BY name")
-        statuses = [dict(row) for row in cursor.fetchall()]
+        return ticket_ids
+    
+    def archive_closed_tickets(self, older_than_days: float = DEFAULT_ARCHIVE_AFTER_DAYS,
+                               batch_size: int = 500) -> int:
+        """Move Closed tickets not updated for ``older_than_days`` days, with their comments and history, to the archive
+        
+        Returns the number of tickets moved. Each batch is copied in one write
+        transaction and deleted from the hot tables in the next. In WAL mode
+        SQLite commits each attached file separately, so one transaction could
+        lose rows if interrupted between the files; this way an interruption
+        only leaves copies behind, which the next run replaces. A ticket that
+        changes between the two steps, or whose copy is incomplete, stays in
+        the hot tables; batches advance by id, so it is retried on the next
+        run rather than selected again by this one.
+        """
+        archived = 0
+        after_id = 0
+        while True:
+            ticket_ids = self.execute_write(self.copy_to_archive, older_than_days, batch_size, after_id)
+            if not ticket_ids:
+                return archived
+            
+            moved = self.execute_write(self.remove_archived, ticket_ids)
+            for ticket_id in ticket_ids:
+                self.ticket_cache.invalidate(ticket_id)
+            archived += len(moved)
+            if len(ticket_ids) < batch_size:
+                return archived
+            after_id = ticket_ids[-1]
+    
+    def copy_to_archive(self, cursor, older_than_days: float, batch_size: int, after_id: int = 0) -> List[int]:
+        """Write operation behind archive_closed_tickets: copy one batch of tickets with ids above ``after_id``"""
+        cursor.execute("""
+            SELECT id FROM tickets WHERE status_id = ? AND updated_at < datetime('now', ?) AND id > ?
+            ORDER BY id LIMIT ?
+        """, (self.CLOSED_STATUS_ID, f"-{older_than_days} days", after_id, batch_size))
+        ticket_ids = [row['id'] for row in cursor.fetchall()]
+        if not ticket_ids:
+            return []
+        
+        # Replace whatever an earlier, interrupted run left for these tickets
+        self.delete_ticket_rows(cursor, "archive", ticket_ids)
+        
+        marks = ", ".join("?" * len(ticket_ids))
+        cursor.execute(f"""
+            INSERT INTO archive.tickets ({', '.join(self.TICKET_FIELDS)})
+            {self.join_ticket_select(list(self.TICKET_FIELDS))} WHERE t.id IN ({marks})
+        """, ticket_ids)
+        cursor.execute(f"""
+            INSERT INTO archive.tickets_fts (rowid, title, description, tags, comments)
+            SELECT rowid, title, description, tags, comments FROM main.tickets_fts WHERE rowid IN ({marks})
+        """, ticket_ids)
+        for table, columns in self.ARCHIVED_CHILD_TABLES.items():
+            cursor.execute(f"""
+                INSERT INTO archive.{table} ({', '.join(columns)})
+                SELECT {', '.join(columns)} FROM main.{table} WHERE ticket_id IN ({marks})
+            """, ticket_ids)
+        
+        return ticket_ids
+    
+    def remove_archived(self, cursor, ticket_ids: List[int]) -> List[int]:
+        """Write operation behind archive_closed_tickets: delete copied tickets from the hot tables
         
-        conn.close()
-        return statuses
+        Only tickets whose copy is still exact are deleted: the ticket row is
+        unchanged and every comment and history row was copied. The copies of
+        the others are dropped from the archive again.
+        """
+        marks = ", ".join("?" * len(ticket_ids))
+        unchanged = " AND ".join(
+            f"t.{field} IS a.{field}" for field, (_, alias) in self.TICKET_FIELDS.items() if alias is None
+        )
+        complete = " AND ".join(
+            f"NOT EXISTS (SELECT 1 FROM main.{table} c LEFT JOIN archive.{table} ac ON ac.id = c.id "
+            f"WHERE c.ticket_id = t.id AND ac.id IS NULL)"
+            for table in self.ARCHIVED_CHILD_TABLES
+        )
+        cursor.execute(f"""
+            SELECT t.id FROM main.tickets t JOIN archive.tickets a ON a.id = t.id
+            WHERE t.id IN ({marks}) AND {unchanged} AND {complete}
+        """, ticket_ids)
+        moved = [row['id'] for row in cursor.fetchall()]
+        
+        changed = sorted(set(ticket_ids) - set(moved))
+        if changed:
+            self.delete_ticket_rows(cursor, "archive", changed)
+        if moved:
+            self.delete_ticket_rows(cursor, "main", moved)
+        return moved
     
-    def get_users(self) -> List[Dict[str, Any]]:
-        """Get all users"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def delete_ticket_rows(self, cursor, schema: str, ticket_ids: List[int]):
+        """Delete tickets with their comments and history from ``schema`` (main or archive)"""
+        marks = ", ".join("?" * len(ticket_ids))
+        cursor.execute(f"DELETE FROM {schema}.tickets WHERE id IN ({marks})", ticket_ids)
+        for table in self.ARCHIVED_CHILD_TABLES:
+            cursor.execute(f"DELETE FROM {schema}.{table} WHERE ticket_id IN ({marks})", ticket_ids)
+        if schema == "archive":
+            # Triggers keep the main search index in step; the archive's is maintained here
+            cursor.execute(f"DELETE FROM archive.tickets_fts WHERE rowid IN ({marks})", ticket_ids)
+    
+    def is_archived(self, ticket_id: int) -> bool:
+        """Whether a ticket has been moved to the archive"""
+        with self.read_connection() as conn:
+            return conn.execute(
+                "SELECT 1 FROM archive.tickets WHERE id = ? AND id NOT IN (SELECT id FROM main.tickets WHERE id = ?)",
+                (ticket_id, ticket_id)
+            ).fetchone() is not None
+    
+    def get_archive_stats(self) -> Dict[str, Any]:
+        """Archive location and row counts"""
+        with self.read_connection() as conn:
+            row = conn.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM archive.tickets) as tickets,
+                    (SELECT COUNT(*) FROM archive.ticket_comments) as comments,
+                    (SELECT COUNT(*) FROM archive.ticket_history) as history,
+                    (SELECT MAX(archived_at) FROM archive.tickets) as last_archived_at
+            """).fetchone()
+        return {'path': self.archive_path, **dict(row)}
+    
+    @staticmethod
+    def history_cutoff(retention_days: float) -> str:
+        """Start of the oldest day whose field-level history is kept (compaction only touches whole days before it)"""
+        return (datetime.now(timezone.utc) - timedelta(days=retention_days)).strftime('%Y-%m-%d')
+    
+    def compact_history(self, retention_days: float = DEFAULT_HISTORY_RETENTION_DAYS,
+                        batch_size: int = 250, pause: float = 0.005) -> int:
+        """Merge ticket_history rows older than ``retention_days`` into per-day summaries and return the rows removed
+        
+        All changes of one ticket to one field on one (UTC) day become a
+        single row: the last change's id, user and time, the first change's
+        old_value, the last one's new_value and ``change_count`` changes.
+        Summary ids are ids the change feed has already sent, so resuming
+        clients see nothing new. Each batch of about ``batch_size`` old rows
+        is its own short write transaction, and the job sleeps ``pause``
+        seconds between batches so API writes queued behind one batch commit
+        on their own instead of alongside the next.
+        """
+        cutoff = self.history_cutoff(retention_days)
+        removed = 0
+        while True:
+            rows, deleted = self.execute_write(self.apply_history_compaction, cutoff, batch_size)
+            removed += deleted
+            if rows < batch_size:
+                return removed
+            time.sleep(pause)
+    
+    def apply_history_compaction(self, cursor, cutoff: str, batch_size: int) -> Tuple[int, int]:
+        """Write operation behind compact_history: compact the days of the oldest ``batch_size`` uncompacted rows
         
-        cursor.execute("SELECT * FROM users ORDER BY full_name")
-        users = [dict(row) for row in cursor.fetchall()]
+        Returns (rows read, rows deleted); fewer than ``batch_size`` rows read means none are left.
+        """
+        cursor.execute("""
+            SELECT DISTINCT ticket_id, substr(created_at, 1, 10) AS day FROM (
+                SELECT ticket_id, created_at FROM ticket_history INDEXED BY idx_ticket_history_uncompacted
+                WHERE change_count IS NULL AND created_at < ?
+                ORDER BY created_at LIMIT ?
+            )
+        """, (cutoff, batch_size))
+        days = [[row['ticket_id'], row['day']] for row in cursor.fetchall()]
+        if not days:
+            return 0, 0
         
-        conn.close()
-        return users
+        # Whole days, including rows past the LIMIT and summaries an earlier batch left for the same day
+        cursor.execute("""
+            SELECT h.id, h.ticket_id, h.action, h.old_value, h.change_count, json_extract(d.value, '$[1]') AS day
+            FROM json_each(?) d
+            JOIN ticket_history h ON h.ticket_id = json_extract(d.value, '$[0]')
+            WHERE substr(h.created_at, 1, 10) = json_extract(d.value, '$[1]')
+            ORDER BY h.id
+        """, (json.dumps(days),))
+        rows = cursor.fetchall()
+        groups: Dict[Tuple[int, str, str], List[sqlite3.Row]] = {}
+        for row in rows:
+            groups.setdefault((row['ticket_id'], row['day'], row['action']), []).append(row)
+        
+        summaries = []
+        deleted = []
+        for group in groups.values():
+            last = group[-1]
+            changes = sum(row['change_count'] or 1 for row in group)
+            if len(group) > 1 or last['change_count'] is None:
+                summaries.append([last['id'], group[0]['old_value'], changes])
+                deleted.extend(row['id'] for row in group[:-1])
+        
+        # One statement each: inside the writer's savepoint, row-at-a-time statements slow down as the batch grows
+        cursor.execute("""
+            UPDATE ticket_history
+            SET old_value = json_extract(s.value, '$[1]'), change_count = json_extract(s.value, '$[2]')
+            FROM json_each(?) s WHERE ticket_history.id = json_extract(s.value, '$[0]')
+        """, (json.dumps(summaries),))
+        cursor.execute("DELETE FROM ticket_history WHERE id IN (SELECT value FROM json_each(?))", (json.dumps(deleted),))
+        return len(rows), len(deleted)
     
-    def get_ticket_stats(self) -> Dict[str, Any]:
-        """Get ticket statistics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def get_history_stats(self, retention_days: float = DEFAULT_HISTORY_RETENTION_DAYS) -> Dict[str, Any]:
+        """ticket_history size, summary rows and rows older than the retention still waiting for compaction"""
+        with self.read_connection() as conn:
+            row = conn.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM ticket_history) as rows,
+                    (SELECT COUNT(*) FROM ticket_history WHERE change_count IS NOT NULL) as summary_rows,
+                    (SELECT COUNT(*) FROM ticket_history INDEXED BY idx_ticket_history_uncompacted
+                     WHERE change_count IS NULL AND created_at < ?) as pending_rows
+            """, (self.history_cutoff(retention_days),)).fetchone()
+        return {'retention_days': retention_days, **dict(row)}
+    
+    def get_changes(self, since: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """ticket_history rows with id greater than ``since``, oldest first
         
-        # Total tickets
-        cursor.execute("SELECT COUNT(*) FROM tickets")
-        total_tickets = cursor.fetchone()[0]
+        SQLite commits one write transaction at a time, so history ids become
+        visible in increasing order and ``since`` works as a resumable cursor.
+        """
+        with self.read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT h.id, h.ticket_id, t.ticket_number, h.user_id, h.action,
+                       h.old_value, h.new_value, h.created_at
+                FROM ticket_history h
+                LEFT JOIN tickets t ON h.ticket_id = t.id
+                WHERE h.id > ?
+                ORDER BY h.id
+                LIMIT ?
+            """, (since, limit))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def latest_change_id(self) -> int:
+        """Id of the newest ticket_history row (0 when there is none)"""
+        with self.read_connection() as conn:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM ticket_history").fetchone()[0]
+    
+    @staticmethod
+    def build_match_query(query: str) -> str:
+        """Turn user search text into an FTS5 MATCH expression
         
-        # Open tickets
-        cursor.execute("SELECT COUNT(*) FROM tickets WHERE status_id IN (1, 2, 3)")
-        open_tickets = cursor.fetchone()[0]
+        Words are ANDed together, "quoted text" is matched as a phrase and a
+        trailing * makes a word (or phrase) a prefix query. Everything else is
+        quoted so FTS5 operators in user input cannot cause syntax errors.
+        """
+        terms = []
+        for match in re.finditer(r'"([^"]*)"(\*?)|(\S+)', query):
+            text = match.group(1) if match.group(1) is not None else match.group(3)
+            prefix = match.group(2) or ''
+            if match.group(3) is not None and text.endswith('*'):
+                text, prefix = text.rstrip('*'), '*'
+            
+            text = text.replace('"', ' ').strip()
+            if not re.search(r'\w', text):
+                continue
+            terms.append(f'"{text}"{prefix}')
         
-        # Resolved tickets
-        cursor.execute("SELECT COUNT(*) FROM tickets WHERE status_id = 4")
-        resolved_tickets = cursor.fetchone()[0]
+        return " ".join(terms)
+    
+    def search_tickets(self, query: str, limit: int = 20, offset: int = 0,
+                       include_archived: bool = False) -> Dict[str, Any]:
+        """Full-text search over ticket title, description, tags and public comments
         
-        # Critical priority tickets
-        cursor.execute("SELECT COUNT(*) FROM tickets WHERE priority_id = 1 AND status_id IN (1, 2, 3)")
-        critical_tickets = cursor.fetchone()[0]
+        With ``include_archived`` the archive's index is searched too and both
+        result sets are ranked together.
+        """
+        match = self.build_match_query(query)
+        if not match:
+            raise ValueError("Search query must contain at least one word")
+        
+        # Columns in TICKET_FIELDS order, so hot and archived rows line up in a UNION
+        if self.read_model:
+            columns, table, joins = "t.*", "tickets_view", ""
+        else:
+            columns = ", ".join(f"{expression} as {field}" for field, (expression, _) in self.TICKET_FIELDS.items())
+            table, joins = "tickets", self.TICKET_JOINS
+        
+        hot = f"""
+            SELECT
+                {columns},
+                snippet(tickets_fts, -1, '<mark>', '</mark>', '…', 16) as snippet,
+                tickets_fts.rank as rank
+            FROM tickets_fts
+            JOIN {table} t ON t.id = tickets_fts.rowid
+            {joins}
+            WHERE tickets_fts MATCH ?
+        """
         
-        # Tickets by category
-        cursor.execute("""
-            SELECT c.name, COUNT(*) as count
-            FROM tickets t
-            JOIN categories c ON t.category_id = c.id
-            GROUP BY c.id, c.name
-            ORDER BY count DESC
-        """)
-        tickets_by_category = [dict(row) for row in cursor.fetchall()]
+        with self.read_connection() as conn:
+            cursor = conn.execute("SELECT COUNT(*) FROM tickets_fts WHERE tickets_fts MATCH ?", (match,))
+            total_results = cursor.fetchone()[0]
+            
+            if not include_archived:
+                cursor = conn.execute(f"{hot} ORDER BY tickets_fts.rank LIMIT ? OFFSET ?", (match, limit, offset))
+            else:
+                cursor = conn.execute("SELECT COUNT(*) FROM archive.tickets_fts f WHERE f.tickets_fts MATCH ?", (match,))
+                total_results += cursor.fetchone()[0]
+                
+                cursor = conn.execute(f"""
+                    SELECT * FROM (
+                        {hot}
+                        UNION ALL
+                        SELECT
+                            {', '.join(f"t.{field}" for field in self.TICKET_FIELDS)},
+                            snippet(f.tickets_fts, -1, '<mark>', '</mark>', '…', 16) as snippet,
+                            f.rank as rank
+                        FROM archive.tickets_fts f
+                        JOIN archive.tickets t ON t.id = f.rowid
+                        WHERE f.tickets_fts MATCH ?
+                    )
+                    ORDER BY rank
+                    LIMIT ? OFFSET ?
+                """, (match, match, limit, offset))
+            results = [dict(row) for row in cursor.fetchall()]
+        
+        return {'total_results': total_results, 'results': results}
+    
+    def get_categories(self) -> List[Dict[str, Any]]:
+        """Get all categories"""
+        return self.reference.rows('categories')
+    
+    def get_priority_levels(self) -> List[Dict[str, Any]]:
+        """Get all priority levels"""
+        return self.reference.rows('priority_levels')
+    
+    def get_statuses(self) -> List[Dict[str, Any]]:
+        """Get all statuses"""
+        return self.reference.rows('statuses')
+    
+    def get_users(self) -> List[Dict[str, Any]]:
+        """Get all users"""
+        return self.reference.rows('users')
+    
+    def reference_exists(self, table: str, row_id: Optional[int]) -> bool:
+        """Check that an ID exists in users, categories, priority_levels or statuses"""
+        return self.reference.exists(table, row_id)
+    
+    def get_reference_payload(self, table: str, key: str, build) -> Any:
+        """Get a serialized reference-table response, rebuilt only when the table changes"""
+        return self.reference.payload(table, key, build)
+    
+    def get_data_version(self, tables: Tuple[str, ...] = VERSIONED_TABLES) -> str:
+        """Current change counters for ``tables`` as one string (changes whenever any of them is written)
         
-        # Tickets by priority
-        cursor.execute("""
-            SELECT p.name, COUNT(*) as count
-            FROM tickets t
-            JOIN priority_levels p ON t.priority_id = p.id
-            GROUP BY p.id, p.name
-            ORDER BY p.sla_hours
-        """)
-        tickets_by_priority = [dict(row) for row in cursor.fetchall()]
+        Always read from the database rather than the reference cache, so a
+        version is never older than the last commit.
+        """
+        names = ['database', *tables]
+        with self.read_connection() as conn:
+            rows = conn.execute(
+                f"SELECT name, version FROM table_versions WHERE name IN ({', '.join('?' * len(names))}) ORDER BY name",
+                names
+            ).fetchall()
+        return ";".join(f"{row['name']}:{row['version']}" for row in rows)
+    
+    def get_reference_stats(self) -> Dict[str, Any]:
+        """Get reference-data cache statistics"""
+        return self.reference.stats()
+    
+    def get_tag_facets(self, status_id: Optional[int] = None, category_id: Optional[int] = None,
+                       limit: int = 50) -> List[Dict[str, Any]]:
+        """Ticket count per tag, most used first, optionally within one status and/or category
         
-        conn.close()
+        Counts come from ticket_tags alone: the primary key when unscoped, or
+        the (status_id, tag) / (category_id, tag) index when scoped.
+        """
+        where_clauses, params = [], []
+        if status_id:
+            where_clauses.append("status_id = ?")
+            params.append(status_id)
+        if category_id:
+            where_clauses.append("category_id = ?")
+            params.append(category_id)
+        
+        query = "SELECT tag, COUNT(*) as count FROM ticket_tags"
+        if where_clauses:
+            query += " WHERE " + " AND ".join(where_clauses)
+        query += " GROUP BY tag ORDER BY count DESC, tag LIMIT ?"
+        params.append(limit)
+        
+        with self.read_connection() as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+    
+    def get_ticket_stats(self) -> Dict[str, Any]:
+        """Get ticket statistics from the trigger-maintained ticket_counts table"""
+        with self.read_connection() as conn:
+            cursor = conn.execute(
+                "SELECT status_id, priority_id, category_id, count FROM ticket_counts WHERE count > 0"
+            )
+            counts = cursor.fetchall()
+        
+        total_tickets = 0
+        open_tickets = 0
+        resolved_tickets = 0
+        critical_tickets = 0
+        by_category: Dict[int, int] = {}
+        by_priority: Dict[int, int] = {}
+        
+        for row in counts:
+            count = row['count']
+            total_tickets += count
+            if row['status_id'] in self.OPEN_STATUS_IDS:
+                open_tickets += count
+                if row['priority_id'] == self.CRITICAL_PRIORITY_ID:
+                    critical_tickets += count
+            elif row['status_id'] == self.RESOLVED_STATUS_ID:
+                resolved_tickets += count
+            by_category[row['category_id']] = by_category.get(row['category_id'], 0) + count
+            by_priority[row['priority_id']] = by_priority.get(row['priority_id'], 0) + count
+        
+        # Names come from the reference cache; IDs without a matching row are skipped like the old JOINs did
+        categories = {c['id']: c for c in self.get_categories()}
+        priorities = {p['id']: p for p in self.get_priority_levels()}
+        
+        tickets_by_category = [
+            {'name': categories[category_id]['name'], 'count': count}
+            for category_id, count in sorted(by_category.items(), key=lambda item: (-item[1], item[0]))
+            if category_id in categories
+        ]
+        tickets_by_priority = [
+            {'name': priorities[priority_id]['name'], 'count': count}
+            for priority_id, count in sorted(by_priority.items(), key=lambda item: (priorities.get(item[0], {}).get('sla_hours', 0), item[0]))
+            if priority_id in priorities
+        ]
         
         return {
             'total_tickets': total_tickets,
@@ -549,6 +2870,211 @@ class TicketDatabase:
             'tickets_by_category': tickets_by_category,
             'tickets_by_priority': tickets_by_priority
         }
+    
+    def get_ticket_timeseries(self, bucket: str = 'day', group_by: Optional[str] = None,
+                              start: Optional[datetime] = None, end: Optional[datetime] = None,
+                              category_id: Optional[int] = None, priority_id: Optional[int] = None) -> Dict[str, Any]:
+        """Created, resolved and escalated counts per ``bucket`` (and per category or priority), oldest first
+        
+        Sums the hourly (``bucket='hour'``) or daily ticket_rollups rows from
+        the start of the bucket holding ``start`` up to ``end`` (default: now,
+        and the bucket's default span before it). Buckets without events are
+        left out.
+        """
+        if bucket not in self.ROLLUP_BUCKETS:
+            raise ValueError(f"Unknown bucket: {bucket} (expected {', '.join(self.ROLLUP_BUCKETS)})")
+        if group_by is not None and group_by not in self.ROLLUP_GROUPS:
+            raise ValueError(f"Unknown group_by: {group_by} (expected {', '.join(self.ROLLUP_GROUPS)})")
+        
+        period, bucket_sql, default_span = self.ROLLUP_BUCKETS[bucket]
+        end = end or datetime.now(timezone.utc)
+        start_text = self.format_timestamp(start or end - default_span)
+        end_text = self.format_timestamp(end)
+        if start_text >= end_text:
+            raise ValueError("start must be before end")
+        
+        first_bucket = bucket_sql.format(self.ROLLUP_PERIODS[period].format('?'))
+        where_clauses = ["r.period = ?", f"r.bucket_start >= {first_bucket}", "r.bucket_start < ?"]
+        params: List[Any] = [period, start_text, end_text]
+        for column, value in (('category_id', category_id), ('priority_id', priority_id)):
+            if value:
+                where_clauses.append(f"r.{column} = ?")
+                params.append(value)
+        
+        if group_by:
+            column, table = self.ROLLUP_GROUPS[group_by]
+            group_columns = f"r.{column} AS group_id, g.name AS group_name"
+            group_join = f"LEFT JOIN {table} g ON g.id = r.{column}"
+            group_keys = f", r.{column}"
+        else:
+            group_columns, group_join, group_keys = "NULL AS group_id, NULL AS group_name", "", ""
+        
+        query = f"""
+            SELECT {bucket_sql.format('r.bucket_start')} AS bucket_start, {group_columns},
+                   SUM(r.created) AS created, SUM(r.resolved) AS resolved, SUM(r.escalated) AS escalated
+            FROM ticket_rollups r {group_join}
+            WHERE {' AND '.join(where_clauses)}
+            GROUP BY 1{group_keys}
+            ORDER BY 1{group_keys}
+        """
+        with self.read_connection() as conn:
+            points = [dict(row) for row in conn.execute(query, params).fetchall()]
+        return {'bucket': bucket, 'group_by': group_by, 'start': start_text, 'end': end_text, 'points': points}
+    
+    def check_ticket_counts(self) -> List[Dict[str, Any]]:
+        """Compare ticket_counts with a full GROUP BY over tickets and return any drift"""
+        with self.read_connection() as conn:
+            cursor = conn.execute("""
+                SELECT status_id, priority_id, category_id, SUM(expected) as expected, SUM(counted) as counted
+                FROM (
+                    SELECT status_id, priority_id, category_id, COUNT(*) as expected, 0 as counted
+                    FROM tickets GROUP BY status_id, priority_id, category_id
+                    UNION ALL
+                    SELECT status_id, priority_id, category_id, 0, count FROM ticket_counts
+                )
+                GROUP BY status_id, priority_id, category_id
+                HAVING SUM(expected) != SUM(counted)
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def rebuild_ticket_counts(self, cursor=None):
+        """Recompute ticket_counts from the tickets table"""
+        if cursor is None:
+            with self.connection() as conn:
+                return self.rebuild_ticket_counts(conn.cursor())
+        
+        cursor.execute("DELETE FROM ticket_counts")
+        cursor.execute("""
+            INSERT INTO ticket_counts (status_id, priority_id, category_id, count)
+            SELECT status_id, priority_id, category_id, COUNT(*)
+            FROM tickets
+            GROUP BY status_id, priority_id, category_id
+        """)
+    
+    def rebuild_ticket_rollups(self, cursor=None):
+        """Recompute ticket_rollups from tickets and ticket_history, archived ones included
+        
+        The triggers count each event under the category and priority the
+        ticket had at the time; a rebuild can only use the current ones. Days
+        of history already compacted into summaries show one change per field,
+        so repeated resolutions on such a day count once.
+        """
+        if cursor is None:
+            with self.connection() as conn:
+                return self.rebuild_ticket_rollups(conn.cursor())
+        
+        hour = self.ROLLUP_PERIODS['hour']
+        events = self.status_event_sql("h.")
+        sums = ', '.join(f'SUM({column})' for column in events)
+        # Rows an interrupted archival left in both databases are counted from main
+        tickets = """
+            SELECT id, created_at, category_id, priority_id FROM main.tickets
+            UNION ALL
+            SELECT id, created_at, category_id, priority_id FROM archive.tickets
+            WHERE id NOT IN (SELECT id FROM main.tickets)
+        """
+        history = """
+            SELECT ticket_id, action, new_value, created_at FROM main.ticket_history
+            UNION ALL
+            SELECT ticket_id, action, new_value, created_at FROM archive.ticket_history
+            WHERE id NOT IN (SELECT id FROM main.ticket_history)
+        """
+        cursor.execute("DELETE FROM ticket_rollups")
+        cursor.execute(f"""
+            INSERT INTO ticket_rollups (period, bucket_start, category_id, priority_id, created, {', '.join(events)})
+            SELECT 'hour', bucket_start, category_id, priority_id, SUM(created), {sums}
+            FROM (
+                SELECT {hour.format(self.rollup_time_sql('created_at'))} AS bucket_start, category_id, priority_id, 1 AS created,
+                       {', '.join(f'0 AS {column}' for column in events)}
+                FROM ({tickets})
+                UNION ALL
+                SELECT {hour.format(self.rollup_time_sql('h.created_at'))}, t.category_id, t.priority_id, 0, {', '.join(events.values())}
+                FROM ({history}) h JOIN ({tickets}) t ON t.id = h.ticket_id
+                WHERE {' OR '.join(events.values())}
+            )
+            GROUP BY bucket_start, category_id, priority_id
+        """)
+        # Coarser periods are sums of the hours they hold
+        for period, period_sql in self.ROLLUP_PERIODS.items():
+            if period == 'hour':
+                continue
+            cursor.execute(f"""
+                INSERT INTO ticket_rollups (period, bucket_start, category_id, priority_id, created, {', '.join(events)})
+                SELECT ?, {period_sql.format('bucket_start')}, category_id, priority_id, SUM(created), {sums}
+                FROM ticket_rollups WHERE period = 'hour'
+                GROUP BY 2, category_id, priority_id
+            """, (period,))
+
+class AsyncTicketDatabase:
+    """Awaitable facade over TicketDatabase
+    
+    Every public TicketDatabase method is exposed as a coroutine that runs on a
+    dedicated, bounded thread pool, so SQLite work never blocks the event loop.
+    Calls beyond ``max_workers`` queue for a free worker.
+    """
+    
+    def __init__(self, database: TicketDatabase, max_workers: int = DEFAULT_DB_THREADS):
+        self.database = database
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ticket-db")
+    
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking callable on the database thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+    
+    async def write(self, operation, *args):
+        """Await a write operation, directly on the writer's Future when group commit is on"""
+        if self.database.writer and self.database.writer.alive:
+            return await asyncio.wrap_future(self.database.writer.submit(operation, *args))
+        return await self.run(self.database.execute_write, operation, *args)
+    
+    async def create_ticket(self, ticket_data: Dict[str, Any]) -> Dict[str, Any]:
+        created = await self.write(self.database.insert_ticket, ticket_data)
+        self.database.ticket_cache.invalidate(created['id'])
+        return created
+    
+    async def update_ticket(self, ticket_id: int, update_data: Dict[str, Any], user_id: int) -> bool:
+        try:
+            return await self.write(self.database.apply_ticket_update, ticket_id, update_data, user_id)
+        finally:
+            self.database.ticket_cache.invalidate(ticket_id)
+    
+    def __getattr__(self, name: str):
+        attr = getattr(self.database, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+        
+        async def method(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+        
+        method.__name__ = name
+        method.__doc__ = attr.__doc__
+        return method
+    
+    def shutdown(self):
+        """Wait for queued calls and stop the worker threads"""
+        self.executor.shutdown(wait=True)
+
+# The application's shared instances, created on first use so that importing this module
+# (manage.py, benchmark.py) does not open, migrate or start a writer for ./tickets.db
+_default_db: Optional[TicketDatabase] = None
+_default_async_db: Optional[AsyncTicketDatabase] = None
+_default_lock = threading.Lock()
+
+def get_db() -> TicketDatabase:
+    """The application's TicketDatabase, created on the first call"""
+    global _default_db
+    with _default_lock:
+        if _default_db is None:
+            _default_db = TicketDatabase()
+        return _default_db
 
-# Initialize database when module is imported
-db = TicketDatabase()
+def get_async_db() -> AsyncTicketDatabase:
+    """The application's AsyncTicketDatabase over get_db(), created on the first call"""
+    global _default_async_db
+    database = get_db()
+    with _default_lock:
+        if _default_async_db is None:
+            _default_async_db = AsyncTicketDatabase(database)
+        return _default_async_db
@@ -4,14 +4,101 @@ FastAPI Ticketing System
 Independent ticket management system with SQLite database
 """
 
-from fastapi import FastAPI, HTTPException, Query, Depends
+from fastapi import FastAPI, HTTPException, Query, Depends, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter, create_model
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Union, Literal, Tuple
 from datetime import datetime
+from contextlib import asynccontextmanager
+from functools import lru_cache
+import asyncio
+import csv
+import hashlib
+import io
+import json
+import os
+import re
 import uvicorn
 
-from database import db
+try:
+    import orjson
+except ImportError:  # Optional: responses fall back to pydantic's serializer
+    orjson = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # Optional: only format=arrow exports need it
+    pa = None
+
+from database import get_db, get_async_db
+from changes import change_feed
+
+db = get_db()
+async_db = get_async_db()
+
+# Most tickets one GET /tickets?ids= call may ask for
+MAX_IDS = 100
+
+# Serve rows from our own SQL through orjson, checking each response shape once (needs orjson)
+FAST_JSON = orjson is not None and os.getenv("TICKETS_FAST_JSON", "1") != "0"
+
+# Seconds between SLA escalation runs (0 disables the job)
+SLA_ESCALATION_INTERVAL = float(os.getenv("TICKETS_SLA_ESCALATION_INTERVAL", "60"))
+
+# Seconds between archival runs (0 disables the job; manage.py archive still works)
+ARCHIVE_INTERVAL = float(os.getenv("TICKETS_ARCHIVE_INTERVAL", "3600"))
+
+# Seconds between ticket_history compaction runs (0 disables the job; manage.py compact-history still works)
+HISTORY_COMPACTION_INTERVAL = float(os.getenv("TICKETS_HISTORY_COMPACTION_INTERVAL", "3600"))
+
+async def escalate_overdue_tickets():
+    """Move overdue tickets to Escalated"""
+    escalated = await async_db.escalate_overdue()
+    if escalated:
+        change_feed.notify()
+        print(f"⏫ Escalated {len(escalated)} overdue tickets")
+
+async def archive_closed_tickets():
+    """Move old Closed tickets to the archive database"""
+    archived = await async_db.archive_closed_tickets()
+    if archived:
+        print(f"🗄️ Archived {archived} closed tickets")
+
+async def compact_history():
+    """Merge old field-level history into per-day summaries"""
+    removed = await async_db.compact_history()
+    if removed:
+        print(f"🗜️ Compacted away {removed} history rows")
+
+async def run_periodically(interval: float, job, name: str):
+    """Run ``job`` every ``interval`` seconds until cancelled, logging failures"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await job()
+        except Exception as e:
+            print(f"❌ {name} failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the background jobs; stop them, the database worker threads and pooled connections on shutdown"""
+    jobs = [
+        asyncio.create_task(run_periodically(interval, job, name))
+        for interval, job, name in (
+            (SLA_ESCALATION_INTERVAL, escalate_overdue_tickets, "SLA escalation"),
+            (ARCHIVE_INTERVAL, archive_closed_tickets, "Archival"),
+            (HISTORY_COMPACTION_INTERVAL, compact_history, "History compaction")
+        )
+        if interval > 0
+    ]
+    yield
+    for job in jobs:
+        job.cancel()
+    change_feed.close()
+    async_db.shutdown()
+    db.close()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -19,7 +106,8 @@ app = FastAPI(
     description="Independent ticketing system for customer support",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -40,6 +128,9 @@ class TicketCreate(BaseModel):
     priority_id: int
     tags: Optional[str] = ""
 
+class BulkTicketCreate(BaseModel):
+    tickets: List[TicketCreate] = Field(..., min_length=1, max_length=10000)
+
 class TicketUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=1, max_length=200)
     description: Optional[str] = Field(None, min_length=10)
@@ -74,6 +165,33 @@ class TicketResponse(BaseModel):
     due_date: Optional[str]
     tags: Optional[str]
 
+class TicketSummary(BaseModel):
+    id: int
+    ticket_number: str
+    title: str
+    user_full_name: str
+    category_id: int
+    category_name: str
+    priority_id: int
+    priority_name: str
+    priority_color: str
+    status_id: int
+    status_name: str
+    status_color: str
+    assigned_to: Optional[int]
+    assigned_full_name: Optional[str]
+    created_at: str
+    updated_at: str
+    tags: Optional[str]
+
+class TicketPage(BaseModel):
+    tickets: List[TicketResponse]
+    next_cursor: Optional[str]
+
+class TicketSummaryPage(BaseModel):
+    tickets: List[TicketSummary]
+    next_cursor: Optional[str]
+
 class TicketStats(BaseModel):
     total_tickets: int
     open_tickets: int
@@ -82,6 +200,90 @@ class TicketStats(BaseModel):
     tickets_by_category: List[Dict[str, Any]]
     tickets_by_priority: List[Dict[str, Any]]
 
+class TicketComment(BaseModel):
+    id: int
+    user_id: int
+    user_full_name: Optional[str]
+    comment: str
+    is_internal: bool
+    created_at: str
+
+class TicketHistoryEntry(BaseModel):
+    id: int
+    user_id: int
+    user_full_name: Optional[str]
+    action: str
+    old_value: Optional[str]
+    new_value: Optional[str]
+    change_count: int
+    created_at: str
+
+class TicketCommentPage(BaseModel):
+    comments: List[TicketComment]
+    comments_next: Optional[int]
+
+class TicketHistoryPage(BaseModel):
+    history: List[TicketHistoryEntry]
+    history_next: Optional[int]
+
+# Model of each relation that include= can embed
+RELATION_MODELS = {'comments': TicketComment, 'history': TicketHistoryEntry}
+RELATION_PAGE_ADAPTERS = {'comments': TypeAdapter(TicketCommentPage), 'history': TypeAdapter(TicketHistoryPage)}
+
+class SlaTicket(TicketSummary):
+    due_date: Optional[str]
+    breached: bool
+
+class SlaBreaching(BaseModel):
+    within_seconds: int
+    tickets: List[SlaTicket]
+
+class TagFacet(BaseModel):
+    tag: str
+    count: int
+
+class TagFacets(BaseModel):
+    tags: List[TagFacet]
+
+class TimeseriesPoint(BaseModel):
+    bucket_start: str
+    group_id: Optional[int]
+    group_name: Optional[str]
+    created: int
+    resolved: int
+    escalated: int
+
+class Timeseries(BaseModel):
+    bucket: str
+    group_by: Optional[str]
+    start: str
+    end: str
+    points: List[TimeseriesPoint]
+
+class TicketChange(BaseModel):
+    id: int
+    ticket_id: int
+    ticket_number: Optional[str]
+    user_id: int
+    action: str
+    old_value: Optional[str]
+    new_value: Optional[str]
+    created_at: str
+
+class TicketChangePage(BaseModel):
+    changes: List[TicketChange]
+    next_since: int
+    has_more: bool
+
+TICKET_ADAPTER = TypeAdapter(TicketResponse)
+TICKET_LIST_ADAPTER = TypeAdapter(List[TicketResponse])
+TICKET_PAGE_ADAPTER = TypeAdapter(TicketPage)
+TICKET_STATS_ADAPTER = TypeAdapter(TicketStats)
+TICKET_CHANGE_PAGE_ADAPTER = TypeAdapter(TicketChangePage)
+TAG_FACETS_ADAPTER = TypeAdapter(TagFacets)
+SLA_BREACHING_ADAPTER = TypeAdapter(SlaBreaching)
+TIMESERIES_ADAPTER = TypeAdapter(Timeseries)
+
 class CategoryResponse(BaseModel):
     id: int
     name: str
@@ -108,6 +310,14 @@ class UserResponse(BaseModel):
     full_name: str
     role: str
 
+# Reference table -> adapter for its list response
+REFERENCE_ADAPTERS = {
+    'categories': TypeAdapter(List[CategoryResponse]),
+    'priority_levels': TypeAdapter(List[PriorityResponse]),
+    'statuses': TypeAdapter(List[StatusResponse]),
+    'users': TypeAdapter(List[UserResponse])
+}
+
 # Health check endpoint
 @app.get("/")
 async def root():
@@ -121,119 +331,478 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@lru_cache(maxsize=128)
+def projection_adapter(fields: Tuple[str, ...], paged: bool) -> TypeAdapter:
+    """TypeAdapter for a projected ticket list or page, built once per field set"""
+    if fields == tuple(db.SUMMARY_FIELDS):
+        model = TicketSummary
+    else:
+        model = create_model(
+            "TicketProjection",
+            **{field: (TicketResponse.model_fields[field].annotation, ...) for field in fields}
+        )
+    
+    if paged:
+        return TypeAdapter(create_model(f"{model.__name__}Page", tickets=(List[model], ...), next_cursor=(Optional[str], ...)))
+    return TypeAdapter(List[model])
+
+@lru_cache(maxsize=128)
+def include_adapter(fields: Tuple[str, ...], include: Tuple[str, ...], many: bool) -> TypeAdapter:
+    """TypeAdapter for tickets (all fields or a projection) with embedded relations, built once per shape"""
+    columns = {field: (TicketResponse.model_fields[field].annotation, ...) for field in fields or TicketResponse.model_fields}
+    for relation in include:
+        columns[relation] = (List[RELATION_MODELS[relation]], ...)
+        columns[f"{relation}_next"] = (Optional[int], ...)
+    model = create_model("TicketWithRelations", **columns)
+    return TypeAdapter(List[model] if many else model)
+
+# Adapters whose response shape has already been checked once in FAST_JSON mode
+validated_adapters = set()
+
+def has_rows(content: Any) -> bool:
+    """Whether a list, or a page holding lists, carries at least one row to validate a shape against"""
+    if isinstance(content, list):
+        return bool(content)
+    if isinstance(content, dict):
+        lists = [value for value in content.values() if isinstance(value, list)]
+        return not lists or any(lists)
+    return True
+
+def encode_json(content: Any, adapter: Optional[TypeAdapter] = None) -> bytes:
+    """Serialize data built by our own queries to JSON bytes
+    
+    With FAST_JSON the content is validated against ``adapter`` until that
+    shape has been served with at least one row, then handed to orjson as-is. Otherwise it is
+    validated and dumped by pydantic on every call, as response_model would.
+    """
+    if FAST_JSON:
+        if adapter is not None and adapter not in validated_adapters:
+            adapter.validate_python(content)
+            if has_rows(content):
+                validated_adapters.add(adapter)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    
+    if adapter is None:
+        return JSONResponse(jsonable_encoder(content)).body
+    return adapter.dump_json(adapter.validate_python(content))
+
+def json_response(content: Any, adapter: Optional[TypeAdapter] = None, response: Optional[Response] = None) -> Response:
+    """JSON response for data built by our own queries; headers already set on ``response`` are kept"""
+    headers = dict(response.headers) if response is not None else None
+    return Response(content=encode_json(content, adapter), media_type="application/json", headers=headers)
+
+async def not_modified(request: Request, response: Response) -> Optional[Response]:
+    """Set an ETag from the database change counters; a 304 response if the client already has it
+    
+    The tag covers the path, the query string and the table_versions counters
+    that triggers bump on every ticket or reference write, so answering a
+    matching If-None-Match costs one small read instead of the endpoint's queries.
+    """
+    version = await async_db.get_data_version()
+    digest = hashlib.blake2b(f"{request.url.path}?{request.url.query}|{version}".encode(), digest_size=12).hexdigest()
+    etag = f'W/"{digest}"'
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags or etag.removeprefix("W/") in tags:
+            return Response(status_code=304, headers=dict(response.headers))
+    return None
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """Split a comma-separated fields parameter"""
+    return [field.strip() for field in (fields or "").split(",") if field.strip()]
+
+def parse_duration(value: str) -> int:
+    """Seconds in a duration such as 90, 30m, 4h or 2d"""
+    match = re.fullmatch(r"(\d+)([smhd]?)", value.strip())
+    if not match:
+        raise ValueError("Durations look like 90, 30m, 4h or 2d")
+    return int(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}[match.group(2)]
+
+def parse_ids(ids: str) -> List[int]:
+    """Split a comma-separated ids parameter"""
+    try:
+        ticket_ids = [int(value) for value in parse_fields(ids)]
+    except ValueError:
+        raise ValueError("ids must be comma-separated ticket IDs")
+    if not ticket_ids or len(ticket_ids) > MAX_IDS:
+        raise ValueError(f"ids must list between 1 and {MAX_IDS} ticket IDs")
+    return ticket_ids
+
+def ndjson_lines(columns: List[str], batches: Iterator[List[tuple]]) -> Iterator[bytes]:
+    """Encode row batches as newline-delimited JSON, one chunk per batch"""
+    dumps = orjson.dumps if FAST_JSON else (lambda row: json.dumps(row).encode())
+    for rows in batches:
+        yield b"".join(dumps(dict(zip(columns, row))) + b"\n" for row in rows)
+
+def csv_lines(columns: List[str], batches: Iterator[List[tuple]]) -> Iterator[str]:
+    """Encode row batches as CSV with a header row, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def arrow_stream(schema: 'pa.Schema', batches: Iterator['pa.RecordBatch']) -> Iterator[bytes]:
+    """Encode record batches as an Arrow IPC stream, one chunk per batch"""
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    # Schema (for an empty export) and the end-of-stream marker
+    yield sink.getvalue()
+
 # Ticket endpoints
-@app.get("/tickets", response_model=List[TicketResponse])
+@app.get("/tickets", response_model=Union[List[TicketResponse], TicketPage, List[TicketSummary], TicketSummaryPage])
 async def get_tickets(
+    request: Request,
+    response: Response,
     limit: int = Query(50, ge=1, le=100, description="Number of tickets to return"),
     offset: int = Query(0, ge=0, description="Number of tickets to skip"),
+    pagination: Literal["offset", "cursor"] = Query("offset", description="cursor returns keyset-paginated pages with next_cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (implies pagination=cursor)"),
+    include_total: bool = Query(False, description="With pagination=cursor: send X-Total-Count even when it needs a scan"),
     status_id: Optional[int] = Query(None, description="Filter by status ID"),
     priority_id: Optional[int] = Query(None, description="Filter by priority ID"),
-    category_id: Optional[int] = Query(None, description="Filter by category ID")
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    tag: Optional[str] = Query(None, description="Filter by tag (case-insensitive)"),
+    created_after: Optional[datetime] = Query(None, description="Only tickets created at or after this time (ISO 8601, UTC unless an offset is given)"),
+    created_before: Optional[datetime] = Query(None, description="Only tickets created before this time"),
+    updated_since: Optional[datetime] = Query(None, description="Only tickets updated at or after this time, for incremental sync"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,status_name"),
+    view: Literal["full", "summary"] = Query("full", description="summary returns the list-view fields without descriptions"),
+    ids: Optional[str] = Query(None, description=f"Comma-separated ticket IDs (up to {MAX_IDS}) to fetch in that order instead of listing"),
+    include: Optional[str] = Query(None, description="With ids: embed comments and/or history, e.g. comments,history"),
+    include_limit: int = Query(20, ge=1, le=200, description="Newest comments/history entries embedded per ticket")
 ):
-    """Get tickets with optional filtering"""
+    """Get tickets with optional filtering
+    
+    By default this returns a plain list using offset pagination. With
+    ``pagination=cursor`` (or a ``cursor``) it returns ``{"tickets": [...],
+    "next_cursor": ...}``, where each page costs the same regardless of depth.
+    ``X-Total-Count`` is sent when it comes from ticket_counts (no tag or time
+    filters), otherwise only with ``include_total``.
+    ``fields`` and ``view=summary`` select only the listed columns (``id`` is
+    always included) and skip the joins and validation of the full model.
+    ``ids`` fetches exactly those tickets (filters and pagination do not
+    apply), and ``include`` embeds their newest comments and history.
+    ``created_after``, ``created_before`` and ``updated_since`` are index
+    range scans; stored timestamps are UTC.
+    Responses carry an ETag; a matching ``If-None-Match`` gets ``304``.
+    """
     try:
-        tickets = db.get_tickets(
+        if fields is not None and view == "summary":
+            raise HTTPException(status_code=400, detail="fields cannot be combined with view=summary")
+        
+        if view == "summary":
+            selected = db.resolve_fields(list(db.SUMMARY_FIELDS))
+        else:
+            selected = db.resolve_fields(parse_fields(fields))
+        
+        relations = db.resolve_include(parse_fields(include))
+        if relations and ids is None:
+            raise HTTPException(status_code=400, detail="include requires ids (or use GET /tickets/{id}?include=)")
+        if cursor is not None:
+            pagination = "cursor"
+        if ids is not None and (pagination == "cursor" or offset):
+            raise HTTPException(status_code=400, detail="ids cannot be combined with cursor or offset")
+        ticket_ids = parse_ids(ids) if ids is not None else None
+        
+        cached = await not_modified(request, response)
+        if cached is not None:
+            return cached
+        
+        if ticket_ids is not None:
+            tickets = await async_db.get_tickets_by_ids(
+                ticket_ids,
+                fields=selected,
+                include=relations,
+                include_limit=include_limit
+            )
+            if relations:
+                adapter = include_adapter(tuple(selected or ()), tuple(relations), True)
+            else:
+                adapter = projection_adapter(tuple(selected), False) if selected else TICKET_LIST_ADAPTER
+            return json_response(tickets, adapter, response)
+        
+        if pagination == "cursor":
+            if offset:
+                raise HTTPException(status_code=400, detail="offset cannot be combined with cursor")
+            
+            page = await async_db.get_tickets_page(
+                limit=limit,
+                cursor=cursor,
+                status_id=status_id,
+                priority_id=priority_id,
+                category_id=category_id,
+                tag=tag,
+                created_after=created_after,
+                created_before=created_before,
+                updated_since=updated_since,
+                fields=selected
+            )
+            total = await async_db.count_tickets(
+                status_id=status_id,
+                priority_id=priority_id,
+                category_id=category_id,
+                tag=tag,
+                created_after=created_after,
+                created_before=created_before,
+                updated_since=updated_since,
+                scan=include_total
+            )
+            if total is not None:
+                response.headers["X-Total-Count"] = str(total)
+            if page['next_cursor']:
+                response.headers["X-Next-Cursor"] = page['next_cursor']
+            adapter = projection_adapter(tuple(selected), True) if selected else TICKET_PAGE_ADAPTER
+            return json_response(page, adapter, response)
+        
+        tickets = await async_db.get_tickets(
             limit=limit,
             offset=offset,
             status_id=status_id,
             priority_id=priority_id,
-            category_id=category_id
+            category_id=category_id,
+            tag=tag,
+            created_after=created_after,
+            created_before=created_before,
+            updated_since=updated_since,
+            fields=selected
         )
-        return tickets
+        adapter = projection_adapter(tuple(selected), False) if selected else TICKET_LIST_ADAPTER
+        return json_response(tickets, adapter, response)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving tickets: {str(e)}")
 
+@app.get("/tickets/export")
+async def export_tickets(
+    format: Literal["ndjson", "csv", "arrow"] = Query("ndjson", description="Export format (arrow is an Arrow IPC stream)"),
+    status_id: Optional[int] = Query(None, description="Filter by status ID"),
+    priority_id: Optional[int] = Query(None, description="Filter by priority ID"),
+    category_id: Optional[int] = Query(None, description="Filter by category ID"),
+    tag: Optional[str] = Query(None, description="Filter by tag (case-insensitive)"),
+    created_after: Optional[datetime] = Query(None, description="Only tickets created at or after this time (ISO 8601, UTC unless an offset is given)"),
+    created_before: Optional[datetime] = Query(None, description="Only tickets created before this time"),
+    updated_since: Optional[datetime] = Query(None, description="Only tickets updated at or after this time, for incremental sync"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export (default: all)")
+):
+    """Stream every matching ticket as NDJSON, CSV or Arrow
+    
+    Rows are read from one read-only cursor in fetchmany batches, so memory
+    stays flat however many tickets match. The Arrow stream carries typed
+    columns (integers, timestamps) that pandas, Polars and DuckDB read
+    without parsing JSON; it needs pyarrow on the server.
+    """
+    try:
+        columns = db.resolve_fields(parse_fields(fields)) or list(db.TICKET_FIELDS)
+        schema = db.ticket_arrow_schema(columns) if format == "arrow" else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    
+    filters = {
+        'status_id': status_id, 'priority_id': priority_id, 'category_id': category_id, 'tag': tag,
+        'created_after': created_after, 'created_before': created_before, 'updated_since': updated_since
+    }
+    if format == "arrow":
+        body = arrow_stream(schema, db.iter_ticket_record_batches(fields=columns, **filters))
+        media_type, extension = "application/vnd.apache.arrow.stream", "arrows"
+    elif format == "csv":
+        body = csv_lines(columns, db.iter_ticket_rows(fields=columns, **filters))
+        media_type, extension = "text/csv", "csv"
+    else:
+        body = ndjson_lines(columns, db.iter_ticket_rows(fields=columns, **filters))
+        media_type, extension = "application/x-ndjson", "ndjson"
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="tickets.{extension}"'}
+    )
+
 @app.get("/tickets/{ticket_id}", response_model=TicketResponse)
-async def get_ticket(ticket_id: int):
-    """Get a specific ticket by ID"""
+async def get_ticket(
+    ticket_id: int,
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(None, description="Embed comments and/or history, e.g. comments,history"),
+    include_limit: int = Query(20, ge=1, le=200, description="Newest comments/history entries to embed")
+):
+    """Get a specific ticket by ID (served from the hot-ticket cache when possible)
+    
+    ``include`` embeds the newest comments and history in the same query;
+    ``<relation>_next`` is the ``before`` value for older entries at
+    ``/tickets/{id}/comments`` or ``/tickets/{id}/history``. Archived
+    tickets are read from the archive database.
+    """
     try:
-        ticket = db.get_ticket(ticket_id)
-        if not ticket:
+        relations = db.resolve_include(parse_fields(include))
+        
+        cached = await not_modified(request, response)
+        if cached is not None:
+            return cached
+        
+        if relations:
+            ticket = await async_db.get_ticket(ticket_id, include=relations, include_limit=include_limit)
+            if ticket is None:
+                raise HTTPException(status_code=404, detail="Ticket not found")
+            return json_response(ticket, include_adapter((), tuple(relations), False), response)
+        
+        body = await async_db.get_ticket_payload(ticket_id, lambda ticket: encode_json(ticket, TICKET_ADAPTER))
+        if body is None:
             raise HTTPException(status_code=404, detail="Ticket not found")
-        return ticket
+        return Response(content=body, media_type="application/json", headers=dict(response.headers))
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving ticket: {str(e)}")
 
+async def related_response(ticket_id: int, relation: str, before: Optional[int], limit: int,
+                           request: Request, response: Response) -> Response:
+    """One page of a ticket's comments or history, newest first"""
+    cached = await not_modified(request, response)
+    if cached is not None:
+        return cached
+    
+    page = await async_db.get_ticket_related(ticket_id, relation, before=before, limit=limit)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return json_response(page, RELATION_PAGE_ADAPTERS[relation], response)
+
+@app.get("/tickets/{ticket_id}/comments", response_model=TicketCommentPage)
+async def get_ticket_comments(
+    ticket_id: int,
+    request: Request,
+    response: Response,
+    before: Optional[int] = Query(None, ge=1, description="Return comments older than this comment ID (comments_next)"),
+    limit: int = Query(20, ge=1, le=200, description="Number of comments to return")
+):
+    """Get a ticket's comments, newest first"""
+    try:
+        return await related_response(ticket_id, 'comments', before, limit, request, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving comments: {str(e)}")
+
+@app.get("/tickets/{ticket_id}/history", response_model=TicketHistoryPage)
+async def get_ticket_history(
+    ticket_id: int,
+    request: Request,
+    response: Response,
+    before: Optional[int] = Query(None, ge=1, description="Return entries older than this history ID (history_next)"),
+    limit: int = Query(20, ge=1, le=200, description="Number of history entries to return")
+):
+    """Get a ticket's change history, newest first"""
+    try:
+        return await related_response(ticket_id, 'history', before, limit, request, response)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving history: {str(e)}")
+
 @app.post("/tickets", response_model=Dict[str, Any])
 async def create_ticket(ticket: TicketCreate):
     """Create a new ticket"""
     try:
-        # Validate that user exists
-        users = db.get_users()
-        user_exists = any(u['id'] == ticket.user_id for u in users)
-        if not user_exists:
+        # Validate references against the in-memory reference cache
+        if not await async_db.reference_exists('users', ticket.user_id):
             raise HTTPException(status_code=400, detail="Invalid user ID")
         
-        # Validate category
-        categories = db.get_categories()
-        category_exists = any(c['id'] == ticket.category_id for c in categories)
-        if not category_exists:
+        if not await async_db.reference_exists('categories', ticket.category_id):
             raise HTTPException(status_code=400, detail="Invalid category ID")
         
-        # Validate priority
-        priorities = db.get_priority_levels()
-        priority_exists = any(p['id'] == ticket.priority_id for p in priorities)
-        if not priority_exists:
+        if not await async_db.reference_exists('priority_levels', ticket.priority_id):
             raise HTTPException(status_code=400, detail="Invalid priority ID")
         
         # Set initial status to "Open" (ID 1)
         ticket_data = ticket.dict()
         ticket_data['status_id'] = 1
         
-        ticket_id = db.create_ticket(ticket_data)
+        created = await async_db.create_ticket(ticket_data)
+        change_feed.notify()
         
         return {
             "message": "Ticket created successfully",
-            "ticket_id": ticket_id,
-            "ticket_number": f"TKT-{str(ticket_id).zfill(3)}"
+            "ticket_id": created['id'],
+            "ticket_number": created['ticket_number']
         }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating ticket: {str(e)}")
 
+@app.post("/tickets/bulk", response_model=Dict[str, Any])
+async def create_tickets_bulk(bulk: BulkTicketCreate):
+    """Create up to 10,000 tickets in one transaction
+    
+    Each item is validated on its own; invalid items are reported in
+    ``results`` and the rest are still created.
+    """
+    try:
+        results = await async_db.create_tickets_bulk([ticket.dict() for ticket in bulk.tickets])
+        change_feed.notify()
+        created = sum(1 for result in results if result['status'] == 'created')
+        
+        return {
+            "message": f"{created} of {len(results)} tickets created",
+            "created": created,
+            "failed": len(results) - created,
+            "results": results
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating tickets: {str(e)}")
+
 @app.put("/tickets/{ticket_id}")
 async def update_ticket(ticket_id: int, ticket_update: TicketUpdate, user_id: int = Query(..., description="ID of user making the update")):
     """Update an existing ticket"""
     try:
         # Validate that ticket exists
-        existing_ticket = db.get_ticket(ticket_id)
+        existing_ticket = await async_db.get_ticket(ticket_id)
         if not existing_ticket:
             raise HTTPException(status_code=404, detail="Ticket not found")
         
         # Validate user exists
-        users = db.get_users()
-        user_exists = any(u['id'] == user_id for u in users)
-        if not user_exists:
+        if not await async_db.reference_exists('users', user_id):
             raise HTTPException(status_code=400, detail="Invalid user ID")
         
         # Validate category if provided
         if ticket_update.category_id:
-            categories = db.get_categories()
-            category_exists = any(c['id'] == ticket_update.category_id for c in categories)
-            if not category_exists:
+            if not await async_db.reference_exists('categories', ticket_update.category_id):
                 raise HTTPException(status_code=400, detail="Invalid category ID")
         
         # Validate priority if provided
         if ticket_update.priority_id:
-            priorities = db.get_priority_levels()
-            priority_exists = any(p['id'] == ticket_update.priority_id for p in priorities)
-            if not priority_exists:
+            if not await async_db.reference_exists('priority_levels', ticket_update.priority_id):
                 raise HTTPException(status_code=400, detail="Invalid priority ID")
         
         # Validate status if provided
         if ticket_update.status_id:
-            statuses = db.get_statuses()
-            status_exists = any(s['id'] == ticket_update.status_id for s in statuses)
-            if not status_exists:
+            if not await async_db.reference_exists('statuses', ticket_update.status_id):
                 raise HTTPException(status_code=400, detail="Invalid status ID")
         
         # Validate assigned_to if provided
         if ticket_update.assigned_to:
-            assigned_user_exists = any(u['id'] == ticket_update.assigned_to for u in users)
-            if not assigned_user_exists:
+            if not await async_db.reference_exists('users', ticket_update.assigned_to):
                 raise HTTPException(status_code=400, detail="Invalid assigned user ID")
         
         # Remove None values
@@ -242,11 +811,14 @@ async def update_ticket(ticket_id: int, ticket_update: TicketUpdate, user_id: in
         if not update_data:
             raise HTTPException(status_code=400, detail="No valid fields to update")
         
-        success = db.update_ticket(ticket_id, update_data, user_id)
+        success = await async_db.update_ticket(ticket_id, update_data, user_id)
         
         if not success:
+            if await async_db.is_archived(ticket_id):
+                raise HTTPException(status_code=409, detail="Archived tickets are read-only")
             raise HTTPException(status_code=500, detail="Failed to update ticket")
         
+        change_feed.notify()
         return {"message": "Ticket updated successfully"}
     except HTTPException:
         raise
@@ -254,11 +826,21 @@ async def update_ticket(ticket_id: int, ticket_update: TicketUpdate, user_id: in
         raise HTTPException(status_code=500, detail=f"Error updating ticket: {str(e)}")
 
 # Reference data endpoints
+async def reference_response(table: str) -> Response:
+    """Serve a reference table as JSON, serialized once per table version"""
+    adapter = REFERENCE_ADAPTERS[table]
+    body = await async_db.get_reference_payload(
+        table,
+        'json',
+        lambda rows: adapter.dump_json(adapter.validate_python(rows))
+    )
+    return Response(content=body, media_type="application/json")
+
 @app.get("/categories", response_model=List[CategoryResponse])
 async def get_categories():
     """Get all ticket categories"""
     try:
-        return db.get_categories()
+        return await reference_response('categories')
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving categories: {str(e)}")
 
@@ -266,7 +848,7 @@ async def get_categories():
 async def get_priorities():
     """Get all priority levels"""
     try:
-        return db.get_priority_levels()
+        return await reference_response('priority_levels')
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving priorities: {str(e)}")
 
@@ -274,7 +856,7 @@ async def get_priorities():
 async def get_statuses():
     """Get all ticket statuses"""
     try:
-        return db.get_statuses()
+        return await reference_response('statuses')
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving statuses: {str(e)}")
 
@@ -282,63 +864,233 @@ async def get_statuses():
 async def get_users():
     """Get all users"""
     try:
-        return db.get_users()
+        return await reference_response('users')
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving users: {str(e)}")
 
 # Statistics endpoint
 @app.get("/stats", response_model=TicketStats)
-async def get_ticket_stats():
+async def get_ticket_stats(request: Request, response: Response):
     """Get ticket statistics and analytics"""
     try:
-        return db.get_ticket_stats()
+        cached = await not_modified(request, response)
+        if cached is not None:
+            return cached
+        
+        return json_response(await async_db.get_ticket_stats(), TICKET_STATS_ADAPTER, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving statistics: {str(e)}")
 
+@app.get("/stats/pool")
+async def get_pool_stats():
+    """Get database connection pool statistics"""
+    return db.get_pool_stats()
+
+@app.get("/stats/cache")
+async def get_cache_stats():
+    """Get reference-data and hot-ticket cache statistics"""
+    return db.get_cache_stats()
+
+@app.get("/stats/changes")
+async def get_change_feed_stats():
+    """Get change feed subscriber and polling statistics"""
+    return change_feed.stats()
+
+@app.get("/stats/archive")
+async def get_archive_stats():
+    """Get the archive database location and row counts"""
+    try:
+        return await async_db.get_archive_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving archive statistics: {str(e)}")
+
+@app.get("/stats/history")
+async def get_history_stats():
+    """Get ticket_history size and how many old rows are waiting for compaction"""
+    try:
+        return await async_db.get_history_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving history statistics: {str(e)}")
+
+# SLA endpoints
+@app.get("/sla/breaching", response_model=SlaBreaching)
+async def get_sla_breaching(
+    within: str = Query("0", description="Also include tickets due within this long, e.g. 30m, 4h or 1d (0: only overdue)"),
+    limit: int = Query(100, ge=1, le=500, description="Number of tickets to return")
+):
+    """Get Open and In Progress tickets that are overdue or due soon, soonest first
+    
+    Due dates are the ticket's creation time plus the stricter of its category
+    and priority SLA hours. Overdue tickets are moved to Escalated by a
+    background job every ``TICKETS_SLA_ESCALATION_INTERVAL`` seconds.
+    """
+    try:
+        within_seconds = parse_duration(within)
+        tickets = await async_db.get_sla_breaching(within_seconds=within_seconds, limit=limit)
+        return json_response({"within_seconds": within_seconds, "tickets": tickets}, SLA_BREACHING_ADAPTER)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving SLA breaches: {str(e)}")
+
+# Analytics endpoints
+@app.get("/analytics/timeseries", response_model=Timeseries)
+async def get_ticket_timeseries(
+    request: Request,
+    response: Response,
+    bucket: Literal["hour", "day", "week"] = Query("day", description="Bucket size (weeks start on Monday, all times UTC)"),
+    group_by: Optional[Literal["category", "priority"]] = Query(None, description="One series per category or priority"),
+    start: Optional[datetime] = Query(None, description="Start in the bucket holding this time (default: 2 days, 30 days or 12 weeks before end)"),
+    end: Optional[datetime] = Query(None, description="Count events before this time (default: now)"),
+    category_id: Optional[int] = Query(None, description="Count only tickets in this category"),
+    priority_id: Optional[int] = Query(None, description="Count only tickets with this priority")
+):
+    """Get tickets created, resolved and escalated per hour, day or week, oldest first
+    
+    Served from the hourly and daily ticket_rollups rows, which triggers keep
+    current on every ticket write, so the cost depends on the number of
+    buckets, not of tickets. Buckets without events are left out. With an explicit
+    ``start`` the response carries an ETag; a default window moves with the
+    clock, so it is always recomputed.
+    """
+    try:
+        if start is not None:
+            cached = await not_modified(request, response)
+            if cached is not None:
+                return cached
+        
+        timeseries = await async_db.get_ticket_timeseries(
+            bucket=bucket,
+            group_by=group_by,
+            start=start,
+            end=end,
+            category_id=category_id,
+            priority_id=priority_id
+        )
+        return json_response(timeseries, TIMESERIES_ADAPTER, response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving time series: {str(e)}")
+
+# Tag endpoints
+@app.get("/tags/facets", response_model=TagFacets)
+async def get_tag_facets(
+    request: Request,
+    response: Response,
+    status_id: Optional[int] = Query(None, description="Count only tickets with this status"),
+    category_id: Optional[int] = Query(None, description="Count only tickets in this category"),
+    limit: int = Query(50, ge=1, le=500, description="Number of tags to return")
+):
+    """Get the number of tickets per tag, most used first (read from the ticket_tags index)"""
+    try:
+        cached = await not_modified(request, response)
+        if cached is not None:
+            return cached
+        
+        tags = await async_db.get_tag_facets(status_id=status_id, category_id=category_id, limit=limit)
+        return json_response({"tags": tags}, TAG_FACETS_ADAPTER, response)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving tag facets: {str(e)}")
+
 # Search endpoint
 @app.get("/search")
 async def search_tickets(
-    query: str = Query(..., min_length=2, description="Search query"),
-    limit: int = Query(20, ge=1, le=50, description="Number of results to return")
+    query: str = Query(..., min_length=2, description='Search query: words are ANDed, "quoted phrases" match exactly, word* matches a prefix'),
+    limit: int = Query(20, ge=1, le=50, description="Number of results to return"),
+    offset: int = Query(0, ge=0, description="Number of results to skip"),
+    include_archived: bool = Query(False, description="Also search tickets moved to the archive")
 ):
-    """Search tickets by title, description, or tags"""
+    """Search tickets by title, description, tags, or comments (ranked by relevance)"""
     try:
-        # Simple search implementation - in production, consider using full-text search
-        all_tickets = db.get_tickets(limit=1000)  # Get all tickets for search
-        
-        results = []
-        query_lower = query.lower()
-        
-        for ticket in all_tickets:
-            if (query_lower in ticket['title'].lower() or
-                query_lower in ticket['description'].lower() or
-                (ticket['tags'] and query_lower in ticket['tags'].lower())):
-                results.append(ticket)
+        search = await async_db.search_tickets(query, limit=limit, offset=offset, include_archived=include_archived)
         
-        return {
+        return json_response({
             "query": query,
-            "total_results": len(results),
-            "results": results[:limit]
-        }
+            "total_results": search['total_results'],
+            "results": search['results']
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching tickets: {str(e)}")
 
 # Dashboard endpoint
 @app.get("/dashboard")
-async def get_dashboard():
-    """Get dashboard data including stats and recent tickets"""
+async def get_dashboard(request: Request, response: Response):
+    """Get dashboard data including stats and recent tickets (304 while nothing has changed)"""
     try:
-        stats = db.get_ticket_stats()
-        recent_tickets = db.get_tickets(limit=10, offset=0)
+        cached = await not_modified(request, response)
+        if cached is not None:
+            return cached
         
-        return {
+        stats, recent_tickets = await asyncio.gather(
+            async_db.get_ticket_stats(),
+            async_db.get_tickets(limit=10, offset=0)
+        )
+        
+        return json_response({
             "stats": stats,
             "recent_tickets": recent_tickets,
             "timestamp": datetime.now().isoformat()
-        }
+        }, response=response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving dashboard data: {str(e)}")
 
+# Change feed endpoints
+@app.get("/changes", response_model=TicketChangePage)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Return changes with an id greater than this (use next_since from the previous call)"),
+    limit: int = Query(100, ge=1, le=1000, description="Number of changes to return")
+):
+    """Get ticket creates and updates recorded in ticket_history after ``since``, oldest first"""
+    try:
+        changes = await async_db.get_changes(since, limit + 1)
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        
+        return json_response({
+            "changes": changes,
+            "next_since": changes[-1]['id'] if changes else since,
+            "has_more": has_more
+        }, TICKET_CHANGE_PAGE_ADAPTER)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving changes: {str(e)}")
+
+async def change_events(since: Optional[int]) -> AsyncIterator[bytes]:
+    """Encode change feed batches as Server-Sent Events, with a comment line as keepalive"""
+    yield b"retry: 3000\n\n"
+    async for changes in change_feed.subscribe(since):
+        if not changes:
+            yield b": keepalive\n\n"
+            continue
+        yield b"".join(
+            f"id: {change['id']}\nevent: change\ndata: ".encode() + encode_json(change) + b"\n\n"
+            for change in changes
+        )
+
+@app.get("/changes/stream")
+async def stream_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0, description="Replay changes after this id first (default: only new changes)")
+):
+    """Push ticket creates and updates to the client as Server-Sent Events
+    
+    Each event has the ticket_history id as its SSE id, so a reconnecting
+    EventSource resumes through ``Last-Event-ID`` without gaps.
+    """
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id is not None:
+        if not last_event_id.isdigit():
+            raise HTTPException(status_code=400, detail="Last-Event-ID must be a change id")
+        since = int(last_event_id)
+    
+    return StreamingResponse(
+        change_events(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 if __name__ == "__main__":
     print("🚀 Starting Ticket Management System...")
     print("📊 Database initialized with sample data")
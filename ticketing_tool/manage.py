@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Maintenance Commands for Ticket Management System
+Consistency checks and rebuilds for the derived tables in database.py
+
+Usage:
+    python3 manage.py check-stats
+    python3 manage.py rebuild-stats
+    python3 manage.py rebuild-search
+    python3 manage.py rebuild-tags
+    python3 manage.py rebuild-read-model
+    python3 manage.py rebuild-rollups
+    python3 manage.py normalize-timestamps
+    python3 manage.py archive --older-than-days 90
+    python3 manage.py compact-history --retention-days 30
+    python3 manage.py export-parquet --out exports/tickets --partition month
+"""
+
+import argparse
+
+from database import DEFAULT_ARCHIVE_AFTER_DAYS, DEFAULT_HISTORY_RETENTION_DAYS, TicketDatabase
+
+def check_stats(database: TicketDatabase, args) -> int:
+    """Compare ticket_counts with the tickets table"""
+    print("🔎 Checking ticket_counts against tickets...")
+    drift = database.check_ticket_counts()
+    if not drift:
+        print("✅ ticket_counts is consistent")
+        return 0
+    
+    print(f"❌ {len(drift)} counter rows disagree with tickets:")
+    for row in drift:
+        print(f"   status {row['status_id']}, priority {row['priority_id']}, category {row['category_id']}: "
+              f"counted {row['counted']}, expected {row['expected']}")
+    print("   Run 'python3 manage.py rebuild-stats' to fix")
+    return 1
+
+def rebuild_stats(database: TicketDatabase, args) -> int:
+    """Recompute ticket_counts from scratch"""
+    print("🔧 Rebuilding ticket_counts...")
+    database.rebuild_ticket_counts()
+    print("✅ ticket_counts rebuilt")
+    return 0
+
+def rebuild_search(database: TicketDatabase, args) -> int:
+    """Repopulate the tickets_fts search index"""
+    print("🔧 Rebuilding tickets_fts...")
+    with database.connection() as conn:
+        database.rebuild_search_index(conn.cursor())
+    print("✅ Search index rebuilt")
+    return 0
+
+def rebuild_tags(database: TicketDatabase, args) -> int:
+    """Repopulate the ticket_tags index from tickets.tags"""
+    print("🔧 Rebuilding ticket_tags...")
+    database.rebuild_tag_index()
+    print("✅ Tag index rebuilt")
+    return 0
+
+def rebuild_read_model(database: TicketDatabase, args) -> int:
+    """Repopulate the tickets_view read model"""
+    if not database.read_model:
+        print("❌ The read model is disabled (TICKETS_READ_MODEL=0)")
+        return 1
+    
+    print("🔧 Rebuilding tickets_view...")
+    database.rebuild_read_model()
+    print("✅ tickets_view rebuilt")
+    return 0
+
+def rebuild_rollups(database: TicketDatabase, args) -> int:
+    """Recompute the hourly and daily ticket_rollups from tickets and ticket_history (archive included)"""
+    print("🔧 Rebuilding ticket_rollups...")
+    database.rebuild_ticket_rollups()
+    print("✅ ticket_rollups rebuilt")
+    return 0
+
+def normalize_timestamps(database: TicketDatabase, args) -> int:
+    """Rewrite stored timestamps as UTC 'YYYY-MM-DD HH:MM:SS' text (safe while the API is running)"""
+    print("🔧 Normalizing timestamps...")
+    changed = database.normalize_timestamps()
+    print(f"✅ {changed} rows normalized")
+    return 0
+
+def archive(database: TicketDatabase, args) -> int:
+    """Move old Closed tickets, with their comments and history, to the archive database"""
+    print(f"🗄️ Archiving tickets closed for more than {args.older_than_days:g} days to {database.archive_path}...")
+    archived = database.archive_closed_tickets(older_than_days=args.older_than_days)
+    print(f"✅ {archived} tickets archived")
+    return 0
+
+def compact_history(database: TicketDatabase, args) -> int:
+    """Merge ticket_history older than the retention into per-day summaries (safe while the API is running)"""
+    print(f"🗜️ Compacting ticket_history older than {args.retention_days:g} days...")
+    removed = database.compact_history(retention_days=args.retention_days)
+    stats = database.get_history_stats(retention_days=args.retention_days)
+    print(f"✅ {removed} rows removed, {stats['rows']} left ({stats['summary_rows']} summaries)")
+    return 0
+
+def export_parquet(database: TicketDatabase, args) -> int:
+    """Write all tickets to a (optionally date-partitioned) Parquet dataset"""
+    partition_by = None if args.partition == 'none' else args.partition
+    print(f"📦 Exporting tickets to {args.out} (partitioned by {args.partition})...")
+    try:
+        rows = database.export_tickets_parquet(args.out, partition_by=partition_by)
+    except ImportError as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"✅ Exported {rows} tickets")
+    return 0
+
+COMMANDS = {
+    'check-stats': check_stats,
+    'rebuild-stats': rebuild_stats,
+    'rebuild-search': rebuild_search,
+    'rebuild-tags': rebuild_tags,
+    'rebuild-read-model': rebuild_read_model,
+    'rebuild-rollups': rebuild_rollups,
+    'normalize-timestamps': normalize_timestamps,
+    'archive': archive,
+    'compact-history': compact_history,
+    'export-parquet': export_parquet
+}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Ticket Management System maintenance commands")
+    parser.add_argument("command", choices=list(COMMANDS), help="Command to run")
+    parser.add_argument("--db", default="tickets.db", help="Path to the SQLite database")
+    parser.add_argument("--out", default="exports/tickets", help="Output directory for export-parquet")
+    parser.add_argument("--partition", default="month", choices=["year", "month", "day", "none"],
+                        help="created_at partitioning for export-parquet")
+    parser.add_argument("--older-than-days", type=float, default=DEFAULT_ARCHIVE_AFTER_DAYS,
+                        help="Archive Closed tickets not updated for this many days")
+    parser.add_argument("--retention-days", type=float, default=DEFAULT_HISTORY_RETENTION_DAYS,
+                        help="Keep field-level ticket_history for this many days before compacting it")
+    args = parser.parse_args()
+    
+    database = TicketDatabase(args.db)
+    try:
+        return COMMANDS[args.command](database, args)
+    finally:
+        database.close()
+
+if __name__ == "__main__":
+    raise SystemExit(main())
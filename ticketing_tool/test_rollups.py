@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Rollup Tests for Ticket Management System
+Writes tickets and history with non-canonical timestamps straight to a throwaway database (no server needed)
+"""
+
+import os
+import shutil
+import tempfile
+
+from database import TicketDatabase
+
+def make_database() -> TicketDatabase:
+    """Create a sample-data database in a fresh temporary directory"""
+    return TicketDatabase(os.path.join(tempfile.mkdtemp(prefix="tickets-test-"), "tickets.db"))
+
+def drop_database(database: TicketDatabase):
+    database.close()
+    shutil.rmtree(os.path.dirname(database.db_path), ignore_errors=True)
+
+def rollup_rows(database: TicketDatabase) -> list:
+    with database.read_connection() as conn:
+        return [tuple(row) for row in conn.execute("""
+            SELECT period, bucket_start, category_id, priority_id, created, resolved, escalated
+            FROM ticket_rollups ORDER BY period, bucket_start, category_id, priority_id
+        """)]
+
+def test_rollups_accept_epoch_and_offset_timestamps():
+    """Epoch and UTC-offset created_at values are bucketed by their UTC time"""
+    print("\n📈 Testing rollups with epoch and offset timestamps...")
+    database = make_database()
+    try:
+        with database.connection() as conn:
+            # 1760000000 is 2025-10-09 08:53:20 UTC
+            epoch_id = conn.execute("""
+                INSERT INTO tickets (ticket_number, title, description, user_id, category_id, priority_id, status_id, created_at)
+                VALUES ('EPOCH-1', 'Epoch ticket', 'Written with a Unix time', 1, 2, 3, 1, 1760000000)
+            """).lastrowid
+            conn.execute("""
+                INSERT INTO tickets (ticket_number, title, description, user_id, category_id, priority_id, status_id, created_at)
+                VALUES ('OFFSET-1', 'Offset ticket', 'Written with a UTC offset', 1, 2, 3, 1, '2025-01-01T10:30:00+02:00')
+            """)
+            conn.execute("""
+                INSERT INTO ticket_history (ticket_id, user_id, action, old_value, new_value, created_at)
+                VALUES (?, 4, 'Status_Id Changed', '1', ?, 1760003600)
+            """, (epoch_id, str(database.RESOLVED_STATUS_ID)))
+        
+        rows = rollup_rows(database)
+        assert ('hour', '2025-10-09 08:00:00', 2, 3, 1, 0, 0) in rows
+        assert ('hour', '2025-10-09 09:00:00', 2, 3, 0, 1, 0) in rows
+        assert ('day', '2025-10-09 00:00:00', 2, 3, 1, 1, 0) in rows
+        assert ('hour', '2025-01-01 08:00:00', 2, 3, 1, 0, 0) in rows
+        assert all(row[1] is not None for row in rows)
+        
+        database.rebuild_ticket_rollups()
+        assert rollup_rows(database) == rows
+        print(f"✅ {len(rows)} rollup rows, identical after a rebuild")
+    finally:
+        drop_database(database)
+
+def main():
+    """Run all tests"""
+    print("🚀 Ticket Management System - Rollup Tests")
+    print("=" * 50)
+    test_rollups_accept_epoch_and_offset_timestamps()
+    print("\n" + "=" * 50)
+    print("✅ All tests completed!")
+
+if __name__ == "__main__":
+    main()
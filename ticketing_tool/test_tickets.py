@@ -41,6 +41,97 @@ def test_get_tickets():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+def test_get_tickets_cursor():
+    """Test keyset pagination of tickets"""
+    print("\n📄 Testing Cursor Pagination...")
+    try:
+        response = requests.get(f"{BASE_URL}/tickets", params={"limit": 3, "pagination": "cursor"})
+        if response.status_code == 200:
+            page = response.json()
+            print(f"✅ Retrieved first page of {len(page['tickets'])} tickets")
+            print(f"   Total Tickets: {response.headers.get('X-Total-Count')}")
+            
+            if page['next_cursor']:
+                response = requests.get(f"{BASE_URL}/tickets", params={"limit": 3, "cursor": page['next_cursor']})
+                next_page = response.json()
+                print(f"✅ Retrieved next page of {len(next_page['tickets'])} tickets")
+        else:
+            print(f"❌ Failed to page tickets: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+def test_get_tickets_summary():
+    """Test the compact summary list view"""
+    print("\n🪶 Testing Summary View...")
+    try:
+        response = requests.get(f"{BASE_URL}/tickets", params={"view": "summary", "limit": 5})
+        if response.status_code == 200:
+            tickets = response.json()
+            print(f"✅ Retrieved {len(tickets)} summary rows ({len(response.content)} bytes)")
+            if tickets:
+                print(f"   Fields: {', '.join(tickets[0])}")
+        else:
+            print(f"❌ Failed to get summary view: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+def test_export_tickets():
+    """Test streaming the ticket export"""
+    print("\n📤 Testing Ticket Export...")
+    try:
+        for export_format in ("ndjson", "csv"):
+            response = requests.get(f"{BASE_URL}/tickets/export", params={"format": export_format}, stream=True)
+            if response.status_code == 200:
+                lines = sum(1 for _ in response.iter_lines())
+                print(f"✅ Exported {export_format}: {lines} lines")
+            else:
+                print(f"❌ Failed to export {export_format}: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+def test_time_filters():
+    """Test created_after, created_before and updated_since"""
+    print("\n🕒 Testing Time Filters...")
+    try:
+        response = requests.get(f"{BASE_URL}/tickets", params={"created_after": "2000-01-01T00:00:00Z", "created_before": "2100-01-01T00:00:00Z"})
+        if response.status_code == 200:
+            print(f"✅ {len(response.json())} tickets created in range")
+        else:
+            print(f"❌ Failed to filter by created_at: {response.status_code}")
+            return
+        
+        response = requests.get(f"{BASE_URL}/tickets", params={"updated_since": "2100-01-01T00:00:00Z"})
+        if response.status_code == 200 and response.json() == []:
+            print("✅ No tickets updated in the future")
+        else:
+            print(f"❌ updated_since returned unexpected tickets: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+def test_tags():
+    """Test filtering by tag and tag facet counts"""
+    print("\n🏷️  Testing Tags...")
+    try:
+        response = requests.get(f"{BASE_URL}/tags/facets", params={"limit": 5})
+        if response.status_code == 200:
+            facets = response.json()['tags']
+            print("✅ Tag facets retrieved")
+            for facet in facets:
+                print(f"   {facet['tag']}: {facet['count']}")
+        else:
+            print(f"❌ Failed to get tag facets: {response.status_code}")
+            return
+        
+        if facets:
+            tag = facets[0]['tag']
+            response = requests.get(f"{BASE_URL}/tickets", params={"tag": tag})
+            if response.status_code == 200:
+                print(f"✅ {len(response.json())} tickets tagged '{tag}'")
+            else:
+                print(f"❌ Failed to filter by tag: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
 def test_get_ticket_details():
     """Test getting a specific ticket"""
     print("\n🔍 Testing Get Ticket Details...")
@@ -59,6 +150,29 @@ def test_get_ticket_details():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+def test_get_ticket_with_relations():
+    """Test getting tickets with embedded comments and history"""
+    print("\n📎 Testing Get Ticket With Comments and History...")
+    try:
+        response = requests.get(f"{BASE_URL}/tickets/1", params={"include": "comments,history"})
+        if response.status_code == 200:
+            ticket = response.json()
+            print(f"✅ Retrieved ticket {ticket['ticket_number']} with "
+                  f"{len(ticket['comments'])} comments and {len(ticket['history'])} history entries")
+            for entry in ticket['history']:
+                print(f"   {entry['action']}: {entry['old_value']} -> {entry['new_value']} by {entry['user_full_name']}")
+        else:
+            print(f"❌ Failed to get ticket with relations: {response.status_code}")
+        
+        response = requests.get(f"{BASE_URL}/tickets", params={"ids": "2,1", "view": "summary", "include": "history"})
+        if response.status_code == 200:
+            tickets = response.json()
+            print(f"✅ Fetched {', '.join(ticket['ticket_number'] for ticket in tickets)} by ID")
+        else:
+            print(f"❌ Failed to get tickets by ID: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
 def test_create_ticket():
     """Test creating a new ticket"""
     print("\n➕ Testing Create Ticket...")
@@ -87,6 +201,37 @@ def test_create_ticket():
         print(f"❌ Error: {e}")
     return None
 
+def test_create_tickets_bulk():
+    """Test creating tickets in bulk"""
+    print("\n📥 Testing Bulk Create Tickets...")
+    
+    bulk = {
+        "tickets": [
+            {
+                "title": f"Bulk test ticket {i}",
+                "description": "This ticket was created by the bulk ingestion test.",
+                "user_id": 2,
+                "category_id": 6,
+                "priority_id": 4,
+                "tags": "test,bulk"
+            }
+            for i in range(3)
+        ]
+    }
+    
+    try:
+        response = requests.post(f"{BASE_URL}/tickets/bulk", json=bulk)
+        if response.status_code == 200:
+            result = response.json()
+            print(f"✅ {result['message']}")
+            for item in result['results']:
+                print(f"   {item.get('ticket_number', item.get('error'))}")
+        else:
+            print(f"❌ Failed to create tickets in bulk: {response.status_code}")
+            print(f"   Response: {response.text}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
 def test_update_ticket(ticket_id):
     """Test updating a ticket"""
     if not ticket_id:
@@ -181,6 +326,7 @@ def test_search_tickets():
             
             for ticket in search_result['results']:
                 print(f"     {ticket['ticket_number']}: {ticket['title']}")
+                print(f"       {ticket['snippet']}")
         else:
             print(f"❌ Failed to search tickets: {response.status_code}")
     except Exception as e:
@@ -202,6 +348,140 @@ def test_dashboard():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+def test_sla_breaching():
+    """Test the SLA breach queue"""
+    print("\n⏰ Testing SLA Breaching...")
+    try:
+        response = requests.get(f"{BASE_URL}/sla/breaching", params={"within": "1d"})
+        if response.status_code == 200:
+            tickets = response.json()['tickets']
+            print(f"✅ {len(tickets)} open tickets overdue or due within a day")
+            for ticket in tickets[:3]:
+                state = "overdue" if ticket['breached'] else "due"
+                print(f"   {ticket['ticket_number']}: {state} {ticket['due_date']}")
+        else:
+            print(f"❌ Failed to get SLA breaches: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+def test_get_changes():
+    """Test reading the ticket change feed"""
+    print("\n📰 Testing Change Feed...")
+    try:
+        response = requests.get(f"{BASE_URL}/changes", params={"since": 0, "limit": 3})
+        if response.status_code == 200:
+            page = response.json()
+            print(f"✅ Retrieved {len(page['changes'])} changes (next_since {page['next_since']}, more: {page['has_more']})")
+            for change in page['changes']:
+                print(f"   #{change['id']} {change['ticket_number']}: {change['action']} -> {change['new_value']}")
+        else:
+            print(f"❌ Failed to get changes: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+def test_timeseries():
+    """Test the created/resolved/escalated time series"""
+    print("\n📈 Testing Time Series...")
+    try:
+        response = requests.get(f"{BASE_URL}/analytics/timeseries", params={"bucket": "hour", "group_by": "category"})
+        if response.status_code == 200:
+            series = response.json()
+            print(f"✅ {len(series['points'])} hourly points per category since {series['start']}")
+            for point in series['points'][-3:]:
+                print(f"   {point['bucket_start']} {point['group_name']}: {point['created']} created, "
+                      f"{point['resolved']} resolved, {point['escalated']} escalated")
+        else:
+            print(f"❌ Failed to get time series: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+def test_conditional_get():
+    """Test that a matching If-None-Match gets 304 Not Modified"""
+    print("\n🏷️  Testing Conditional GET...")
+    try:
+        response = requests.get(f"{BASE_URL}/dashboard")
+        etag = response.headers.get("ETag")
+        if response.status_code != 200 or not etag:
+            print(f"❌ Failed to get dashboard ETag: {response.status_code}")
+            return
+        
+        response = requests.get(f"{BASE_URL}/dashboard", headers={"If-None-Match": etag})
+        if response.status_code == 304:
+            print("✅ Unchanged dashboard answered with 304")
+            print(f"   ETag: {etag}")
+        else:
+            print(f"❌ Expected 304, got {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+def test_archive_stats():
+    """Test archive statistics and searching the archive"""
+    print("\n🗄️ Testing Archive...")
+    try:
+        response = requests.get(f"{BASE_URL}/stats/archive")
+        if response.status_code == 200:
+            stats = response.json()
+            print(f"✅ Archive holds {stats['tickets']} tickets, {stats['comments']} comments, {stats['history']} history entries")
+        else:
+            print(f"❌ Failed to get archive stats: {response.status_code}")
+            return
+        
+        response = requests.get(f"{BASE_URL}/search", params={"query": "login", "include_archived": "true"})
+        if response.status_code == 200:
+            print(f"✅ Search including the archive found {response.json()['total_results']} tickets")
+        else:
+            print(f"❌ Failed to search the archive: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+def test_history_stats():
+    """Test ticket_history compaction statistics"""
+    print("\n🗜️ Testing History Compaction...")
+    try:
+        response = requests.get(f"{BASE_URL}/stats/history")
+        if response.status_code == 200:
+            stats = response.json()
+            print(f"✅ ticket_history holds {stats['rows']} rows ({stats['summary_rows']} daily summaries), "
+                  f"{stats['pending_rows']} older than {stats['retention_days']:g} days waiting for compaction")
+        else:
+            print(f"❌ Failed to get history stats: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+def test_pool_stats():
+    """Test getting connection pool statistics"""
+    print("\n🔌 Testing Pool Statistics...")
+    try:
+        response = requests.get(f"{BASE_URL}/stats/pool")
+        if response.status_code == 200:
+            stats = response.json()
+            print("✅ Pool statistics retrieved")
+            print(f"   Open Connections: {stats['open']} of {stats['max_size']}")
+            print(f"   Checkouts: {stats['acquired']} (waits: {stats['waits']})")
+            print(f"   Read-only Connections: {stats['read_pool']['open']} of {stats['read_pool']['max_size']}")
+        else:
+            print(f"❌ Failed to get pool statistics: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+def test_cache_stats():
+    """Test getting reference-data and hot-ticket cache statistics"""
+    print("\n🗃️  Testing Cache Statistics...")
+    try:
+        response = requests.get(f"{BASE_URL}/stats/cache")
+        if response.status_code == 200:
+            stats = response.json()
+            print("✅ Cache statistics retrieved")
+            print(f"   Reference Hits: {stats['reference']['hits']}, Loads: {stats['reference']['loads']}")
+            print(f"   Cached Tables: {', '.join(stats['reference']['tables'])}")
+            tickets = stats['tickets']
+            print(f"   Hot Tickets: {tickets['entries']} cached ({tickets['bytes']} bytes), "
+                  f"hits {tickets['hits']}, misses {tickets['misses']}, evictions {tickets['evictions']}")
+        else:
+            print(f"❌ Failed to get cache statistics: {response.status_code}")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
 def main():
     """Run all tests"""
     print("🚀 Ticket Management System - API Test Suite")
@@ -216,16 +496,31 @@ def main():
     
     # Run all tests
     test_get_tickets()
+    test_get_tickets_cursor()
+    test_get_tickets_summary()
+    test_export_tickets()
+    test_time_filters()
+    test_tags()
     test_get_ticket_details()
+    test_get_ticket_with_relations()
     test_get_categories()
     test_get_priorities()
     test_get_stats()
     test_search_tickets()
     test_dashboard()
+    test_timeseries()
+    test_conditional_get()
+    test_sla_breaching()
+    test_get_changes()
+    test_archive_stats()
+    test_history_stats()
+    test_pool_stats()
+    test_cache_stats()
     
     # Test ticket creation and update
     new_ticket_id = test_create_ticket()
     test_update_ticket(new_ticket_id)
+    test_create_tickets_bulk()
     
     print("\n" + "=" * 50)
     print("✅ All tests completed!")
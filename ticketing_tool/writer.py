@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Single-Writer Queue for Ticket Management System
+Serializes database writes on one thread and commits them in groups
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+class TicketWriter:
+    """Dedicated writer thread with group commit
+
+    Callers submit ``operation(cursor, *args)`` and get a Future back. The
+    writer takes the first queued operation plus every operation already
+    waiting behind it, up to ``max_batch`` and for at most ``max_delay``
+    seconds of collecting, and runs the whole group in one transaction. It
+    never waits for more: a lone write commits at once, and writes that
+    arrive during a commit form the next group. Each operation gets its own savepoint, so
+    one failure rolls back only that operation. Futures resolve after COMMIT.
+    If the writer cannot open its connection it stops: queued and later
+    operations fail with that error and ``alive`` turns False.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], max_batch: int = 64, max_delay: float = 0.002):
+        self._connect = connect
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: "queue.Queue[Optional[Tuple[Callable, tuple, Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self.error: Optional[Exception] = None
+        self._stats = {
+            'operations': 0,
+            'failed_operations': 0,
+            'batches': 0,
+            'largest_batch': 0,
+            'total_commit_ms': 0.0,
+            'max_commit_ms': 0.0
+        }
+        self._thread = threading.Thread(target=self._run, name="ticket-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, operation: Callable, *args) -> Future:
+        """Queue a write operation; the Future resolves to its return value"""
+        future: Future = Future()
+        with self._lock:
+            if self.error is None:
+                self._queue.put((operation, args, future))
+                return future
+        future.set_exception(self.error)
+        return future
+
+    @property
+    def alive(self) -> bool:
+        """Whether the writer thread is running and accepting operations"""
+        return self.error is None and self._thread.is_alive()
+
+    def close(self):
+        """Finish queued operations and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _next_batch(self) -> Tuple[List[Tuple[Callable, tuple, Future]], bool]:
+        first = self._queue.get()
+        if first is None:
+            return [], True
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch and time.monotonic() < deadline:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _fail(self, error: Exception):
+        # Reject new submissions first, then fail everything already queued
+        with self._lock:
+            self.error = error
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None and item[2].set_running_or_notify_cancel():
+                item[2].set_exception(error)
+
+    def _run(self):
+        try:
+            conn = self._connect()
+        except Exception as e:
+            self._fail(e)
+            return
+        conn.isolation_level = None  # Transactions are managed explicitly below
+        cursor = conn.cursor()
+        stopping = False
+        try:
+            while not stopping:
+                batch, stopping = self._next_batch()
+                if batch:
+                    self._commit_batch(conn, cursor, batch)
+        finally:
+            conn.close()
+
+    def _commit_batch(self, conn: sqlite3.Connection, cursor: sqlite3.Cursor, batch: List[Tuple[Callable, tuple, Future]]):
+        outcomes: List[Tuple[Future, bool, Any]] = []
+        started = time.perf_counter()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for operation, args, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                cursor.execute("SAVEPOINT op")
+                try:
+                    result = operation(cursor, *args)
+                    cursor.execute("RELEASE op")
+                    outcomes.append((future, True, result))
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO op")
+                    cursor.execute("RELEASE op")
+                    outcomes.append((future, False, e))
+            cursor.execute("COMMIT")
+        except Exception as e:
+            # The transaction itself failed: nothing in this group was committed
+            if conn.in_transaction:
+                conn.rollback()
+            outcomes = [(future, False, e) for _, _, future in batch if not future.cancelled()]
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._stats['batches'] += 1
+            self._stats['operations'] += len(outcomes)
+            self._stats['failed_operations'] += sum(1 for _, ok, _ in outcomes if not ok)
+            self._stats['largest_batch'] = max(self._stats['largest_batch'], len(batch))
+            self._stats['total_commit_ms'] += elapsed_ms
+            self._stats['max_commit_ms'] = max(self._stats['max_commit_ms'], elapsed_ms)
+
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of writer counters"""
+        with self._lock:
+            batches = self._stats['batches']
+            return {
+                **self._stats,
+                'alive': self.alive,
+                'error': str(self.error) if self.error else None,
+                'queued': self._queue.qsize(),
+                'max_batch': self.max_batch,
+                'max_delay_ms': self.max_delay * 1000,
+                'avg_batch_size': round(self._stats['operations'] / batches, 2) if batches else 0.0,
+                'avg_commit_ms': round(self._stats['total_commit_ms'] / batches, 3) if batches else 0.0,
+                'total_commit_ms': round(self._stats['total_commit_ms'], 3),
+                'max_commit_ms': round(self._stats['max_commit_ms'], 3)
+            }